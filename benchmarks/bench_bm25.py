@@ -0,0 +1,81 @@
+"""
+BM25 검색 지연 시간 벤치마크
+
+지프 분포를 따르는 합성 청크(용어 번호 배열)로 BM25Index를 만든 뒤, 청크 수별로
+MaxScore 가지치기 검색, 전체 포스팅 누적 검색, rank_bm25(BM25Retriever 내부 구현)의 질의당 지연 시간을 비교합니다.
+
+사용법:
+    python -m benchmarks.bench_bm25 --chunks 10000 100000 1000000 --rank-bm25-max 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from services.bm25_index import BM25Index
+
+
+def make_corpus(rng, chunks: int, vocabulary_size: int, tokens_per_chunk: int):
+    """(문서 번호, 용어 번호) 토큰 배열을 만듭니다."""
+    term_ids = np.minimum(rng.zipf(1.2, chunks * tokens_per_chunk), vocabulary_size) - 1
+    doc_nums = np.repeat(np.arange(chunks), tokens_per_chunk)
+    return doc_nums, term_ids.astype(np.int64)
+
+
+def make_queries(rng, count: int, vocabulary_size: int):
+    # 흔한 용어와 드문 용어가 섞인 2~6 단어 질의
+    return [" ".join(f"t{t}" for t in np.minimum(rng.zipf(1.2, rng.integers(2, 7)), vocabulary_size) - 1)
+            for _ in range(count)]
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000)
+
+
+def measure(search, queries, k):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query, k)
+        samples.append(time.perf_counter() - start)
+    return percentile_ms(samples, 50), percentile_ms(samples, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--vocabulary", type=int, default=100_000)
+    parser.add_argument("--tokens-per-chunk", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--rank-bm25-max", type=int, default=100_000, help="rank_bm25 비교를 실행할 최대 청크 수")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vocabulary = {f"t{i}": i for i in range(args.vocabulary)}
+    queries = make_queries(rng, args.queries, args.vocabulary)
+
+    print(f"질의 {args.queries}개, k={args.k}, 청크당 {args.tokens_per_chunk} 토큰, 어휘 {args.vocabulary}개 (지연 시간 ms, p50/p95)")
+    print(f"{'chunks':>9} {'build s':>8} {'maxscore':>15} {'exhaustive':>15} {'rank_bm25':>15}")
+    for chunks in args.chunks:
+        doc_nums, term_ids = make_corpus(rng, chunks, args.vocabulary, args.tokens_per_chunk)
+        start = time.perf_counter()
+        index = BM25Index.from_postings(vocabulary, [str(i) for i in range(chunks)], doc_nums, term_ids)
+        build = time.perf_counter() - start
+
+        pruned = measure(index.search, queries, args.k)
+        exhaustive = measure(index.search_exhaustive, queries, args.k)
+        baseline = "-"
+        if chunks <= args.rank_bm25_max:
+            from rank_bm25 import BM25Okapi
+            tokens = np.split(term_ids, np.cumsum(np.bincount(doc_nums, minlength=chunks))[:-1])
+            okapi = BM25Okapi([[f"t{t}" for t in doc] for doc in tokens])
+            timing = measure(lambda query, k: okapi.get_top_n(query.split(), range(chunks), n=k),
+                             queries[:20], args.k)
+            baseline = f"{timing[0]:.2f}/{timing[1]:.2f}"
+        print(f"{chunks:>9} {build:>8.1f} {pruned[0]:>7.2f}/{pruned[1]:<7.2f} "
+              f"{exhaustive[0]:>7.2f}/{exhaustive[1]:<7.2f} {baseline:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+/chat 동시성 벤치마크
+
+LLM과 검색기를 고정 지연을 가진 스텁으로 바꾼 뒤, 단일 /chat 호출 시간과
+N개의 동시 /chat 호출이 모두 끝나는 시간을 비교합니다.
+채팅 경로가 이벤트 루프를 막지 않는다면 두 시간은 거의 같아야 합니다.
+
+사용법:
+    python -m benchmarks.bench_chat_concurrency --concurrency 20 --llm-latency 0.5
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+from typing import Any, List, Optional
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import httpx
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.retrievers import BaseRetriever
+
+import services.chat_service as chat_module
+from main import app
+from services.pdf_service import pdf_service
+
+
+class StubChatModel(BaseChatModel):
+    """고정 지연 후 정해진 답변을 돌려주는 LLM 스텁"""
+
+    latency: float = 0.5
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="stub answer"))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="stub answer"))])
+
+
+class StubRetriever(BaseRetriever):
+    """고정 지연 후 정해진 문서를 돌려주는 검색기 스텁"""
+
+    latency: float = 0.05
+
+    def _get_relevant_documents(self, query: str, *,
+                                run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        time.sleep(self.latency)
+        return [Document(page_content="stub context", metadata={"page": 1, "source": "stub.pdf"})]
+
+    async def _aget_relevant_documents(self, query: str, *,
+                                       run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        await asyncio.sleep(self.latency)
+        return [Document(page_content="stub context", metadata={"page": 1, "source": "stub.pdf"})]
+
+
+def install_stubs(llm_latency: float, retriever_latency: float):
+    """채팅 서비스가 외부 API 대신 스텁을 사용하도록 바꿉니다."""
+    llm = StubChatModel(latency=llm_latency)
+    retriever = StubRetriever(latency=retriever_latency)
+    chat_module.ChatOpenAI = lambda **kwargs: llm
+    pdf_service.has_vectorstore = lambda filename=None: True
+    pdf_service.get_hybrid_retriever = lambda filename=None: retriever
+
+
+async def timed_chat(client: httpx.AsyncClient, i: int) -> float:
+    start = time.perf_counter()
+    response = await client.post("/chat", json={"message": f"질문 {i}", "session_id": f"bench-{i}"})
+    response.raise_for_status()
+    assert response.json()["success"], response.json()
+    return time.perf_counter() - start
+
+
+async def run(concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        single = await timed_chat(client, -1)
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(timed_chat(client, i) for i in range(concurrency)))
+        total = time.perf_counter() - start
+
+    print(f"단일 호출:            {single:.3f}s")
+    print(f"동시 {concurrency}개 호출 전체: {total:.3f}s  (단일 대비 {total / single:.2f}배)")
+    print(f"개별 지연 최대/평균:   {max(latencies):.3f}s / {sum(latencies) / len(latencies):.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--retriever-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    install_stubs(args.llm_latency, args.retriever_latency)
+    asyncio.run(run(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+/chat 요청당 고정 비용 마이크로 벤치마크 (LLM 클라이언트/체인 재사용 전후)
+
+1. 요청마다 ChatOpenAI와 답변 체인을 새로 만드는 비용과, ChatService가 재사용하는 클라이언트/체인을
+   가져오는 비용을 비교합니다 (네트워크 호출 없음).
+2. 로컬 HTTP 서버에 요청을 보내며 요청마다 새 HTTP 클라이언트를 쓰는 경우와 연결 풀을 공유하는 경우의
+   요청당 지연 시간과 새로 연 연결 수를 비교합니다. 로컬 TCP라 TLS 핸드셰이크(원격 API에서 수십 ms)는
+   포함되지 않으므로, 실제 차이는 이보다 큽니다.
+
+사용법:
+    python -m benchmarks.bench_chat_overhead --requests 200
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from services.chat_service import ChatService
+
+
+def measure_construction(requests: int):
+    service = ChatService()
+    start = time.perf_counter()
+    for _ in range(requests):
+        llm = ChatOpenAI(model=service.model_name, temperature=service.temperature,
+                         openai_api_key="sk-benchmark", streaming=False)
+        service._create_answer_chain(llm)
+    before = (time.perf_counter() - start) / requests
+
+    service._get_answer_chain()  # 첫 요청에서 한 번 생성
+    start = time.perf_counter()
+    for _ in range(requests):
+        service._get_answer_chain()
+    after = (time.perf_counter() - start) / requests
+    return before, after
+
+
+async def measure_connections(requests: int):
+    connections = 0
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        nonlocal connections
+        connections += 1
+        try:
+            while True:
+                # 요청 헤더 끝까지 읽고 작은 JSON 응답 (keep-alive)
+                await reader.readuntil(b"\r\n\r\n")
+                body = b'{"ok": true}'
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/v1/chat/completions"
+    results = {}
+    async with server:
+        start = time.perf_counter()
+        for _ in range(requests):
+            async with httpx.AsyncClient() as client:
+                (await client.post(url, json={})).raise_for_status()
+        results["new client per request"] = ((time.perf_counter() - start) / requests, connections)
+
+        connections = 0
+        async with httpx.AsyncClient(limits=httpx.Limits(max_keepalive_connections=20)) as client:
+            start = time.perf_counter()
+            for _ in range(requests):
+                (await client.post(url, json={})).raise_for_status()
+            results["pooled client"] = ((time.perf_counter() - start) / requests, connections)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    before, after = measure_construction(args.requests)
+    print(f"LLM 클라이언트 + 답변 체인 준비 (요청 {args.requests}개)")
+    print(f"  요청마다 생성: {before * 1000:8.3f} ms/요청")
+    print(f"  재사용:       {after * 1000:8.3f} ms/요청")
+
+    print("로컬 HTTP 요청 (TLS 제외)")
+    for name, (latency, connections) in asyncio.run(measure_connections(args.requests)).items():
+        print(f"  {name:<24} {latency * 1000:8.3f} ms/요청, 새 연결 {connections}개")
+
+
+if __name__ == "__main__":
+    main()
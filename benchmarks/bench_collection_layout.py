@@ -0,0 +1,118 @@
+"""
+컬렉션 배치 방식 벤치마크 (파일별 컬렉션 vs 공유 컬렉션)
+
+문서 N개 x 청크 M개의 임의 벡터를 chromadb에 직접 넣고, 배치 방식별로 디스크 사용량,
+프로세스 RSS, 한 문서 범위 질의 지연 시간(파일별 컬렉션 vs doc_id 필터), 전체 문서 질의 지연 시간
+(컬렉션 N개 순회 vs 질의 1회)을 측정합니다. 배치 방식마다 별도 프로세스에서 실행해 메모리를 분리합니다.
+
+사용법:
+    python -m benchmarks.bench_collection_layout --documents 1000 --chunks 20
+"""
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+DIMENSION = 384
+
+
+def directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000)
+
+
+def run_layout(layout: str, documents: int, chunks: int, queries: int, path: str):
+    import chromadb
+    from chromadb.config import Settings as ChromaSettings
+
+    rng = np.random.default_rng(0)
+    client = chromadb.PersistentClient(path=path, settings=ChromaSettings(anonymized_telemetry=False))
+    names = [f"doc{i:05d}" for i in range(documents)]
+
+    start = time.perf_counter()
+    if layout == "shared":
+        collection = client.create_collection("documents", metadata={"hnsw:space": "cosine"})
+        for name in names:
+            collection.add(ids=[f"{name}:{j}" for j in range(chunks)],
+                           embeddings=rng.standard_normal((chunks, DIMENSION)).astype(np.float32),
+                           documents=[f"{name} chunk {j}" for j in range(chunks)],
+                           metadatas=[{"doc_id": name}] * chunks)
+    else:
+        for name in names:
+            client.create_collection(name, metadata={"hnsw:space": "cosine"}).add(
+                ids=[str(j) for j in range(chunks)],
+                embeddings=rng.standard_normal((chunks, DIMENSION)).astype(np.float32),
+                documents=[f"{name} chunk {j}" for j in range(chunks)])
+    ingest = time.perf_counter() - start
+
+    # 재시작 후 측정 (새 클라이언트는 컬렉션을 처음 열 때 로드)
+    del client
+    client = chromadb.PersistentClient(path=path, settings=ChromaSettings(anonymized_telemetry=False))
+    vectors = rng.standard_normal((queries, DIMENSION)).astype(np.float32)
+    targets = rng.choice(names, queries)
+
+    single = []
+    for vector, name in zip(vectors, targets):
+        start = time.perf_counter()
+        if layout == "shared":
+            client.get_collection("documents").query(query_embeddings=[vector], n_results=3, where={"doc_id": name})
+        else:
+            client.get_collection(name).query(query_embeddings=[vector], n_results=3)
+        single.append(time.perf_counter() - start)
+
+    fan_out = []
+    for vector in vectors[:max(1, queries // 20)]:
+        start = time.perf_counter()
+        if layout == "shared":
+            client.get_collection("documents").query(query_embeddings=[vector], n_results=5)
+        else:
+            for name in names:
+                client.get_collection(name).query(query_embeddings=[vector], n_results=5)
+        fan_out.append(time.perf_counter() - start)
+
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{layout:<9} {ingest:>8.1f} {directory_size(path) / 1e6:>8.1f} {rss_mb:>8.0f} "
+          f"{percentile_ms(single, 50):>7.2f}/{percentile_ms(single, 95):<7.2f} "
+          f"{percentile_ms(fan_out, 50):>9.1f}/{percentile_ms(fan_out, 95):<9.1f}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--layout", choices=["per_file", "shared"], help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.layout:
+        run_layout(args.layout, args.documents, args.chunks, args.queries, args.path)
+        return
+
+    print(f"문서 {args.documents}개 x 청크 {args.chunks}개, {DIMENSION}차원, 질의 {args.queries}개 (지연 시간 ms, p50/p95)")
+    print(f"{'layout':<9} {'ingest s':>8} {'disk MB':>8} {'RSS MB':>8} {'one document':>15} {'all documents':>19}")
+    for layout in ["per_file", "shared"]:
+        path = tempfile.mkdtemp(prefix=f"bench-{layout}-")
+        try:
+            subprocess.run([sys.executable, "-m", "benchmarks.bench_collection_layout", "--layout", layout,
+                            "--path", path, "--documents", str(args.documents), "--chunks", str(args.chunks),
+                            "--queries", str(args.queries)], check=True,
+                           env={**os.environ, "ANONYMIZED_TELEMETRY": "False"})
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
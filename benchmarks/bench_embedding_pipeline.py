@@ -0,0 +1,130 @@
+"""
+임베딩 파이프라인 처리량 벤치마크
+
+OpenAI 임베딩 API를 흉내 내는 로컬 서버(요청당 고정 지연 + 항목당 지연, 동시 요청 한도 초과 시 429)를
+띄운 뒤, 배치 크기와 동시성을 바꿔 가며 EmbeddingPipeline의 초당 처리 청크 수를 측정합니다.
+
+사용법:
+    python -m benchmarks.bench_embedding_pipeline --chunks 2000 --concurrency 1 2 4 8 --batch-size 16 64 256
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+import zlib
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import numpy as np
+import uvicorn
+from langchain.schema import Document
+from langchain_openai import OpenAIEmbeddings
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from services.embedding_pipeline import EmbeddingPipeline
+
+
+def create_fake_server(dimensions: int, request_latency: float, item_latency: float, max_in_flight: int) -> Starlette:
+    """/v1/embeddings 엔드포인트를 흉내 내는 Starlette 앱을 만듭니다."""
+    state = {"in_flight": 0, "rate_limited": 0}
+
+    async def embeddings(request: Request):
+        body = await request.json()
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        if state["in_flight"] >= max_in_flight:
+            state["rate_limited"] += 1
+            return JSONResponse({"error": {"message": "Rate limit reached", "type": "requests"}},
+                                status_code=429, headers={"retry-after": "0.2"})
+        state["in_flight"] += 1
+        try:
+            await asyncio.sleep(request_latency + item_latency * len(inputs))
+        finally:
+            state["in_flight"] -= 1
+        data = []
+        for i, text in enumerate(inputs):
+            rng = np.random.default_rng(zlib.crc32(str(text).encode()))
+            data.append({"object": "embedding", "index": i, "embedding": rng.standard_normal(dimensions).tolist()})
+        return JSONResponse({"object": "list", "data": data, "model": body.get("model"),
+                             "usage": {"prompt_tokens": 0, "total_tokens": 0}})
+
+    app = Starlette(routes=[Route("/v1/embeddings", embeddings, methods=["POST"])])
+    app.state.stats = state
+    return app
+
+
+def start_server(app: Starlette) -> int:
+    """빈 포트에서 서버를 백그라운드 스레드로 실행하고 포트를 반환합니다."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return port
+
+
+def make_chunks(count: int) -> list:
+    words = "검색 증강 생성 문서 임베딩 벡터 청크 retrieval augmented generation pipeline".split()
+    rng = np.random.default_rng(0)
+    return [Document(page_content=" ".join(rng.choice(words, 150)) + f" #{i}", metadata={"page": i})
+            for i in range(count)]
+
+
+async def measure(embeddings, chunks, batch_size: int, concurrency: int):
+    pipeline = EmbeddingPipeline(embeddings, batch_size=batch_size, batch_tokens=10**9, concurrency=concurrency)
+
+    async def sink(batch, vectors):
+        assert len(batch) == len(vectors)
+
+    start = time.perf_counter()
+    embedded = await pipeline.run(chunks, sink)
+    elapsed = time.perf_counter() - start
+    return embedded / elapsed, elapsed, pipeline.rate_limited_count
+
+
+async def run_grid(embeddings, chunks, batch_sizes, concurrencies):
+    # 임베딩 클라이언트의 커넥션 풀이 하나의 이벤트 루프에 묶이므로 모든 측정을 같은 루프에서 실행
+    for batch_size in batch_sizes:
+        for concurrency in concurrencies:
+            rate, elapsed, rate_limited = await measure(embeddings, chunks, batch_size, concurrency)
+            print(f"{batch_size:>6} {concurrency:>5} {rate:>10.1f} {elapsed:>8.2f}s {rate_limited:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--request-latency", type=float, default=0.15, help="요청당 고정 지연(초)")
+    parser.add_argument("--item-latency", type=float, default=0.001, help="항목당 추가 지연(초)")
+    parser.add_argument("--server-max-in-flight", type=int, default=6, help="초과 시 429를 돌려주는 동시 요청 수")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    app = create_fake_server(args.dimensions, args.request_latency, args.item_latency, args.server_max_in_flight)
+    port = start_server(app)
+    embeddings = OpenAIEmbeddings(
+        model="text-embedding-3-large",
+        dimensions=args.dimensions,
+        base_url=f"http://127.0.0.1:{port}/v1",
+        check_embedding_ctx_length=False,
+        max_retries=0
+    )
+    chunks = make_chunks(args.chunks)
+
+    print(f"청크 {args.chunks}개, 요청 지연 {args.request_latency}s + 항목당 {args.item_latency}s, "
+          f"서버 동시 한도 {args.server_max_in_flight}")
+    print(f"{'batch':>6} {'conc':>5} {'chunks/s':>10} {'elapsed':>9} {'429s':>6}")
+    asyncio.run(run_grid(embeddings, chunks, args.batch_size, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+하이브리드 검색 융합 방식 벤치마크
+
+주제(벡터 중심점)와 주제어를 가진 합성 청크를 Chroma와 BM25Index에 넣고, 질의마다 정답(같은 주제이면서
+질의 단어를 포함한 청크, 두 단어 모두 포함하면 가중치 2)을 정해 융합 방식별 nDCG@k, recall@k와
+질의당 지연 시간을 측정합니다. 벡터 검색은 주제만, 키워드 검색은 단어만 맞히므로 둘을 합쳐야 정답에 가까워집니다.
+
+비교 대상:
+    vector / bm25        : 한쪽 검색만 (k개)
+    ensemble             : 기존 EnsembleRetriever (검색기별 k개, 가중 RRF)
+    rrf / minmax / zscore: HybridFusionRetriever (검색기별 --fetch-k개를 동시에 검색 후 융합)
+
+사용법:
+    python -m benchmarks.bench_hybrid_fusion --chunks 5000 --queries 300 --fetch-k 20
+"""
+import argparse
+import math
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+from langchain.retrievers import EnsembleRetriever
+from langchain_chroma import Chroma
+from langchain_core.embeddings import Embeddings
+
+from services.bm25_index import BM25Index, BM25IndexRetriever
+from services.hybrid_fusion import FUSION_MODES, HybridFusionRetriever, fuse
+
+DIMENSION = 64
+
+
+class LookupEmbeddings(Embeddings):
+    """미리 만들어 둔 텍스트별 벡터를 돌려주는 임베딩 (원격 호출 없이 검색 품질만 비교)"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.vectors[text] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.vectors[text]
+
+
+def make_corpus(rng, chunks: int, topics: int, vocabulary: int, words: int, noise: float, shared_pool: int):
+    centroids = rng.standard_normal((topics, DIMENSION))
+    # 주제마다 자주 쓰는 단어 묶음 - 공용 단어 풀에서 뽑으므로 같은 단어가 여러 주제에 나옴
+    topic_words = [rng.choice(shared_pool, 200, replace=False) for _ in range(topics)]
+    chunk_topics = rng.integers(0, topics, chunks)
+    texts, word_sets, vectors = [], [], {}
+    for i, topic in enumerate(chunk_topics):
+        own = rng.choice(topic_words[topic], words // 2)
+        background = np.minimum(rng.zipf(1.3, words - words // 2), vocabulary) - 1
+        tokens = [f"w{w}" for w in np.concatenate([own, background])]
+        text = " ".join(tokens) + f" c{i}"
+        texts.append(text)
+        word_sets.append(set(tokens))
+        vectors[text] = (centroids[topic] + noise * rng.standard_normal(DIMENSION)).tolist()
+    return texts, word_sets, chunk_topics, centroids, topic_words, vectors
+
+
+def make_queries(rng, count, centroids, topic_words, vectors, noise):
+    queries = []
+    while len(queries) < count:
+        topic = int(rng.integers(0, len(centroids)))
+        words = [f"w{w}" for w in rng.choice(topic_words[topic], 2, replace=False)]
+        query = " ".join(words)
+        if query in vectors:
+            continue
+        vectors[query] = (centroids[topic] + noise * rng.standard_normal(DIMENSION)).tolist()
+        queries.append((query, topic, words))
+    return queries
+
+
+def gains(query_topic, query_words, chunk_topics, word_sets):
+    graded = {}
+    for i, (topic, word_set) in enumerate(zip(chunk_topics, word_sets)):
+        if topic == query_topic:
+            matched = sum(word in word_set for word in query_words)
+            if matched:
+                graded[f"id{i}"] = matched
+    return graded
+
+
+def ndcg(ranked_ids, graded, k):
+    dcg = sum(graded.get(doc_id, 0) / math.log2(rank + 2) for rank, doc_id in enumerate(ranked_ids[:k]))
+    ideal = sorted(graded.values(), reverse=True)[:k]
+    idcg = sum(gain / math.log2(rank + 2) for rank, gain in enumerate(ideal))
+    return dcg / idcg if idcg else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--topics", type=int, default=50)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=40)
+    parser.add_argument("--noise", type=float, default=0.8)
+    parser.add_argument("--shared-pool", type=int, default=1000, help="주제어를 뽑는 공용 단어 수 (작을수록 키워드가 모호)")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--fetch-k", type=int, default=20)
+    parser.add_argument("--weight", type=float, default=0.7, help="벡터 검색 가중치 (HYBRID_SEARCH_WEIGHT)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    texts, word_sets, chunk_topics, centroids, topic_words, vectors = make_corpus(
+        rng, args.chunks, args.topics, args.vocabulary, args.words, args.noise, args.shared_pool)
+    queries = make_queries(rng, args.queries, centroids, topic_words, vectors, args.noise)
+    ids = [f"id{i}" for i in range(len(texts))]
+
+    with tempfile.TemporaryDirectory() as path:
+        vectorstore = Chroma(collection_name="fusion-bench", embedding_function=LookupEmbeddings(vectors),
+                             persist_directory=path, collection_metadata={"hnsw:space": "cosine"})
+        for start in range(0, len(texts), 1000):
+            vectorstore.add_texts(texts[start:start + 1000], ids=ids[start:start + 1000])
+        index = BM25Index.build(ids, texts, tokenizer="whitespace")
+        weights = [args.weight, 1 - args.weight]
+
+        bm25 = BM25IndexRetriever(index=index, vectorstore=vectorstore, k=args.k)
+        retrievers = {
+            "vector": vectorstore.as_retriever(search_kwargs={"k": args.k}),
+            "bm25": bm25,
+            "ensemble": EnsembleRetriever(retrievers=[vectorstore.as_retriever(search_kwargs={"k": args.k}), bm25],
+                                          weights=weights),
+        }
+        for mode in FUSION_MODES:
+            retrievers[mode] = HybridFusionRetriever(vectorstore=vectorstore, index=index, mode=mode, weights=weights,
+                                                     vector_k=args.fetch_k, keyword_k=args.fetch_k, k=args.k)
+
+        # 본문 -> ID (EnsembleRetriever/as_retriever 결과에는 ID가 없을 수 있음)
+        id_by_text = dict(zip(texts, ids))
+        print(f"청크 {args.chunks}개, 주제 {args.topics}개, 질의 {args.queries}개, k={args.k}, fetch_k={args.fetch_k}, "
+              f"벡터 가중치 {args.weight}")
+        print(f"{'mode':<9} {f'nDCG@{args.k}':>8} {f'recall@{args.k}':>9} {'p50 ms':>8} {'p95 ms':>8}")
+        for name, retriever in retrievers.items():
+            retriever.invoke(queries[0][0])  # 워밍업
+            scores, recalls, latencies = [], [], []
+            for query, topic, words in queries:
+                graded = gains(topic, words, chunk_topics, word_sets)
+                start = time.perf_counter()
+                documents = retriever.invoke(query)
+                latencies.append(time.perf_counter() - start)
+                ranked = [id_by_text[doc.page_content] for doc in documents][:args.k]
+                scores.append(ndcg(ranked, graded, args.k))
+                recalls.append(sum(doc_id in graded for doc_id in ranked) / min(args.k, len(graded) or 1))
+            print(f"{name:<9} {np.mean(scores):>8.3f} {np.mean(recalls):>9.3f} "
+                  f"{np.percentile(latencies, 50) * 1000:>8.2f} {np.percentile(latencies, 95) * 1000:>8.2f}")
+
+        # 융합 단계 자체의 비용 (검색기별 fetch_k개 후보)
+        vector_hits = [(f"id{i}", 1 - i / 100) for i in range(args.fetch_k)]
+        keyword_hits = [(f"id{i * 2}", 20.0 - i) for i in range(args.fetch_k)]
+        for mode in FUSION_MODES:
+            start = time.perf_counter()
+            for _ in range(1000):
+                fuse([vector_hits, keyword_hits], weights, mode)
+            print(f"fuse({mode}) {(time.perf_counter() - start) * 1000:.1f}us/call")
+
+
+if __name__ == "__main__":
+    main()
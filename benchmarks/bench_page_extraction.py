@@ -0,0 +1,112 @@
+"""
+PDF 페이지 추출 벤치마크
+
+여러 단락과 표가 있는 합성 PDF(또는 --pdf로 지정한 샘플 문서)에 대해
+1) 기존 방식(get_text 여러 번 + 모든 페이지 find_tables)과 단일 파싱 방식의 페이지당 처리 시간,
+2) 단일 프로세스와 워커 프로세스 풀의 초당 처리 페이지 수를 비교합니다.
+
+사용법:
+    python -m benchmarks.bench_page_extraction --pages 200 --workers 1 2 4 8
+    python -m benchmarks.bench_page_extraction --pdf samples/*.pdf --workers 1
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import fitz
+
+from config.settings import settings
+from services import page_extraction
+from services.document_processor import enhanced_processor
+
+
+def make_pdf(path: str, pages: int):
+    """페이지마다 머리글/바닥글, 본문 단락, 간단한 표가 있는 PDF를 만듭니다."""
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 40), "Benchmark Report - Confidential", fontsize=9)
+        y = 90
+        for paragraph in range(12):
+            page.insert_text((72, y), f"{paragraph + 1}. Retrieval augmented generation section {page_num}", fontsize=13)
+            y += 18
+            for line in range(2):
+                page.insert_text((72, y), "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+                                          "tempor incididunt ut labore.", fontsize=10)
+                y += 13
+        if page_num % 4 == 0:
+            # 네 페이지마다 선으로 그린 표
+            for row in range(4):
+                for col in range(3):
+                    cell = fitz.Rect(72 + col * 120, y + row * 18, 192 + col * 120, y + (row + 1) * 18)
+                    page.draw_rect(cell)
+                    page.insert_text((cell.x0 + 4, cell.y1 - 5), f"R{row}C{col}", fontsize=9)
+        else:
+            for row in range(4):
+                page.insert_text((72, y + row * 14), f"Item{row}    {row * 10}    {row * 3.5}    OK", fontsize=10)
+        page.insert_text((280, 820), f"{page_num + 1}", fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def measure_parsing(path: str, single_pass: bool) -> float:
+    """한 프로세스에서 페이지당 평균 추출 시간(ms)을 잽니다."""
+    settings.SINGLE_PASS_PAGE_PARSING = single_pass
+    with fitz.open(path) as doc:
+        start = time.perf_counter()
+        for page_num, page in enumerate(doc):
+            page_extraction.extract_page_content(page, page_num + 1, os.path.basename(path))
+        return (time.perf_counter() - start) * 1000 / len(doc)
+
+
+def measure(path: str, workers: int) -> float:
+    settings.PDF_EXTRACTION_WORKERS = workers
+    settings.PARALLEL_PAGE_EXTRACTION = workers > 1
+    if page_extraction._extraction_pool is not None:
+        page_extraction._extraction_pool.shutdown()
+        page_extraction._extraction_pool = None
+    if workers > 1:
+        # 워커 프로세스 기동 비용은 서버 수명 동안 한 번이므로 측정에서 제외
+        pool = page_extraction._get_extraction_pool()
+        for future in [pool.submit(os.getpid) for _ in range(workers)]:
+            future.result()
+    start = time.perf_counter()
+    pages = enhanced_processor._extract_pages(path, "bench.pdf")
+    elapsed = time.perf_counter() - start
+    return len(pages) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--pdf", nargs="*", default=[], help="합성 PDF 대신 측정할 샘플 문서")
+    args = parser.parse_args()
+
+    settings.PARALLEL_EXTRACTION_MIN_PAGES = 1
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = args.pdf
+        if not paths:
+            paths = [os.path.join(tmp, "bench.pdf")]
+            make_pdf(paths[0], args.pages)
+
+        print(f"{'document':<30} {'legacy ms/p':>12} {'single ms/p':>12} {'speedup':>8}")
+        for path in paths:
+            legacy = measure_parsing(path, single_pass=False)
+            single = measure_parsing(path, single_pass=True)
+            print(f"{os.path.basename(path)[:30]:<30} {legacy:>12.2f} {single:>12.2f} {legacy / single:>7.2f}x")
+
+        print(f"\n페이지 병렬 추출 (CPU {os.cpu_count()}개, 단일 파싱)")
+        print(f"{'workers':>8} {'pages/s':>10} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            rate = measure(paths[0], workers)
+            baseline = baseline or rate
+            print(f"{workers:>8} {rate:>10.1f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
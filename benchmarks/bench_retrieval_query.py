@@ -0,0 +1,100 @@
+"""
+검색 질의 구성 방식 벤치마크 (이전 대화를 붙인 질의 vs 현재 질문만)
+
+합성 한국어 청크로 BM25Index를 만들고, 인기 질문(지프 분포)을 여러 턴 주고받는 대화를 ChatService의
+세션/컨텍스트 구성 그대로 재현합니다. 검색 질의 구성 방식(history, question)별로 다음을 측정합니다.
+
+    embed tokens : 검색 질의 임베딩에 들어가는 토큰 수 (턴당 평균, cl100k_base - 불러올 수 없으면 근사치)
+    bm25 ms      : BM25 검색 지연 시간 p50/p95
+    top1 hit     : 1위 청크가 현재 질문의 명사를 모두 포함하는 비율
+    cache hit    : 검색 결과 캐시(정규화 질의 기준) 적중률
+
+condensed 모드는 LLM 호출이 필요하므로 여기서는 측정하지 않습니다 (질의 길이는 question과 비슷합니다).
+
+사용법:
+    python -m benchmarks.bench_retrieval_query --sessions 200 --turns 8
+"""
+import argparse
+import time
+
+import numpy as np
+import tiktoken
+
+from benchmarks.bench_tokenizer import make_corpus, make_nouns
+from services.bm25_index import BM25Index
+from services.chat_service import ChatService
+from services.query_cache import QueryCache
+
+
+def make_questions(rng, nouns, count: int):
+    """중간 빈도 명사 두 개로 이루어진 질문과 그 명사 목록을 만듭니다."""
+    questions = []
+    for _ in range(count):
+        picked = list(rng.choice(nouns[20:500], 2, replace=False))
+        questions.append((f"{picked[0]}의 {picked[1]}에 대해 알려주세요", picked))
+    return questions
+
+
+def token_counter():
+    """tiktoken 인코딩을 불러오지 못하면(오프라인) 근사치(한글 음절당 1토큰, 그 외 4자당 1토큰)를 사용합니다."""
+    try:
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return "cl100k_base", lambda text: len(encoding.encode(text))
+    except Exception:
+        def approximate(text: str) -> int:
+            hangul = sum(1 for char in text if "가" <= char <= "힣")
+            return hangul + (len(text) - hangul + 3) // 4
+        return "approximate", approximate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--questions", type=int, default=100, help="인기 질문 풀 크기")
+    parser.add_argument("--answer-words", type=int, default=80, help="어시스턴트 답변 길이(어절)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    nouns = make_nouns(rng, 5000)
+    texts, noun_sets = make_corpus(rng, nouns, args.chunks, 60)
+    index = BM25Index.build([str(i) for i in range(len(texts))], texts, tokenizer="korean_josa")
+    answers, _ = make_corpus(rng, nouns, 500, args.answer_words)
+    questions = make_questions(rng, nouns, args.questions)
+    counter_name, count_tokens = token_counter()
+
+    # 대화 재현: 세션마다 인기 질문을 지프 분포로 골라 턴을 진행하며 검색 질의를 기록
+    chat = ChatService()
+    turns = []  # (history 질의, question 질의, 질문 명사)
+    for session in range(args.sessions):
+        session_id = f"s{session}"
+        for _ in range(args.turns):
+            question, picked = questions[min(int(rng.zipf(1.5)), len(questions)) - 1]
+            contextual_query = chat._prepare_query(session_id, question)
+            turns.append((contextual_query, question, picked))
+            chat.add_message_to_session(session_id, "assistant", answers[int(rng.integers(len(answers)))])
+
+    print(f"청크 {args.chunks}개, 대화 {args.sessions}개 x {args.turns}턴, 인기 질문 {args.questions}개, 토큰 수: {counter_name}")
+    print(f"{'mode':<9} {'embed tokens':>12} {'bm25 ms':>15} {'top1 hit':>9} {'cache hit':>9}")
+    for mode, position in (("history", 0), ("question", 1)):
+        cache = QueryCache(max_entries=1024, ttl=3600)
+        tokens, latencies, hits = [], [], 0
+        for turn in turns:
+            query, picked = turn[position], turn[2]
+            tokens.append(count_tokens(query))
+            key = QueryCache.make_key(query, {"manual": 1})
+            if cache.get(key) is None:
+                cache.put(key, True)
+            start = time.perf_counter()
+            results = index.search(query, k=3)
+            latencies.append(time.perf_counter() - start)
+            if results and set(picked) <= noun_sets[int(results[0][0])]:
+                hits += 1
+        print(f"{mode:<9} {np.mean(tokens):>12.0f} "
+              f"{np.percentile(latencies, 50) * 1000:>7.2f}/{np.percentile(latencies, 95) * 1000:<7.2f} "
+              f"{hits / len(turns):>9.1%} {cache.stats()['hit_ratio']:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+BM25 토크나이저 비교 벤치마크
+
+조사가 붙은 한국어 어절로 이루어진 합성 청크를 만들고, 토크나이저(whitespace, korean_josa,
+korean_bigram)별로 어휘 크기, 인덱스 크기, 색인 시간(캐시 없음/있음), 질의 지연 시간과
+정확도(조사 없는 명사 질의의 1위 결과가 질의 명사를 모두 포함하는 비율)를 측정합니다.
+
+사용법:
+    python -m benchmarks.bench_tokenizer --chunks 20000 --queries 300
+"""
+import argparse
+import time
+
+import numpy as np
+
+from services.bm25_index import BM25Index
+from services.tokenizers import _korean_bigram_tokens, _korean_josa_tokens
+
+SYLLABLES = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후기니디리미비시이지치키티피히"
+JOSA = ["은", "는", "을", "를", "의", "에", "에서", "으로", "로", "와", "과", "도", "만", "까지", "부터", "에게", "처럼", "입니다"]
+
+
+def make_nouns(rng, count: int):
+    nouns = set()
+    while len(nouns) < count:
+        length = rng.integers(2, 4)
+        nouns.add("".join(rng.choice(list(SYLLABLES), length)))
+    return sorted(nouns)
+
+
+def make_corpus(rng, nouns, chunks: int, words: int):
+    """청크 텍스트와 청크별 (조사를 뗀) 명사 집합을 만듭니다."""
+    texts, noun_sets = [], []
+    for _ in range(chunks):
+        picked = [nouns[i] for i in np.minimum(rng.zipf(1.3, words), len(nouns)) - 1]
+        tokens = [noun + (rng.choice(JOSA) if rng.random() < 0.7 else "") for noun in picked]
+        texts.append(" ".join(tokens))
+        noun_sets.append(set(picked))
+    return texts, noun_sets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--words", type=int, default=60)
+    parser.add_argument("--nouns", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    nouns = make_nouns(rng, args.nouns)
+    texts, noun_sets = make_corpus(rng, nouns, args.chunks, args.words)
+    ids = [str(i) for i in range(len(texts))]
+    # 중간 빈도 명사 두 개로 질의 (조사 없이)
+    queries = [list(rng.choice(nouns[20:500], 2, replace=False)) for _ in range(args.queries)]
+
+    print(f"청크 {args.chunks}개 x {args.words} 어절, 질의 {args.queries}개")
+    print(f"{'tokenizer':<14} {'vocab':>8} {'index MB':>9} {'build s':>8} {'cached s':>9} "
+          f"{'query ms':>9} {'top1 hit':>9}")
+    for tokenizer in ["whitespace", "korean_josa", "korean_bigram"]:
+        _korean_josa_tokens.cache_clear()
+        _korean_bigram_tokens.cache_clear()
+        start = time.perf_counter()
+        index = BM25Index.build(ids, texts, tokenizer=tokenizer)
+        build = time.perf_counter() - start
+        # 재색인(문서 개정 등) 시에는 청크별 토큰화 결과를 캐시에서 재사용
+        start = time.perf_counter()
+        BM25Index.build(ids, texts, tokenizer=tokenizer)
+        cached = time.perf_counter() - start
+
+        latencies, hits = [], 0
+        for query_nouns in queries:
+            start = time.perf_counter()
+            results = index.search(" ".join(query_nouns), k=3)
+            latencies.append(time.perf_counter() - start)
+            if results and set(query_nouns) <= noun_sets[int(results[0][0])]:
+                hits += 1
+        print(f"{tokenizer:<14} {len(index.vocabulary):>8} {index.nbytes / 1e6:>9.1f} {build:>8.2f} {cached:>9.2f} "
+              f"{np.median(latencies) * 1000:>9.2f} {hits / len(queries):>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,9 +22,20 @@ class Settings:
     
     # 파일 업로드 설정
     MAX_FILE_SIZE: int = 20 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 업로드를 디스크에 기록하는 청크 크기 (1MB)
+    MULTIPART_OVERHEAD: int = 64 * 1024  # multipart 헤더/경계 문자열 허용치
     UPLOAD_DIR: str = "uploads"
     ALLOWED_CONTENT_TYPES: List[str] = ["application/pdf"]
     
+    # 백그라운드 인제스트 설정
+    INGESTION_WORKERS: int = int(os.getenv("INGESTION_WORKERS", "2"))  # 동시에 처리할 PDF 수
+    INGESTION_QUEUE_SIZE: int = int(os.getenv("INGESTION_QUEUE_SIZE", "10"))  # 대기열 최대 크기 (초과 시 429)
+    INGESTION_JOB_HISTORY: int = 100  # 메모리에 보관할 완료된 작업 수
+    EMBEDDING_BATCH_SIZE: int = 100  # 배치당 최대 청크 수
+    EMBEDDING_BATCH_TOKENS: int = 50000  # 배치당 최대 토큰 수
+    EMBEDDING_CONCURRENCY: int = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))  # 동시에 보내는 임베딩 배치 수
+    EMBEDDING_MAX_RETRIES: int = 6  # 레이트 리밋(429) 시 배치당 재시도 횟수
+    
     # 텍스트 분할 설정
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
@@ -41,17 +52,99 @@ class Settings:
     EXTRACT_IMAGES: bool = True
     MIN_TEXT_LENGTH: int = 50  # 최소 텍스트 길이
     
+    # 페이지 병렬 추출 설정 (PyMuPDF 파싱을 여러 프로세스로 분산)
+    PARALLEL_PAGE_EXTRACTION: bool = True
+    PDF_EXTRACTION_WORKERS: int = int(os.getenv("PDF_EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+    PARALLEL_EXTRACTION_MIN_PAGES: int = 16  # 이 페이지 수 미만이면 단일 프로세스로 처리
+    PDF_EXTRACTION_PAGES_PER_TASK: int = 8  # 워커 하나가 한 번에 처리할 페이지 수
+    SINGLE_PASS_PAGE_PARSING: bool = True  # 페이지당 한 번의 get_text("dict") 파싱으로 텍스트/섹션/테이블 감지
+    FIND_RULED_TABLES: bool = False  # 단일 파싱 모드에서도 선이 그려진 페이지는 find_tables로 표를 다시 찾음 (페이지 재파싱)
+    
+    # 벡터스토어 설정 (열린 컬렉션은 LRU로 개수/BM25 인덱스 메모리 한도 안에서 유지)
+    CHROMA_PERSIST_DIRECTORY: str = "./chroma_db"
+    COLLECTION_MODE: str = os.getenv("COLLECTION_MODE", "per_file")  # per_file: 파일별 컬렉션, shared: 공유 컬렉션 + doc_id 필터
+    SHARED_COLLECTION_NAME: str = "documents"
+    COLLECTION_CACHE_MAX_COLLECTIONS: int = int(os.getenv("COLLECTION_CACHE_MAX_COLLECTIONS", "32"))
+    COLLECTION_CACHE_MAX_BYTES: int = int(os.getenv("COLLECTION_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))  # 열린 컬렉션의 BM25 인덱스
+    # HNSW 벡터 세그먼트는 Chroma가 보관하므로 Chroma의 세그먼트 LRU 한도로 제한
+    CHROMA_MEMORY_LIMIT_BYTES: int = int(os.getenv("CHROMA_MEMORY_LIMIT_BYTES", str(512 * 1024 * 1024)))
+    
+    # 키워드(BM25) 검색 토크나이저: whitespace, korean_josa(조사 제거), korean_bigram(음절 바이그램)
+    BM25_TOKENIZER: str = os.getenv("BM25_TOKENIZER", "korean_josa")
+    QUERY_TOKENIZER_CACHE_SIZE: int = int(os.getenv("QUERY_TOKENIZER_CACHE_SIZE", "2048"))  # 질의별 토큰화 결과 캐시 크기
+    JOSA_STEM_CACHE_SIZE: int = 65536  # 어절별 조사 제거 결과 캐시 크기 (어절 단위라 수 MB 이내)
+    
     # 검색 설정
     SEARCH_K: int = 3  # 상위 검색 결과 개수
     HYBRID_SEARCH_WEIGHT: float = 0.7  # 유사도 검색 가중치 (1-weight는 키워드 검색)
+    HYBRID_FUSION_MODE: str = os.getenv("HYBRID_FUSION_MODE", "rrf")  # rrf, minmax, zscore
+    HYBRID_VECTOR_FETCH_K: int = 20  # 융합 전에 벡터 검색에서 가져오는 후보 수
+    HYBRID_KEYWORD_FETCH_K: int = 20  # 융합 전에 키워드 검색에서 가져오는 후보 수
+    RRF_K: int = 60  # RRF 순위 상수 (1 / (RRF_K + 순위))
+    
+    # 여러 컬렉션 통합 검색 설정
+    FEDERATED_PER_COLLECTION_K: int = 5  # 융합 결과에서 한 컬렉션이 차지할 수 있는 최대 문서 수
+    FEDERATED_SEARCH_TIMEOUT: float = float(os.getenv("FEDERATED_SEARCH_TIMEOUT", "2.0"))  # 전체 검색 시간 예산(초)
+    FEDERATED_MAX_CONCURRENCY: int = 8  # 동시에 검색하는 컬렉션 수
+    
+    # 질의 결과 캐시 설정 (정규화한 질의 + 컬렉션 + 컬렉션 버전 기준, 재처리 시 자동 무효화)
+    QUERY_CACHE_ENABLED: bool = os.getenv("QUERY_CACHE_ENABLED", "true").lower() == "true"  # 검색 결과 캐시
+    ANSWER_CACHE_ENABLED: bool = os.getenv("ANSWER_CACHE_ENABLED", "false").lower() == "true"  # 최종 답변 캐시
+    QUERY_CACHE_MAX_ENTRIES: int = 1024
+    QUERY_CACHE_TTL: float = float(os.getenv("QUERY_CACHE_TTL", "600"))  # 초
+    
+    # 의미 기반 답변 캐시 설정 (대화 첫 질문의 임베딩이 과거 질문과 충분히 비슷하면 저장된 답변 반환)
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))  # 코사인 유사도 하한
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 1000
+    SEMANTIC_CACHE_TTL: float = float(os.getenv("SEMANTIC_CACHE_TTL", "3600"))  # 초
     
     # 임베딩 설정
     EMBEDDING_MODEL: str = "text-embedding-3-large"  # OpenAI 임베딩 모델
     EMBEDDING_DIMENSIONS: int = 3072  # text-embedding-3-large 차원수
     
+    # 임베딩 캐시 설정 (모델, 차원, 텍스트 해시 기준 SQLite 캐시)
+    EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_PATH: str = "./cache/embeddings.sqlite3"
+    EMBEDDING_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024  # 1GB 초과 시 오래된 항목부터 제거
+    EMBEDDING_CACHE_ACCESS_FLUSH: int = 1000  # 조회한 항목의 마지막 사용 시각을 이 개수만큼 모아서 기록
+    
+    # 질의 임베딩 메모 설정 (같은 질의는 원격 임베딩 호출 없이 재사용, 0이면 사용 안 함)
+    QUERY_EMBEDDING_MEMO_SIZE: int = int(os.getenv("QUERY_EMBEDDING_MEMO_SIZE", "1024"))  # 메모리에 보관할 질의 수 (3072차원 기준 약 12MB)
+    QUERY_EMBEDDING_MEMO_PERSIST: bool = os.getenv("QUERY_EMBEDDING_MEMO_PERSIST", "false").lower() == "true"  # 임베딩 캐시 DB에도 저장
+    
     # LLM 설정
     MODEL_NAME: str = "gpt-4.1-mini"
     TEMPERATURE: float = 0.1
+    LLM_MAX_CONNECTIONS: int = 100  # 재사용하는 LLM 클라이언트의 최대 동시 연결 수
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20  # 유휴 상태로 유지하는 연결 수 (TLS 핸드셰이크 재사용)
+    LLM_KEEPALIVE_EXPIRY: float = 60.0  # 유휴 연결 유지 시간(초)
+    
+    # 세션 저장소 설정 (한도를 넘거나 오래 사용되지 않은 세션/메시지는 메모리에서 제거)
+    SESSION_MAX_SESSIONS: int = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))  # 최대 세션 수 (LRU 제거)
+    SESSION_IDLE_TTL: float = float(os.getenv("SESSION_IDLE_TTL", "7200"))  # 마지막 사용 후 유지 시간(초)
+    SESSION_MAX_MESSAGES: int = int(os.getenv("SESSION_MAX_MESSAGES", "50"))  # 세션당 보관하는 최근 메시지 수
+    SESSION_SWEEP_INTERVAL: float = 60.0  # 유휴 세션 정리 주기(초)
+    SESSION_BACKEND: str = os.getenv("SESSION_BACKEND", "memory")  # memory: 프로세스 메모리, sqlite: 여러 워커가 공유하는 SQLite(WAL) 파일
+    SESSION_DB_PATH: str = os.getenv("SESSION_DB_PATH", "./cache/sessions.sqlite3")
+    SESSION_DB_COMMIT_INTERVAL: float = 0.05  # 메시지 추가를 모아 커밋하는 주기(초) - 다른 워커에 보이기까지의 최대 지연
+    SESSION_DB_BATCH_SIZE: int = 64  # 이만큼 쌓이면 주기를 기다리지 않고 커밋
+    SESSION_REVISION_TTL: float = float(os.getenv("SESSION_REVISION_TTL", "1.0"))  # 캐시된 세션의 backend 리비전 확인을 재사용하는 시간(초) - 다른 워커의 변경이 보이기까지의 추가 지연
+    
+    # 프롬프트 토큰 예산 (이전 대화 + 검색 문서, 답변 모델 토크나이저 기준)
+    CONTEXT_TOKEN_BUDGET: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))
+    HISTORY_TOKEN_SHARE: float = float(os.getenv("HISTORY_TOKEN_SHARE", "0.3"))  # 이전 대화가 쓸 수 있는 최대 비율 (남는 만큼 검색 문서에 사용)
+    TOKEN_COUNT_CACHE_SIZE: int = 10000  # 메시지/청크별 토큰 수 캐시 크기
+    
+    # 대화 요약 설정 (최근 대화 예산에서 밀려난 메시지를 백그라운드에서 세션별 누적 요약에 반영, LLM 호출이 추가됨)
+    CONVERSATION_SUMMARY_ENABLED: bool = os.getenv("CONVERSATION_SUMMARY_ENABLED", "false").lower() == "true"
+    CONVERSATION_SUMMARY_MAX_TOKENS: int = 300  # 요약 최대 길이 (이전 대화 예산에서 미리 떼어 둠)
+    CONVERSATION_SUMMARY_MIN_MESSAGES: int = 4  # 밀려난 메시지가 이만큼 쌓이면 요약 (LLM 호출을 모아서 수행)
+    CONVERSATION_SUMMARY_QUEUE_SIZE: int = 1000  # 요약 대기열 최대 크기 (가득 차면 다음 턴에 다시 시도)
+    
+    # 검색 질의 구성: history(이전 대화 + 질문, 기본값), question(현재 질문만), condensed(LLM이 대화를 반영해 독립 질문으로 재작성)
+    # 이전 대화는 어느 모드에서든 답변 생성 프롬프트에 들어갑니다.
+    RETRIEVAL_QUERY_MODE: str = os.getenv("RETRIEVAL_QUERY_MODE", "history")
 
 
 settings = Settings()
\ No newline at end of file
@@ -6,13 +6,38 @@ interface UploadResponse {
   message: string;
   filename: string;
   size: number;
+  chunks: number;
 }
 
+interface JobStatus {
+  job_id: string;
+  filename: string;
+  stage: 'queued' | 'parsing' | 'embedding' | 'indexing' | 'completed' | 'failed';
+  total_pages: number | null;
+  pages_parsed: number;
+  total_chunks: number | null;
+  chunks_embedded: number;
+  result: UploadResponse | null;
+  error: string | null;
+}
+
+const STAGE_LABELS: Record<JobStatus['stage'], string> = {
+  queued: '대기 중',
+  parsing: '문서 분석 중',
+  embedding: '임베딩 생성 중',
+  indexing: '검색 인덱스 생성 중',
+  completed: '완료',
+  failed: '실패',
+};
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
 const PdfUploader: React.FC = () => {
   const [file, setFile] = useState<File | null>(null);
   const [uploading, setUploading] = useState(false);
   const [uploadSuccess, setUploadSuccess] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [job, setJob] = useState<JobStatus | null>(null);
   const fileInputRef = useRef<HTMLInputElement>(null);
 
   const handleFileSelect = (selectedFile: File) => {
@@ -29,6 +54,7 @@ const PdfUploader: React.FC = () => {
     setFile(selectedFile);
     setError(null);
     setUploadSuccess(false);
+    setJob(null);
   };
 
   const handleDrop = (e: React.DragEvent<HTMLDivElement>) => {
@@ -65,13 +91,31 @@ const PdfUploader: React.FC = () => {
         body: formData,
       });
 
+      if (response.status === 429) {
+        throw new Error('처리 대기 중인 파일이 많습니다. 잠시 후 다시 시도해주세요.');
+      }
       if (!response.ok) {
         throw new Error('업로드에 실패했습니다.');
       }
 
-      const result: UploadResponse = await response.json();
+      // 인제스트 작업이 끝날 때까지 진행 상황 조회
+      let currentJob: JobStatus = await response.json();
+      setJob(currentJob);
+      while (currentJob.stage !== 'completed' && currentJob.stage !== 'failed') {
+        await sleep(1000);
+        const jobResponse = await fetch(`http://localhost:8000/jobs/${currentJob.job_id}`);
+        if (!jobResponse.ok) {
+          throw new Error('처리 상태를 가져오지 못했습니다.');
+        }
+        currentJob = await jobResponse.json();
+        setJob(currentJob);
+      }
+
+      if (currentJob.stage === 'failed') {
+        throw new Error(currentJob.error || 'PDF 처리에 실패했습니다.');
+      }
       setUploadSuccess(true);
-      console.log('Upload successful:', result);
+      console.log('Upload successful:', currentJob.result);
     } catch (err) {
       setError(err instanceof Error ? err.message : '업로드 중 오류가 발생했습니다.');
     } finally {
@@ -83,6 +127,7 @@ const PdfUploader: React.FC = () => {
     setFile(null);
     setUploadSuccess(false);
     setError(null);
+    setJob(null);
     if (fileInputRef.current) {
       fileInputRef.current.value = '';
     }
@@ -145,6 +190,18 @@ const PdfUploader: React.FC = () => {
             </div>
           )}
 
+          {uploading && job && (
+            <div className="p-3 bg-blue-50 text-blue-700 rounded-lg text-sm space-y-1">
+              <p>{STAGE_LABELS[job.stage]}</p>
+              {job.total_pages !== null && (
+                <p className="text-xs">페이지 {job.pages_parsed} / {job.total_pages}</p>
+              )}
+              {job.total_chunks !== null && (
+                <p className="text-xs">청크 {job.chunks_embedded} / {job.total_chunks}</p>
+              )}
+            </div>
+          )}
+
           {error && (
             <div className="flex items-center gap-2 p-3 bg-red-50 text-red-700 rounded-lg">
               <span>⚠️</span>
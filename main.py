@@ -1,22 +1,59 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse
+from contextlib import asynccontextmanager
 import uvicorn
 import os
+import uuid
 import logging
-import traceback
 
 from config.settings import settings
-from schemas.models import ChatRequest, ChatResponse, ChatSession
-from services.pdf_service import pdf_service
+from schemas.models import ChatRequest, ChatResponse, ChatSession, JobStatus
 from services.chat_service import chat_service
+from services.pdf_service import pdf_service
+from services.federated_retriever import federated_retriever
+from services.ingestion_queue import ingestion_queue, QueueFullError
+from services.upload_service import spool_multipart_upload, UploadTooLargeError, InvalidUploadError
+from services.embedding_cache import get_embedding_cache_store, MemoizedQueryEmbeddings
+from services.tokenizers import tokenizer_cache_info
+from services.context_budget import token_count_cache_info
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 백그라운드 인제스트 워커, 유휴 세션 정리 작업과 대화 요약 워커 시작/종료, 종료 시 LLM 연결 정리
+    await ingestion_queue.start()
+    chat_service.sessions.start_sweeper()
+    chat_service.summarizer.start()
+    yield
+    await chat_service.summarizer.stop()
+    await chat_service.sessions.stop_sweeper()
+    await ingestion_queue.stop()
+    await chat_service.aclose()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# 업로드 크기 사전 검사 (본문을 읽기 전에 Content-Length로 거절)
+# Content-Length가 없는 chunked 요청은 upload_pdf가 본문을 받는 동안 같은 한도로 중단합니다.
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    if request.url.path == "/upload-pdf":
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and \
+                int(content_length) > settings.MAX_FILE_SIZE + settings.MULTIPART_OVERHEAD:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"File too large. Max size is {settings.MAX_FILE_SIZE // (1024*1024)}MB"}
+            )
+    return await call_next(request)
+
+
 # CORS 설정
 app.add_middleware(
     CORSMiddleware,
@@ -32,41 +69,58 @@ def read_root():
     return {"Hello": "World"}
 
 
-@app.post("/upload-pdf")
-async def upload_pdf(file: UploadFile = File(...)):
-    # PDF 파일 타입 검증
-    if file.content_type not in settings.ALLOWED_CONTENT_TYPES:
-        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+# 본문을 직접 스트리밍으로 파싱하므로 OpenAPI 문서에 multipart 파일 필드를 명시
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object", "required": ["file"],
+            "properties": {"file": {"type": "string", "format": "binary"}},
+        }}},
+    }
+}
 
-    # 파일 크기 제한
-    contents = await file.read()
-    if len(contents) > settings.MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail=f"File too large. Max size is {settings.MAX_FILE_SIZE // (1024*1024)}MB")
 
-    # uploads 디렉토리 생성
-    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-
-    # 파일 저장
-    file_path = f"{settings.UPLOAD_DIR}/{file.filename}"
-    with open(file_path, "wb") as f:
-        f.write(contents)
+@app.post("/upload-pdf", status_code=202, response_model=JobStatus, openapi_extra=UPLOAD_REQUEST_BODY)
+async def upload_pdf(request: Request):
+    """PDF를 저장하고 인제스트 작업을 대기열에 등록합니다. 진행 상황은 /jobs/{job_id}로 조회합니다.
 
+    UploadFile을 쓰면 핸들러가 실행되기 전에 본문 전체가 파싱/임시 저장되므로, 요청 본문을 직접 받아
+    파싱하며 크기 한도를 넘거나 PDF가 아니면 나머지 전송을 읽지 않고 거절합니다.
+    """
+    # 청크 단위로 디스크에 기록하며 파일 형식/크기 제한 검사 및 해시 계산
+    try:
+        upload = await spool_multipart_upload(
+            request.headers.get("content-type", ""), request.stream(),
+            allowed_content_types=settings.ALLOWED_CONTENT_TYPES
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # 같은 이름의 업로드가 동시에 대기할 수 있으므로 작업마다 고유한 경로에 저장 (표시용 파일명은 작업에 따로 기록)
+    filename = upload.filename or f"{upload.sha256[:16]}.pdf"
+    file_path = f"{settings.UPLOAD_DIR}/{uuid.uuid4().hex}_{filename}"
+    os.replace(upload.path, file_path)
+
+    # 인제스트 작업 등록 (대기열이 가득 차면 429)
     try:
-        result = await pdf_service.process_pdf(file_path, file.filename, len(contents))
-        return result.dict()
-    except Exception as e:
-        logger.error(f"PDF 업로드 실패 - 파일: {file.filename}, 크기: {len(contents)} bytes")
-        logger.error(f"에러 위치: {traceback.format_exc()}")
-        
-        # 업로드된 파일 정리
+        return ingestion_queue.submit(file_path, filename, upload.size, upload.sha256)
+    except QueueFullError as e:
+        logger.warning(f"인제스트 대기열 초과 - 파일: {filename}")
         if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-                logger.info(f"실패한 파일 삭제: {file_path}")
-            except Exception as cleanup_error:
-                logger.error(f"파일 삭제 실패: {cleanup_error}")
-        
-        raise HTTPException(status_code=500, detail=f"PDF 처리 중 오류가 발생했습니다: {str(e)}")
+            os.remove(file_path)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "10"})
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """인제스트 작업의 단계, 진행 상황, 최종 결과를 반환합니다."""
+    job = ingestion_queue.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 
 @app.post("/chat", response_model=ChatResponse)
@@ -74,6 +128,41 @@ async def chat(request: ChatRequest):
     return await chat_service.process_chat(request)
 
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """검색된 소스를 먼저 보내고 답변 토큰을 SSE로 스트리밍합니다."""
+    return StreamingResponse(
+        chat_service.stream_chat(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """캐시 적중률 등 운영 지표를 반환합니다."""
+    metrics = {}
+    if settings.EMBEDDING_CACHE_ENABLED:
+        metrics["embedding_cache"] = get_embedding_cache_store().stats()
+    if isinstance(pdf_service.embeddings, MemoizedQueryEmbeddings):
+        metrics["query_embeddings"] = pdf_service.embeddings.stats()
+    metrics["collections"] = {
+        "catalog_size": len(pdf_service.get_all_collections()),
+        **pdf_service.collections.stats()
+    }
+    metrics["tokenizer_cache"] = tokenizer_cache_info()
+    metrics["token_counts"] = token_count_cache_info()
+    metrics["federated_search"] = federated_retriever.stats()
+    metrics["sessions"] = chat_service.sessions.stats()
+    metrics["conversation_summary"] = chat_service.summarizer.stats()
+    metrics["query_cache"] = {
+        "retrieval": chat_service.retrieval_cache.stats(),
+        "answer": chat_service.answer_cache.stats(),
+        "semantic": chat_service.semantic_cache.stats()
+    }
+    return metrics
+
+
 @app.post("/sessions", response_model=ChatSession)
 async def create_session():
     """새로운 채팅 세션을 생성합니다."""
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import Optional, Dict, Any, List
 import uuid
 from datetime import datetime
@@ -7,6 +7,8 @@ from datetime import datetime
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
+    collections: Optional[List[str]] = None  # 검색할 PDF(파일명 또는 컬렉션명), 없으면 전체
+    bypass_cache: bool = False  # True면 캐시된 검색 결과/답변을 쓰지 않고 새로 생성 (결과는 캐시에 갱신)
 
 
 class ChatResponse(BaseModel):
@@ -34,6 +36,22 @@ class UploadResponse(BaseModel):
     chunks: int
 
 
+class JobStatus(BaseModel):
+    job_id: str
+    filename: str
+    size: int
+    sha256: Optional[str] = None
+    stage: str = "queued"  # queued, parsing, embedding, indexing, completed, failed
+    total_pages: Optional[int] = None
+    pages_parsed: int = 0
+    total_chunks: Optional[int] = None
+    chunks_embedded: int = 0
+    result: Optional[UploadResponse] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+
 class ChatMessage(BaseModel):
     role: str  # "user" or "assistant"
     content: str
@@ -43,5 +61,8 @@ class ChatMessage(BaseModel):
 class ChatSession(BaseModel):
     session_id: str = str(uuid.uuid4())
     messages: List[ChatMessage] = []
+    summary: str = ""  # 메시지 목록에서 빠진 이전 대화의 누적 요약
     created_at: datetime = datetime.now()
-    updated_at: datetime = datetime.now()
\ No newline at end of file
+    updated_at: datetime = datetime.now()
+    # 프롬프트에 넣을 최근 대화 창과 렌더링 결과 (메시지 추가 때마다 갱신, 응답에는 포함되지 않음)
+    _history: Any = PrivateAttr(default=None)
\ No newline at end of file
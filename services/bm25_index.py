@@ -0,0 +1,263 @@
+import os
+import json
+import uuid
+import shutil
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from langchain.schema import Document
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+from services.tokenizers import get_tokenizer, get_query_tokenizer
+
+
+class BM25Index:
+    """디스크에 저장하고 메모리 맵으로 다시 여는 BM25 역색인
+
+    용어 사전(용어 -> 번호), CSR 형식 포스팅(용어별 문서 번호와 빈도), 문서 길이를 numpy 배열로 보관합니다.
+    포스팅마다 BM25 점수 기여도(impact)와 용어별 최대 기여도를 미리 계산해 두어, 검색 시 MaxScore 방식으로
+    상위 k개에 들 수 없는 문서와 긴 포스팅 목록의 대부분을 건너뜁니다.
+    색인과 질의는 같은 토크나이저(이름으로 지정, 인덱스와 함께 저장)를 사용합니다.
+
+    content_version은 호출자가 정하는 색인 대상 내용의 버전으로, 인덱스와 같은 디렉토리에 작은 파일로 함께 저장되어
+    인덱스 전체를 읽지 않고도 read_content_version()으로 확인할 수 있습니다.
+    """
+
+    FORMAT_VERSION = 2
+    CONTENT_VERSION_FILE = "content_version"
+    ARRAYS = ("indptr", "postings", "frequencies", "impacts", "max_impacts", "doc_lengths")
+
+    def __init__(self, vocabulary: Dict[str, int], doc_ids: List[str], indptr: np.ndarray, postings: np.ndarray,
+                 frequencies: np.ndarray, impacts: np.ndarray, max_impacts: np.ndarray, doc_lengths: np.ndarray,
+                 k1: float = 1.5, b: float = 0.75, tokenizer: str = "whitespace"):
+        self.vocabulary = vocabulary
+        self.doc_ids = doc_ids
+        self.indptr = indptr
+        self.postings = postings
+        self.frequencies = frequencies
+        self.impacts = impacts
+        self.max_impacts = max_impacts
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer
+        self.content_version = ""
+        self._tokenize = get_query_tokenizer(tokenizer)
+
+    @classmethod
+    def build(cls, doc_ids: Sequence[str], texts: Sequence[str], k1: float = 1.5, b: float = 0.75,
+              tokenizer: str = "whitespace") -> "BM25Index":
+        """문서들을 토큰화해 인덱스를 만듭니다."""
+        tokenize = get_tokenizer(tokenizer)
+        vocabulary: Dict[str, int] = {}
+        term_ids: List[int] = []
+        doc_lengths = np.zeros(len(texts), dtype=np.int64)
+        for doc_num, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[doc_num] = len(tokens)
+            term_ids.extend(vocabulary.setdefault(token, len(vocabulary)) for token in tokens)
+        doc_nums = np.repeat(np.arange(len(texts), dtype=np.int64), doc_lengths)
+        return cls.from_postings(vocabulary, list(doc_ids), doc_nums, np.asarray(term_ids, dtype=np.int64), k1, b,
+                                 tokenizer)
+
+    @classmethod
+    def from_postings(cls, vocabulary: Dict[str, int], doc_ids: List[str], doc_nums: np.ndarray,
+                      term_ids: np.ndarray, k1: float = 1.5, b: float = 0.75,
+                      tokenizer: str = "whitespace") -> "BM25Index":
+        """(문서 번호, 용어 번호) 토큰 배열로 CSR 포스팅과 점수 기여도를 계산합니다."""
+        num_docs = len(doc_ids)
+        doc_lengths = np.bincount(doc_nums, minlength=num_docs).astype(np.float32)
+        # (용어, 문서) 쌍으로 정렬해 빈도를 세면 용어별 포스팅이 문서 번호 순으로 정렬됨
+        pairs, counts = np.unique(term_ids * max(num_docs, 1) + doc_nums, return_counts=True)
+        posting_terms = pairs // max(num_docs, 1)
+        postings = (pairs % max(num_docs, 1)).astype(np.int32)
+        frequencies = counts.astype(np.float32)
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(posting_terms, minlength=len(vocabulary)))
+
+        # 음수가 되지 않는 IDF (Lucene 방식)
+        doc_freq = np.diff(indptr).astype(np.float64)
+        idf = np.log(1.0 + (num_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+        avgdl = float(doc_lengths.mean()) if num_docs else 0.0
+        norm = k1 * (1 - b + b * doc_lengths[postings] / avgdl) if len(postings) else np.zeros(0, np.float32)
+        impacts = (idf[posting_terms] * frequencies * (k1 + 1) / (frequencies + norm)).astype(np.float32)
+        max_impacts = np.zeros(len(vocabulary), dtype=np.float32)
+        if len(impacts):
+            np.maximum.at(max_impacts, posting_terms, impacts)
+        return cls(vocabulary, doc_ids, indptr, postings, frequencies, impacts, max_impacts, doc_lengths,
+                   k1, b, tokenizer)
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """질의와 관련된 상위 k개 문서의 (문서 ID, 점수)를 점수 내림차순으로 반환합니다.
+
+        MaxScore: 최대 기여도가 큰(드문) 용어부터 처리하다가, 남은 용어들의 최대 기여도 합으로도 현재 k번째
+        점수를 넘을 수 없게 되면 새 후보를 더 받지 않고, 남은 후보의 점수만 포스팅 이진 탐색으로 갱신하면서
+        상위 k개에 들 수 없게 된 후보를 버립니다.
+        """
+        if not self.doc_ids or k <= 0:
+            return []
+        terms = self._query_terms(query)
+        if not terms:
+            return []
+        terms.sort(key=lambda item: -item[1] * self.max_impacts[item[0]])
+        remaining = float(sum(weight * self.max_impacts[term_id] for term_id, weight in terms))
+
+        # 새 후보를 받는 동안은 밀집 배열에 누적하고, 이후에는 남은 후보만 희소 배열로 갱신
+        dense = np.zeros(len(self.doc_ids), dtype=np.float32)
+        candidates = scores = None
+        threshold = 0.0
+        for term_id, weight in terms:
+            remaining -= weight * float(self.max_impacts[term_id])
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            docs = self.postings[start:end]
+            if candidates is None:
+                dense[docs] += weight * self.impacts[start:end]
+                # 이번 용어의 문서들 중 k번째 점수는 전체 k번째 점수의 하한
+                if len(docs) >= k:
+                    touched = dense[docs]
+                    threshold = max(threshold, float(np.partition(touched, len(touched) - k)[len(touched) - k]))
+                if remaining < threshold:
+                    candidates = np.flatnonzero(dense + remaining >= threshold)
+                    scores = dense[candidates]
+            else:
+                # 기존 후보만 갱신 - 긴 포스팅 목록을 끝까지 읽지 않음
+                positions = np.searchsorted(docs, candidates)
+                found = positions < len(docs)
+                found[found] = docs[positions[found]] == candidates[found]
+                scores[found] += weight * self.impacts[start + positions[found]]
+                if len(scores) > k:
+                    threshold = max(threshold, float(np.partition(scores, len(scores) - k)[len(scores) - k]))
+                    keep = scores + remaining >= threshold
+                    candidates, scores = candidates[keep], scores[keep]
+
+        if candidates is None:
+            candidates = np.flatnonzero(dense)
+            scores = dense[candidates]
+        return self._top_k(candidates, scores, k)
+
+    def max_score(self, query: str) -> float:
+        """질의로 얻을 수 있는 BM25 점수의 상한(질의 용어별 최대 기여도의 합)을 반환합니다."""
+        return float(sum(weight * self.max_impacts[term_id] for term_id, weight in self._query_terms(query)))
+
+    def search_exhaustive(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """모든 포스팅을 끝까지 누적하는 기준 구현입니다 (벤치마크/검증용)."""
+        if not self.doc_ids or k <= 0:
+            return []
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        for term_id, weight in self._query_terms(query):
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            scores[self.postings[start:end]] += weight * self.impacts[start:end]
+        matched = np.flatnonzero(scores)
+        return self._top_k(matched, scores[matched], k)
+
+    def _query_terms(self, query: str) -> List[Tuple[int, int]]:
+        """질의의 (용어 번호, 등장 횟수) 목록을 만듭니다. 사전에 없는 용어는 제외합니다."""
+        counts: Dict[int, int] = {}
+        for token in self._tokenize(query):
+            term_id = self.vocabulary.get(token)
+            if term_id is not None:
+                counts[term_id] = counts.get(term_id, 0) + 1
+        return list(counts.items())
+
+    def _top_k(self, docs: np.ndarray, scores: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """점수 내림차순(동점이면 문서 번호 순)으로 상위 k개를 고릅니다."""
+        if len(docs) > k:
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            selected = scores >= kth
+            docs, scores = docs[selected], scores[selected]
+        order = np.lexsort((docs, -scores))[:k]
+        return [(self.doc_ids[docs[i]], float(scores[i])) for i in order]
+
+    @property
+    def nbytes(self) -> int:
+        """인덱스가 차지하는 대략적인 바이트 수를 반환합니다."""
+        arrays = sum(getattr(self, name).nbytes for name in self.ARRAYS)
+        # 용어 사전/문서 ID 문자열과 dict 항목 오버헤드 추정치
+        strings = sum(len(term) + 100 for term in self.vocabulary) + sum(len(doc_id) + 60 for doc_id in self.doc_ids)
+        return arrays + strings
+
+    def save(self, directory: str):
+        """인덱스를 디렉토리에 저장합니다. 임시 디렉토리에 쓴 뒤 교체하므로 읽는 쪽은 항상 완전한 인덱스를 봅니다."""
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        staging = f"{directory}.tmp-{uuid.uuid4().hex}"
+        os.makedirs(staging)
+        try:
+            for name in self.ARRAYS:
+                np.save(os.path.join(staging, f"{name}.npy"), getattr(self, name))
+            with open(os.path.join(staging, "index.json"), "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": self.FORMAT_VERSION,
+                    "k1": self.k1,
+                    "b": self.b,
+                    "tokenizer": self.tokenizer,
+                    "vocabulary": self.vocabulary,
+                    "doc_ids": self.doc_ids,
+                }, f, ensure_ascii=False)
+            with open(os.path.join(staging, self.CONTENT_VERSION_FILE), "w", encoding="utf-8") as f:
+                f.write(self.content_version)
+            retired = None
+            if os.path.exists(directory):
+                retired = f"{directory}.old-{uuid.uuid4().hex}"
+                os.replace(directory, retired)
+            os.replace(staging, directory)
+            if retired:
+                shutil.rmtree(retired, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True, tokenizer: Optional[str] = None) -> Optional["BM25Index"]:
+        """저장된 인덱스를 엽니다. 배열은 메모리 맵으로 열어 필요한 부분만 읽습니다.
+
+        인덱스가 없거나 형식 버전이 다르거나, tokenizer가 주어졌는데 저장된 인덱스의 토크나이저와 다르면
+        None을 반환합니다 (호출자가 다시 만들어야 함).
+        """
+        meta_path = os.path.join(directory, "index.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != cls.FORMAT_VERSION:
+            return None
+        saved_tokenizer = meta.get("tokenizer", "whitespace")
+        if tokenizer is not None and saved_tokenizer != tokenizer:
+            return None
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            for name in cls.ARRAYS
+        }
+        index = cls(meta["vocabulary"], meta["doc_ids"], k1=meta["k1"], b=meta["b"], tokenizer=saved_tokenizer, **arrays)
+        index.content_version = cls.read_content_version(directory) or ""
+        return index
+
+    @classmethod
+    def read_content_version(cls, directory: str) -> Optional[str]:
+        """저장된 인덱스의 content_version을 읽습니다. 인덱스나 버전 파일이 없으면 None을 반환합니다."""
+        try:
+            with open(os.path.join(directory, cls.CONTENT_VERSION_FILE), encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+class BM25IndexRetriever(BaseRetriever):
+    """BM25Index로 순위를 매기고 상위 k개 청크 본문은 벡터스토어에서 ID로 가져오는 검색기"""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    index: Any
+    vectorstore: Any
+    k: int = 4
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        hits = self.index.search(query, self.k)
+        if not hits:
+            return []
+        stored = self.vectorstore.get(ids=[doc_id for doc_id, _ in hits], include=["documents", "metadatas"])
+        by_id = {
+            doc_id: Document(page_content=text, metadata=metadata or {})
+            for doc_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"])
+        }
+        return [by_id[doc_id] for doc_id, _ in hits if doc_id in by_id]
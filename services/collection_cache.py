@@ -0,0 +1,130 @@
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from config.settings import settings
+
+
+@dataclass
+class CollectionEntry:
+    """메모리에 열려 있는 컬렉션 - 벡터스토어, 검색기와 캐시가 해제할 수 있는 메모리(BM25 인덱스) 크기"""
+    vectorstore: Any
+    bm25_retriever: Any = None
+    hybrid_retriever: Any = None
+    size_bytes: int = 0
+    content_version: str = ""
+
+
+class CollectionCache:
+    """최근 사용한 컬렉션만 메모리에 유지하는 LRU - 개수와 size_bytes 합계 한도를 넘으면 오래된 것부터 닫습니다.
+
+    size_bytes에는 캐시에서 빼면 실제로 해제되는 메모리(BM25 인덱스)만 셉니다. HNSW 벡터 세그먼트는
+    Chroma 클라이언트가 보관하므로 Chroma의 세그먼트 캐시 한도(CHROMA_MEMORY_LIMIT_BYTES)로 제한합니다.
+    chromadb 1.x의 기본(Rust) 백엔드는 이 바이트 한도 대신 열린 HNSW 인덱스 개수로만 캐시를 제한하므로,
+    그 경우 벡터 메모리에는 개수 한도만 적용됩니다.
+
+    loader는 캐시에 없는 컬렉션을 열 때 호출되며, 컬렉션이 없으면 None을 반환합니다.
+    """
+
+    def __init__(self, loader: Callable[[str], Optional[CollectionEntry]],
+                 max_collections: int = None, max_bytes: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.loader = loader
+        self.max_collections = max_collections or settings.COLLECTION_CACHE_MAX_COLLECTIONS
+        self.max_bytes = max_bytes or settings.COLLECTION_CACHE_MAX_BYTES
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, CollectionEntry]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def get(self, name: str) -> Optional[CollectionEntry]:
+        """열려 있는 컬렉션을 반환하고, 없으면 loader로 열어 캐시에 넣습니다."""
+        with self._lock:
+            entry = self._touch(name)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        # 같은 컬렉션을 동시에 여러 번 열지 않도록 컬렉션별로 잠금
+        with load_lock:
+            with self._lock:
+                entry = self._touch(name)
+            if entry is not None:
+                return entry
+            entry = self.loader(name)
+            if entry is None:
+                return None
+            self.loads += 1
+            self.put(name, entry)
+            return entry
+
+    def peek(self, name: str) -> Optional[CollectionEntry]:
+        """컬렉션을 열거나 사용 순서를 바꾸지 않고 조회합니다."""
+        with self._lock:
+            return self._entries.get(name)
+
+    def put(self, name: str, entry: CollectionEntry):
+        """컬렉션을 가장 최근 사용으로 넣고 한도를 넘으면 오래된 컬렉션을 닫습니다."""
+        with self._lock:
+            previous = self._entries.pop(name, None)
+            if previous is not None:
+                self._total_bytes -= previous.size_bytes
+            self._entries[name] = entry
+            self._total_bytes += entry.size_bytes
+            self._evict_if_needed(keep=name)
+
+    def pop(self, name: str) -> Optional[CollectionEntry]:
+        """컬렉션을 캐시에서 제거합니다."""
+        with self._lock:
+            entry = self._entries.pop(name, None)
+            if entry is not None:
+                self._total_bytes -= entry.size_bytes
+            return entry
+
+    def names(self) -> List[str]:
+        """열려 있는 컬렉션 이름을 오래된 순서로 반환합니다."""
+        with self._lock:
+            return list(self._entries.keys())
+
+    def stats(self) -> Dict[str, float]:
+        """적중/미스, 로드, 제거 횟수와 메모리 사용량을 반환합니다."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "open_collections": len(self._entries),
+                "max_collections": self.max_collections,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
+
+    def _touch(self, name: str) -> Optional[CollectionEntry]:
+        """컬렉션을 가장 최근 사용으로 옮깁니다. 호출자가 잠금을 잡고 있어야 합니다."""
+        entry = self._entries.get(name)
+        if entry is not None:
+            self._entries.move_to_end(name)
+        return entry
+
+    def _evict_if_needed(self, keep: str):
+        """개수/메모리 한도를 넘으면 가장 오래 사용되지 않은 컬렉션부터 제거합니다. 방금 넣은 컬렉션은 남깁니다."""
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_collections or self._total_bytes > self.max_bytes
+        ):
+            name = next(iter(self._entries))
+            if name == keep:
+                break
+            entry = self._entries.pop(name)
+            self._total_bytes -= entry.size_bytes
+            self.evictions += 1
+            self.logger.info(f"컬렉션 '{name}' 메모리에서 제거 (현재 {len(self._entries)}개, {self._total_bytes} bytes)")
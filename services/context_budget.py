@@ -0,0 +1,169 @@
+from collections import deque
+from functools import lru_cache
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+from langchain.schema import Document
+from schemas.models import ChatMessage
+from config.settings import settings
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+_encoding = None
+
+
+def _get_encoding():
+    """답변 모델의 tiktoken 인코딩을 한 번만 불러옵니다. 모델을 모르면 o200k_base, cl100k_base 순으로 시도하고,
+    모두 불러올 수 없으면(미설치, 오프라인) False를 반환합니다."""
+    global _encoding
+    if _encoding is None:
+        _encoding = False
+        if tiktoken is not None:
+            try:
+                _encoding = tiktoken.encoding_for_model(settings.MODEL_NAME)
+            except Exception:
+                for name in ("o200k_base", "cl100k_base"):
+                    try:
+                        _encoding = tiktoken.get_encoding(name)
+                        break
+                    except Exception:
+                        continue
+    return _encoding
+
+
+@lru_cache(maxsize=settings.TOKEN_COUNT_CACHE_SIZE)
+def count_tokens(text: str) -> int:
+    """텍스트의 토큰 수를 셉니다. 같은 텍스트(세션 메시지, 검색 청크)는 매 턴 다시 세지 않도록 캐시합니다.
+
+    tiktoken 인코딩을 쓸 수 없으면 한글 음절당 1토큰, 그 외 4자당 1토큰으로 넉넉하게 추정합니다.
+    """
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    hangul = sum(1 for char in text if "가" <= char <= "힣")
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+def _role_name(role: str) -> str:
+    return "사용자" if role == "user" else "어시스턴트"
+
+
+def format_message(message: ChatMessage) -> str:
+    """메시지를 프롬프트의 "역할: 내용" 한 줄로 만듭니다."""
+    return f"{_role_name(message.role)}: {message.content}\n"
+
+
+def message_tokens(message: ChatMessage) -> int:
+    """format_message 결과의 토큰 수 - 역할 접두어와 본문을 따로 세어 본문 캐시를 재사용합니다."""
+    return count_tokens(f"{_role_name(message.role)}: ") + count_tokens(message.content) + 1
+
+
+def select_history(messages: Sequence[ChatMessage], budget: int) -> Tuple[List[ChatMessage], int]:
+    """최근 메시지부터 budget 토큰 안에 들어가는 만큼 고릅니다 (시간 순서로 반환).
+
+    중간을 건너뛰면 대화 흐름이 끊기므로, 들어가지 않는 메시지(예: 붙여 넣은 긴 글)를 만나면 거기서 멈춥니다.
+    """
+    selected: List[ChatMessage] = []
+    used = 0
+    for message in reversed(messages):
+        tokens = message_tokens(message)
+        if used + tokens > budget:
+            break
+        selected.append(message)
+        used += tokens
+    selected.reverse()
+    return selected, used
+
+
+def select_documents(documents: Sequence[Document], budget: int) -> Tuple[List[Document], int]:
+    """검색 순위대로 budget 토큰 안에 들어가는 문서를 고릅니다. 답변 근거가 없어지지 않도록 1위 문서는 항상 포함합니다."""
+    selected: List[Document] = []
+    used = 0
+    for doc in documents:
+        tokens = count_tokens(doc.page_content)
+        if selected and used + tokens > budget:
+            continue
+        selected.append(doc)
+        used += tokens
+    return selected, used
+
+
+class HistoryWindow:
+    """세션의 최근 대화 창(select_history 결과)과 렌더링한 컨텍스트 문자열을 보관하고 메시지 추가 때마다 갱신합니다.
+
+    메시지는 뒤에만 추가되고 앞에서만 빠지므로, 새 창은 기존 창 뒤에 새 메시지를 붙이고 예산을 넘는 만큼
+    앞에서 빼면 됩니다. 턴마다 전체 메시지를 다시 세거나 포맷하지 않고, 렌더링은 창이 바뀐 뒤 처음 읽을 때 한 번만 합니다.
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.messages: Deque[ChatMessage] = deque()
+        self.lines: Deque[str] = deque()
+        self.tokens: Deque[int] = deque()
+        self.used = 0
+        self.last: Optional[ChatMessage] = None  # 마지막으로 반영한 메시지 (창에서 빠졌어도 유지)
+        self._rendered: Optional[Tuple[str, str]] = None  # (요약, 렌더링한 컨텍스트)
+
+    @classmethod
+    def build(cls, messages: Sequence[ChatMessage], budget: int) -> "HistoryWindow":
+        window = cls(budget)
+        selected, used = select_history(messages, budget)
+        window.messages.extend(selected)
+        window.lines.extend(format_message(message) for message in selected)
+        window.tokens.extend(message_tokens(message) for message in selected)
+        window.used = used
+        window.last = messages[-1] if messages else None
+        return window
+
+    def append(self, message: ChatMessage):
+        """새 메시지를 창 끝에 붙이고 예산을 넘는 만큼 오래된 메시지를 뺍니다. 들어가지 않는 메시지면 창을 비웁니다."""
+        tokens = message_tokens(message)
+        self.last = message
+        self._rendered = None
+        if tokens > self.budget:
+            self.messages.clear()
+            self.lines.clear()
+            self.tokens.clear()
+            self.used = 0
+            return
+        self.messages.append(message)
+        self.lines.append(format_message(message))
+        self.tokens.append(tokens)
+        self.used += tokens
+        while self.used > self.budget:
+            self.messages.popleft()
+            self.lines.popleft()
+            self.used -= self.tokens.popleft()
+
+    def is_current(self, messages: Sequence[ChatMessage], budget: int) -> bool:
+        """창이 이 메시지 목록과 예산 기준으로 최신인지 확인합니다 (끝 메시지와 창 시작 위치만 비교하는 O(1) 검사)."""
+        if budget != self.budget or (messages[-1] if messages else None) is not self.last:
+            return False
+        size = len(self.messages)
+        return size == 0 or (size <= len(messages) and messages[-size] is self.messages[0])
+
+    def context(self, summary: str = "") -> str:
+        """요약과 최근 대화를 "이전 대화" 컨텍스트 문자열로 렌더링합니다. 결과는 창이나 요약이 바뀔 때까지 재사용합니다."""
+        if self._rendered is None or self._rendered[0] != summary:
+            context = ""
+            if summary:
+                context += f"이전 대화 요약: {summary}\n\n"
+            if self.lines:
+                context += "이전 대화:\n" + "".join(self.lines)
+            self._rendered = (summary, context + "\n현재 질문: " if context else "")
+        return self._rendered[1]
+
+
+def token_count_cache_info() -> Dict[str, int]:
+    """토큰 수 캐시 적중/미스 통계와 사용 중인 인코딩을 반환합니다."""
+    info = count_tokens.cache_info()
+    encoding = _get_encoding()
+    return {
+        "encoding": encoding.name if encoding else "approximate",
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+    }
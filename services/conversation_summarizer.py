@@ -0,0 +1,150 @@
+import time
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+from langchain_core.prompts import PromptTemplate
+from schemas.models import ChatSession, ChatMessage
+from services.session_store import SessionStore
+from services.context_budget import format_message
+from config.settings import settings
+
+
+SUMMARY_PROMPT = PromptTemplate.from_template(
+    "다음은 사용자와 어시스턴트의 이전 대화 요약과, 그 뒤에 이어진 대화입니다.\n"
+    "기존 요약에 새 대화의 핵심(사용자가 물은 내용, 답변의 결론, 언급된 문서와 용어)을 반영해 "
+    "하나의 간결한 한국어 요약으로 다시 작성하세요. 요약만 출력하세요.\n\n"
+    "기존 요약:\n{summary}\n\n"
+    "새 대화:\n{conversation}\n"
+    "요약:"
+)
+
+
+class ConversationSummarizer:
+    """최근 대화 범위에서 밀려난 메시지를 세션별 누적 요약에 반영하는 백그라운드 작업
+
+    요청 처리 중에는 schedule()로 세션 ID만 대기열에 넣고, 워커가 요약 LLM을 호출한 뒤
+    SessionStore.fold_messages()로 요약된 메시지를 세션에서 제거합니다. 요약이 끝나기 전까지는
+    기존처럼 최근 대화만 프롬프트에 들어가므로 응답 지연 시간에 요약 시간이 더해지지 않습니다.
+    """
+
+    def __init__(self, sessions: SessionStore, chain_factory: Callable,
+                 select_evicted: Callable[[ChatSession], List[ChatMessage]], enabled: bool = None, min_messages: int = None, max_queue_size: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.sessions = sessions
+        self.chain_factory = chain_factory
+        self.select_evicted = select_evicted
+        self.enabled = settings.CONVERSATION_SUMMARY_ENABLED if enabled is None else enabled
+        self.min_messages = min_messages or settings.CONVERSATION_SUMMARY_MIN_MESSAGES
+        self.max_queue_size = max_queue_size or settings.CONVERSATION_SUMMARY_QUEUE_SIZE
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.folded_messages = 0
+        self.seconds = 0.0
+        # 메시지 한도 때문에 세션에서 이미 빠져 다음 요약에 포함할 메시지
+        self._dropped: Dict[str, List[ChatMessage]] = {}
+        self._queued: set = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """요약 워커를 시작합니다. 비활성화되어 있으면 아무것도 하지 않습니다."""
+        if self.enabled and self._worker_task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._worker_task = asyncio.create_task(self._worker(), name="conversation-summarizer")
+
+    async def stop(self):
+        """요약 워커를 중지합니다. 대기 중인 요약은 버립니다 (메시지는 세션에 남아 있습니다)."""
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            await asyncio.gather(self._worker_task, return_exceptions=True)
+            self._worker_task = None
+            self._queue = None
+            self._queued.clear()
+
+    def add_dropped(self, session_id: str, messages: List[ChatMessage]):
+        """세션 메시지 한도로 버려진 메시지를 다음 요약에 포함하도록 보관합니다."""
+        if self._queue is not None and messages:
+            self._dropped.setdefault(session_id, []).extend(messages)
+
+    def schedule(self, session_id: str):
+        """요약할 메시지가 min_messages개 이상 쌓였으면 세션을 대기열에 넣습니다. 요청 경로에서 호출하므로 LLM을 기다리지 않습니다."""
+        if self._queue is None or session_id in self._queued:
+            return
+        try:
+            session = self.sessions[session_id]
+        except KeyError:
+            self._dropped.pop(session_id, None)
+            return
+        pending = len(self._dropped.get(session_id, ())) + len(self.select_evicted(session))
+        if pending < self.min_messages:
+            return
+        try:
+            self._queue.put_nowait(session_id)
+            self._queued.add(session_id)
+        except asyncio.QueueFull:
+            # 요약이 밀려 있으면 이번 턴은 건너뜀 (메시지는 남아 있으므로 다음 턴에 다시 시도)
+            self.skipped += 1
+
+    async def summarize(self, session_id: str) -> int:
+        """세션의 밀려난 메시지를 요약에 반영하고, 세션에서 제거한 메시지 수를 반환합니다."""
+        try:
+            session = self.sessions[session_id]
+        except KeyError:
+            self._dropped.pop(session_id, None)
+            return 0
+        dropped = self._dropped.pop(session_id, [])
+        evicted = self.select_evicted(session)
+        if not dropped and not evicted:
+            return 0
+
+        start = time.perf_counter()
+        try:
+            summary = await self.chain_factory().ainvoke({
+                "summary": session.summary or "(없음)",
+                "conversation": "".join(format_message(message) for message in dropped + evicted)
+            })
+        except Exception:
+            # 세션에서 이미 빠진 메시지는 다음 요약 때 다시 시도
+            if dropped:
+                self._dropped[session_id] = dropped + self._dropped.get(session_id, [])
+            raise
+        self.seconds += time.perf_counter() - start
+        self.runs += 1
+        self.folded_messages += len(dropped) + len(evicted)
+        # 요약하는 동안 메시지 한도로 빠진 evicted 메시지는 이번 요약에 이미 들어갔으므로 다음 요약에서 제외
+        if evicted and session_id in self._dropped:
+            summarized = {id(message) for message in evicted}
+            remaining = [message for message in self._dropped[session_id] if id(message) not in summarized]
+            if remaining:
+                self._dropped[session_id] = remaining
+            else:
+                del self._dropped[session_id]
+        try:
+            return self.sessions.fold_messages(session_id, evicted, summary.strip())
+        except KeyError:
+            return 0
+
+    def stats(self) -> Dict[str, float]:
+        """요약 실행 횟수, 요약에 반영한 메시지 수, 누적 요약 시간을 반환합니다."""
+        return {
+            "enabled": self.enabled,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "folded_messages": self.folded_messages,
+            "seconds": round(self.seconds, 3),
+        }
+
+    async def _worker(self):
+        while True:
+            session_id = await self._queue.get()
+            try:
+                await self.summarize(session_id)
+            except Exception as e:
+                self.failures += 1
+                self.logger.warning(f"대화 요약 실패 ({session_id}): {e}")
+            finally:
+                self._queued.discard(session_id)
+                self._queue.task_done()
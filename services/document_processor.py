@@ -1,6 +1,6 @@
 import re
 import fitz  # PyMuPDF
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from langchain.schema import Document
 from langchain_openai import OpenAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -12,6 +12,7 @@ except ImportError:
     # Fallback settings for development
     class Settings:
         EMBEDDING_MODEL = "text-embedding-3-large"
+        EMBEDDING_DIMENSIONS = 3072
         OPENAI_API_KEY = ""
         USE_SEMANTIC_CHUNKING = True
         SEMANTIC_CHUNK_MIN_SIZE = 100
@@ -24,6 +25,10 @@ except ImportError:
         CHUNK_SIZE = 1000
         CHUNK_OVERLAP = 200
     settings = Settings()
+from services.embedding_cache import with_embedding_cache
+from services.page_extraction import (
+    extract_page_content, extract_page_range, extract_pages_parallel, use_parallel_extraction
+)
 
 
 class EnhancedDocumentProcessor:
@@ -33,31 +38,28 @@ class EnhancedDocumentProcessor:
         try:
             self.embeddings = OpenAIEmbeddings(
                 model=settings.EMBEDDING_MODEL,
-                openai_api_key=settings.OPENAI_API_KEY
+                openai_api_key=settings.OPENAI_API_KEY,
+                dimensions=settings.EMBEDDING_DIMENSIONS
             )
+            # 문장 임베딩도 인제스트/질의와 같은 네임스페이스의 영구 캐시를 거치도록 감쌈 (재처리 시 재계산 방지)
+            self.embeddings = with_embedding_cache(self.embeddings)
         except Exception as e:
             print(f"Warning: OpenAI embeddings initialization failed: {e}")
             self.embeddings = None
     
-    def process_pdf_enhanced(self, file_path: str, filename: str) -> List[Document]:
-        """PDF를 향상된 방식으로 처리합니다."""
+    def process_pdf_enhanced(self, file_path: str, filename: str,
+                             progress: Optional[Callable[..., None]] = None) -> List[Document]:
+        """PDF를 향상된 방식으로 처리합니다. progress 콜백에 파싱한 페이지 수를 보고합니다."""
         try:
-            # PDF 문서 열기
-            pdf_document = fitz.open(file_path)
-            documents = []
+            # 페이지 내용 추출 (큰 문서는 여러 프로세스에서 병렬로)
+            pages = self._extract_pages(file_path, filename, progress)
             
-            for page_num in range(len(pdf_document)):
-                page = pdf_document[page_num]
-                
-                # 페이지에서 다양한 정보 추출
-                page_data = self._extract_page_content(page, page_num + 1, filename)
-                
+            documents = []
+            for page_data in pages:
                 # 텍스트가 있으면 문서로 변환
                 if page_data['text'] and len(page_data['text'].strip()) >= settings.MIN_TEXT_LENGTH:
                     documents.extend(self._create_documents_from_page(page_data))
             
-            pdf_document.close()
-            
             # Semantic chunking 적용
             if settings.USE_SEMANTIC_CHUNKING and documents:
                 documents = self._apply_semantic_chunking(documents)
@@ -67,197 +69,28 @@ class EnhancedDocumentProcessor:
         except Exception as e:
             raise Exception(f"Enhanced PDF processing failed: {str(e)}")
     
+    def _extract_pages(self, file_path: str, filename: str,
+                       progress: Optional[Callable[..., None]] = None) -> List[Dict[str, Any]]:
+        """모든 페이지의 내용을 페이지 순서대로 추출합니다."""
+        with fitz.open(file_path) as pdf_document:
+            page_count = len(pdf_document)
+            if progress:
+                progress(total_pages=page_count, pages_parsed=0)
+            
+            if not use_parallel_extraction(page_count):
+                pages = []
+                for page_num in range(page_count):
+                    pages.append(self._extract_page_content(pdf_document[page_num], page_num + 1, filename))
+                    if progress:
+                        progress(pages_parsed=page_num + 1)
+                return pages
+        
+        # 큰 문서는 페이지 범위를 워커 프로세스에 나눠 추출
+        return extract_pages_parallel(extract_page_range, file_path, page_count, filename, progress=progress)
+    
     def _extract_page_content(self, page, page_num: int, filename: str) -> Dict[str, Any]:
         """페이지에서 텍스트, 테이블, 이미지 정보를 추출합니다."""
-        page_data = {
-            'text': '',
-            'tables': [],
-            'images': [],
-            'headers': [],
-            'footers': [],
-            'page_num': page_num,
-            'filename': filename
-        }
-        
-        # 1. 기본 텍스트 추출
-        raw_text = page.get_text()
-        
-        # 2. 구조화된 텍스트 추출 (블록 단위)
-        blocks = page.get_text("dict")
-        
-        # 3. 헤더/푸터 감지 및 제거
-        if settings.REMOVE_HEADERS_FOOTERS:
-            cleaned_text, headers, footers = self._remove_headers_footers(raw_text, page)
-            page_data['text'] = cleaned_text
-            page_data['headers'] = headers
-            page_data['footers'] = footers
-        else:
-            page_data['text'] = raw_text
-        
-        # 4. 테이블 추출
-        if settings.EXTRACT_TABLES:
-            page_data['tables'] = self._extract_tables(page)
-        
-        # 5. 이미지 정보 추출
-        if settings.EXTRACT_IMAGES:
-            page_data['images'] = self._extract_image_info(page)
-        
-        # 6. 제목 및 섹션 헤더 감지
-        page_data['sections'] = self._extract_sections(blocks)
-        
-        return page_data
-    
-    def _remove_headers_footers(self, text: str, page) -> Tuple[str, List[str], List[str]]:
-        """헤더와 푸터를 감지하고 제거합니다."""
-        lines = text.split('\n')
-        if len(lines) <= 3:
-            return text, [], []
-        
-        headers = []
-        footers = []
-        content_lines = lines[:]
-        
-        # 상단 3줄에서 헤더 패턴 감지
-        for i in range(min(3, len(lines))):
-            line = lines[i].strip()
-            if self._is_header_footer_pattern(line):
-                headers.append(line)
-                content_lines[i] = ''
-        
-        # 하단 3줄에서 푸터 패턴 감지
-        for i in range(max(0, len(lines) - 3), len(lines)):
-            line = lines[i].strip()
-            if self._is_header_footer_pattern(line):
-                footers.append(line)
-                content_lines[i] = ''
-        
-        cleaned_text = '\n'.join([line for line in content_lines if line.strip()])
-        return cleaned_text, headers, footers
-    
-    def _is_header_footer_pattern(self, text: str) -> bool:
-        """헤더/푸터 패턴을 감지합니다."""
-        if not text or len(text.strip()) < 3:
-            return False
-        
-        # 페이지 번호 패턴
-        if re.match(r'^\s*\d+\s*$', text):
-            return True
-        
-        # 날짜 패턴
-        if re.search(r'\d{4}[-/]\d{1,2}[-/]\d{1,2}', text):
-            return True
-        
-        # 짧고 반복될 가능성이 높은 텍스트
-        if len(text.strip()) < 50 and (
-            'page' in text.lower() or 
-            'chapter' in text.lower() or
-            'section' in text.lower() or
-            '©' in text or
-            'copyright' in text.lower()
-        ):
-            return True
-        
-        return False
-    
-    def _extract_tables(self, page) -> List[Dict[str, Any]]:
-        """테이블 정보를 추출합니다."""
-        tables = []
-        try:
-            # PyMuPDF의 테이블 추출 기능 사용
-            tabs = page.find_tables()
-            for i, tab in enumerate(tabs):
-                table_data = {
-                    'table_id': f"table_{i}",
-                    'bbox': tab.bbox,  # 테이블 위치
-                    'rows': tab.extract(),  # 테이블 데이터
-                    'summary': self._generate_table_summary(tab.extract())
-                }
-                tables.append(table_data)
-        except:
-            # 테이블 추출 실패 시 텍스트 기반 테이블 감지
-            tables = self._detect_text_tables(page.get_text())
-        
-        return tables
-    
-    def _generate_table_summary(self, table_data: List[List[str]]) -> str:
-        """테이블의 요약 설명을 생성합니다."""
-        if not table_data or len(table_data) < 2:
-            return "Empty table"
-        
-        headers = table_data[0] if table_data[0] else ["Column " + str(i) for i in range(len(table_data[0]))]
-        row_count = len(table_data) - 1
-        col_count = len(headers)
-        
-        return f"Table with {row_count} rows and {col_count} columns. Headers: {', '.join(headers[:3])}{'...' if len(headers) > 3 else ''}"
-    
-    def _detect_text_tables(self, text: str) -> List[Dict[str, Any]]:
-        """텍스트에서 테이블 형태를 감지합니다."""
-        tables = []
-        lines = text.split('\n')
-        
-        for i, line in enumerate(lines):
-            # 탭이나 여러 공백으로 구분된 컬럼이 있는 경우
-            if '\t' in line or re.search(r'\s{3,}', line):
-                # 연속된 유사한 패턴의 라인들을 찾아 테이블로 인식
-                table_lines = [line]
-                j = i + 1
-                while j < len(lines) and ('\t' in lines[j] or re.search(r'\s{3,}', lines[j])):
-                    table_lines.append(lines[j])
-                    j += 1
-                
-                if len(table_lines) >= 2:  # 최소 2줄 이상
-                    tables.append({
-                        'table_id': f"text_table_{len(tables)}",
-                        'lines': table_lines,
-                        'summary': f"Text table with {len(table_lines)} rows detected"
-                    })
-        
-        return tables
-    
-    def _extract_image_info(self, page) -> List[Dict[str, Any]]:
-        """이미지 정보를 추출합니다."""
-        images = []
-        try:
-            image_list = page.get_images()
-            for i, img in enumerate(image_list):
-                images.append({
-                    'image_id': f"image_{i}",
-                    'bbox': page.get_image_bbox(img),
-                    'size': f"{img[2]}x{img[3]}",  # width x height
-                    'description': f"Image {i+1} on page"
-                })
-        except:
-            pass
-        
-        return images
-    
-    def _extract_sections(self, blocks: Dict) -> List[Dict[str, Any]]:
-        """섹션 제목을 추출합니다."""
-        sections = []
-        
-        for block in blocks.get('blocks', []):
-            if block.get('type') == 0:  # 텍스트 블록
-                for line in block.get('lines', []):
-                    for span in line.get('spans', []):
-                        text = span.get('text', '').strip()
-                        font_size = span.get('size', 0)
-                        font_flags = span.get('flags', 0)
-                        
-                        # 제목/섹션 헤더 감지 (큰 폰트, 볼드체 등)
-                        if (font_size > 12 and 
-                            (font_flags & 2**4 or font_flags & 2**6) and  # bold or italic
-                            len(text) < 100 and 
-                            text and 
-                            not text.endswith('.')):
-                            
-                            sections.append({
-                                'text': text,
-                                'font_size': font_size,
-                                'is_bold': bool(font_flags & 2**4),
-                                'bbox': span.get('bbox')
-                            })
-        
-        return sections
+        return extract_page_content(page, page_num, filename)
     
     def _create_documents_from_page(self, page_data: Dict[str, Any]) -> List[Document]:
         """페이지 데이터에서 Document 객체들을 생성합니다."""
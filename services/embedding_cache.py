@@ -0,0 +1,333 @@
+import os
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from config.settings import settings
+
+
+class EmbeddingCacheStore:
+    """SQLite 기반의 영구 임베딩 저장소 - 용량 초과 시 오래 사용되지 않은 항목부터 제거"""
+
+    def __init__(self, path: str = None, max_bytes: int = None, access_flush: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.path = path or settings.EMBEDDING_CACHE_PATH
+        self.max_bytes = max_bytes or settings.EMBEDDING_CACHE_MAX_BYTES
+        self.access_flush = access_flush or settings.EMBEDDING_CACHE_ACCESS_FLUSH
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+        self._accessed: Dict[str, float] = {}  # 아직 기록하지 않은 조회 항목의 마지막 사용 시각
+
+    def _connection(self) -> sqlite3.Connection:
+        """처음 사용할 때 SQLite 파일을 열고 스키마를 준비합니다. 호출자가 잠금을 잡고 있어야 합니다."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)")
+            conn.commit()
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """저장된 임베딩을 조회합니다. 없는 키는 결과에 포함되지 않습니다.
+
+        조회마다 쓰기 트랜잭션을 만들지 않도록 마지막 사용 시각은 메모리에 모았다가 access_flush개가 쌓이거나
+        다음 저장(제거 판단 직전) 때 한 번에 기록합니다.
+        """
+        found: Dict[str, List[float]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            conn = self._connection()
+            # SQLite 바인딩 변수 제한을 넘지 않도록 나눠서 조회
+            for start in range(0, len(unique_keys), 500):
+                batch = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+            now = time.time()
+            self._accessed.update((key, now) for key in found)
+            if len(self._accessed) >= self.access_flush:
+                self._flush_accessed()
+                conn.commit()
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]):
+        """임베딩을 저장하고 용량을 넘으면 오래된 항목을 제거합니다."""
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, vector in items.items():
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            rows.append((key, blob, len(blob), now))
+        with self._lock:
+            conn = self._connection()
+            # 덮어쓰는 항목의 기존 크기는 총량에서 제외
+            replaced = 0
+            for start in range(0, len(rows), 500):
+                batch = [row[0] for row in rows[start:start + 500]]
+                placeholders = ",".join("?" * len(batch))
+                replaced += conn.execute(
+                    f"SELECT COALESCE(SUM(size), 0) FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchone()[0]
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, size, last_access) VALUES (?, ?, ?, ?)", rows
+            )
+            self._total_bytes += sum(row[2] for row in rows) - replaced
+            self._flush_accessed()
+            self._evict_if_needed()
+            conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """캐시 적중/미스 및 용량 정보를 반환합니다."""
+        with self._lock:
+            entries = self._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+    def _flush_accessed(self):
+        """모아 둔 마지막 사용 시각을 기록합니다. 호출자가 잠금을 잡고 커밋합니다."""
+        if not self._accessed:
+            return
+        self._connection().executemany(
+            "UPDATE embeddings SET last_access = MAX(last_access, ?) WHERE key = ?",
+            [(accessed, key) for key, accessed in self._accessed.items()]
+        )
+        self._accessed.clear()
+
+    def _evict_if_needed(self):
+        """용량 한도를 넘으면 한도의 90%가 될 때까지 가장 오래 사용되지 않은 항목을 제거합니다."""
+        if self._total_bytes <= self.max_bytes:
+            return
+        conn = self._connection()
+        target = int(self.max_bytes * 0.9)
+        rows = conn.execute("SELECT key, size FROM embeddings ORDER BY last_access").fetchall()
+        evicted = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            evicted.append((key,))
+            self._total_bytes -= size
+        conn.executemany("DELETE FROM embeddings WHERE key = ?", evicted)
+        self.evictions += len(evicted)
+        self.logger.info(f"임베딩 캐시 {len(evicted)}개 항목 제거 (현재 {self._total_bytes} bytes)")
+
+
+def embedding_namespace(model: str = None, dimensions: Optional[int] = None) -> str:
+    """임베딩 캐시 키의 네임스페이스("모델:차원")를 만듭니다. 인자가 없으면 설정의 모델과 차원을 씁니다.
+
+    인제스트와 질의가 같은 텍스트를 같은 키로 찾도록 모든 캐시 래퍼가 이 함수로 네임스페이스를 만듭니다.
+    """
+    model = model or settings.EMBEDDING_MODEL
+    dimensions = dimensions or settings.EMBEDDING_DIMENSIONS
+    return f"{model}:{dimensions or 'default'}"
+
+
+class CachedEmbeddings(Embeddings):
+    """임베딩 모델 앞에서 (모델, 차원, 텍스트 해시) 단위로 결과를 캐시합니다."""
+
+    def __init__(self, underlying: Embeddings, store: EmbeddingCacheStore, model: str = None,
+                 dimensions: Optional[int] = None):
+        self.underlying = underlying
+        self.store = store
+        self.namespace = embedding_namespace(model, dimensions)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """캐시에 없는 텍스트만 임베딩 모델로 계산합니다."""
+        keys = [self._key(text) for text in texts]
+        cached = self.store.get_many(keys)
+        missing = self._missing_texts(texts, keys, cached)
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            # 캐시 적중/미스 결과가 같도록 저장 정밀도(float32)로 맞춤
+            computed = {key: np.asarray(vector, dtype=np.float32).tolist()
+                        for key, vector in zip(missing.keys(), vectors)}
+            self.store.put_many(computed)
+            cached.update(computed)
+        return [cached[key] for key in keys]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """embed_documents의 비동기 버전입니다. SQLite 조회/저장은 스레드에서 실행합니다."""
+        keys = [self._key(text) for text in texts]
+        cached = await asyncio.to_thread(self.store.get_many, keys)
+        missing = self._missing_texts(texts, keys, cached)
+        if missing:
+            vectors = await self.underlying.aembed_documents(list(missing.values()))
+            # 캐시 적중/미스 결과가 같도록 저장 정밀도(float32)로 맞춤
+            computed = {key: np.asarray(vector, dtype=np.float32).tolist()
+                        for key, vector in zip(missing.keys(), vectors)}
+            await asyncio.to_thread(self.store.put_many, computed)
+            cached.update(computed)
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.underlying.embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.underlying.aembed_query(text)
+
+    def _key(self, text: str) -> str:
+        return f"{self.namespace}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def _missing_texts(self, texts: List[str], keys: List[str], cached: Dict[str, List[float]]) -> Dict[str, str]:
+        """캐시에 없는 (키, 텍스트)를 중복 없이 모읍니다."""
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        return missing
+
+
+class MemoizedQueryEmbeddings(Embeddings):
+    """질의 임베딩을 프로세스 메모리의 LRU에 보관해 같은 질의는 원격 임베딩 호출 없이 반환합니다.
+
+    store가 주어지면 LRU에 없는 질의를 영구 저장소(질의 전용 네임스페이스)에서 한 번 더 찾고,
+    새로 계산한 질의 임베딩도 저장해 재시작 후에도 재사용합니다. 문서 임베딩은 그대로 전달합니다.
+    """
+
+    def __init__(self, underlying: Embeddings, model: str = None, dimensions: Optional[int] = None,
+                 max_entries: int = None, store: Optional[EmbeddingCacheStore] = None):
+        self.underlying = underlying
+        self.namespace = f"query:{embedding_namespace(model, dimensions)}"
+        self.max_entries = max_entries or settings.QUERY_EMBEDDING_MEMO_SIZE
+        self.store = store
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self._memo: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.underlying.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.underlying.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        vector = self._lookup(key)
+        if vector is None and self.store is not None:
+            vector = self._load(key)
+        if vector is None:
+            vector = self._remember(key, self.underlying.embed_query(text), persist=True)
+        return vector.tolist()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """embed_query의 비동기 버전입니다. SQLite 조회/저장은 스레드에서 실행합니다."""
+        key = self._key(text)
+        vector = self._lookup(key)
+        if vector is None and self.store is not None:
+            vector = await asyncio.to_thread(self._load, key)
+        if vector is None:
+            computed = await self.underlying.aembed_query(text)
+            vector = await asyncio.to_thread(self._remember, key, computed, True)
+        return vector.tolist()
+
+    def stats(self) -> Dict[str, float]:
+        """메모리 적중, 영구 저장소 적중, 미스(원격 호출) 횟수와 적중률을 반환합니다."""
+        with self._lock:
+            lookups = self.hits + self.persistent_hits + self.misses
+            return {
+                "entries": len(self._memo),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits + self.persistent_hits) / lookups if lookups else 0.0,
+                "persistent": self.store is not None,
+            }
+
+    def _key(self, text: str) -> str:
+        return f"{self.namespace}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def _lookup(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._memo.get(key)
+            if vector is None:
+                return None
+            self._memo.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def _load(self, key: str) -> Optional[np.ndarray]:
+        """영구 저장소에서 질의 임베딩을 찾아 메모리 LRU에 올립니다. 없으면 미스로 집계합니다."""
+        found = self.store.get_many([key])
+        if key not in found:
+            return None
+        with self._lock:
+            self.persistent_hits += 1
+        return self._remember(key, found[key], persist=False)
+
+    def _remember(self, key: str, vector: List[float], persist: bool) -> np.ndarray:
+        # 캐시 적중/미스 결과가 같도록 저장 정밀도(float32)로 맞춤
+        array = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            if persist:
+                self.misses += 1
+            self._memo[key] = array
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        if persist and self.store is not None:
+            self.store.put_many({key: array.tolist()})
+        return array
+
+
+_store: Optional[EmbeddingCacheStore] = None
+_store_lock = threading.Lock()
+
+
+def get_embedding_cache_store() -> EmbeddingCacheStore:
+    """프로세스에서 공유하는 임베딩 캐시 저장소를 반환합니다."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EmbeddingCacheStore()
+        return _store
+
+
+def with_embedding_cache(embeddings: Embeddings, model: str = None, dimensions: Optional[int] = None) -> Embeddings:
+    """설정에 따라 임베딩 객체를 캐시로 감쌉니다. 모델과 차원을 주지 않으면 설정값의 네임스페이스를 씁니다."""
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return embeddings
+    return CachedEmbeddings(embeddings, get_embedding_cache_store(), model, dimensions)
+
+
+def with_query_memo(embeddings: Embeddings, model: str = None, dimensions: Optional[int] = None) -> Embeddings:
+    """설정에 따라 질의 임베딩을 메모리 LRU(선택적으로 영구 저장소)로 기억하도록 감쌉니다."""
+    if settings.QUERY_EMBEDDING_MEMO_SIZE <= 0:
+        return embeddings
+    store = get_embedding_cache_store() if settings.QUERY_EMBEDDING_MEMO_PERSIST else None
+    return MemoizedQueryEmbeddings(embeddings, model, dimensions, store=store)
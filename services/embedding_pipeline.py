@@ -0,0 +1,139 @@
+import random
+import asyncio
+import logging
+from typing import List, Optional, Callable, Awaitable
+from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
+from config.settings import settings
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+class AdaptiveConcurrencyLimiter:
+    """동시 요청 수를 제한하는 세마포어 - 429 응답 시 한도를 절반으로 줄이고, 성공 시 하나씩 늘립니다(AIMD)."""
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self, rate_limited: bool = False):
+        async with self._condition:
+            self.in_flight -= 1
+            if rate_limited:
+                self.limit = max(1, self.limit // 2)
+            elif self.limit < self.max_concurrency:
+                self.limit += 1
+            self._condition.notify_all()
+
+
+class EmbeddingPipeline:
+    """청크를 토큰 수/개수 기준 배치로 묶어 여러 배치를 동시에 임베딩하고, 완료되는 대로 sink에 넘깁니다."""
+
+    def __init__(self, embeddings: Embeddings, batch_size: int = None, batch_tokens: int = None,
+                 concurrency: int = None, max_retries: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.embeddings = embeddings
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.batch_tokens = batch_tokens or settings.EMBEDDING_BATCH_TOKENS
+        self.concurrency = concurrency or settings.EMBEDDING_CONCURRENCY
+        self.max_retries = settings.EMBEDDING_MAX_RETRIES if max_retries is None else max_retries
+        self.rate_limited_count = 0
+        self._encoding = None
+
+    def make_batches(self, documents: List[Document]) -> List[List[Document]]:
+        """배치당 청크 수와 토큰 수 한도를 넘지 않도록 순서대로 묶습니다."""
+        batches: List[List[Document]] = []
+        current: List[Document] = []
+        current_tokens = 0
+        for doc in documents:
+            tokens = self.count_tokens(doc.page_content)
+            if current and (len(current) >= self.batch_size or current_tokens + tokens > self.batch_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(doc)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def count_tokens(self, text: str) -> int:
+        """임베딩 모델 토크나이저 기준 토큰 수를 셉니다. tiktoken을 쓸 수 없으면 길이로 추정합니다."""
+        if self._encoding is None and tiktoken is not None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(settings.EMBEDDING_MODEL)
+            except Exception:
+                try:
+                    self._encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception:
+                    self._encoding = False
+        if self._encoding:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return max(1, len(text) // 3)
+
+    async def run(self, documents: List[Document],
+                  sink: Callable[[List[Document], List[List[float]]], Awaitable[None]],
+                  progress: Optional[Callable[[int], None]] = None) -> int:
+        """모든 배치를 임베딩해 sink로 전달하고, 처리한 청크 수를 반환합니다."""
+        batches = self.make_batches(documents)
+        limiter = AdaptiveConcurrencyLimiter(self.concurrency)
+        embedded = 0
+
+        async def process(batch: List[Document]):
+            vectors = await self._embed_with_backoff(batch, limiter)
+            await sink(batch, vectors)
+            return len(batch)
+
+        tasks = [asyncio.create_task(process(batch)) for batch in batches]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                embedded += await finished
+                if progress:
+                    progress(embedded)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return embedded
+
+    async def _embed_with_backoff(self, batch: List[Document], limiter: AdaptiveConcurrencyLimiter) -> List[List[float]]:
+        """레이트 리밋(429)이면 동시성을 줄이고 지수 백오프 후 재시도합니다."""
+        texts = [doc.page_content for doc in batch]
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire()
+            rate_limited = False
+            try:
+                return await self.embeddings.aembed_documents(texts)
+            except Exception as e:
+                if not self._is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                rate_limited = True
+                self.rate_limited_count += 1
+                delay = self._retry_after(e) or min(60.0, (2 ** attempt) * 0.5) * (0.5 + random.random())
+                self.logger.warning(f"임베딩 레이트 리밋 - {delay:.1f}초 후 재시도 (동시성 {limiter.limit} -> {max(1, limiter.limit // 2)})")
+            finally:
+                await limiter.release(rate_limited=rate_limited)
+            await asyncio.sleep(delay)
+
+    def _is_rate_limit_error(self, error: Exception) -> bool:
+        status_code = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+        return status_code == 429 or type(error).__name__ == "RateLimitError"
+
+    def _retry_after(self, error: Exception) -> Optional[float]:
+        """응답의 Retry-After 헤더가 있으면 대기 시간(초)으로 사용합니다."""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from langchain.schema import Document
+from services.pdf_service import pdf_service
+from services.hybrid_fusion import fuse
+from config.settings import settings
+
+
+class FederatedRetriever:
+    """여러 컬렉션을 동시에 하이브리드 검색하고, 모든 컬렉션의 후보를 한 번에 융합해 전체 상위 k개를 반환합니다.
+
+    컬렉션마다 벡터 후보 HYBRID_VECTOR_FETCH_K개와 BM25 후보 HYBRID_KEYWORD_FETCH_K개를 가져와,
+    벡터 유사도(코사인 관련도, 0~1)와 BM25 점수(질의가 얻을 수 있는 최대 점수 대비 비율, 0~1) 순으로
+    각각 하나의 목록을 만들고 단일 컬렉션 검색과 같은 fuse(HYBRID_FUSION_MODE)로 합칩니다.
+    한 컬렉션이 결과를 독차지하지 않도록 컬렉션마다 최대 per_collection_k개까지만 반환합니다.
+    시간 예산은 질의 임베딩부터 셈하며, 예산 안에 끝나지 않은 컬렉션은 건너뛰고 끝난 컬렉션의 결과만으로 답합니다.
+
+    검색은 max_concurrency개 스레드의 전용 풀에서 실행합니다. 시간 예산을 넘긴 검색 스레드는 중단할 수 없으므로
+    끝날 때까지 풀의 자리를 차지하고, 그동안 다른 요청의 검색은 풀에서 대기합니다 (동시 검색 수가 한도를 넘지 않음).
+
+    공유 컬렉션(shared) 모드에서는 벡터 검색을 doc_id 필터와 함께 한 번만 하고, 문서별로는 BM25만 검색합니다.
+    """
+
+    def __init__(self, pdf_service, k: int = None, per_collection_k: int = None,
+                 timeout: float = None, max_concurrency: int = None, mode: str = None,
+                 vector_k: int = None, keyword_k: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.pdf_service = pdf_service
+        self.k = k or settings.SEARCH_K
+        self.per_collection_k = per_collection_k or settings.FEDERATED_PER_COLLECTION_K
+        self.timeout = timeout or settings.FEDERATED_SEARCH_TIMEOUT
+        self.max_concurrency = max_concurrency or settings.FEDERATED_MAX_CONCURRENCY
+        self.mode = mode or settings.HYBRID_FUSION_MODE
+        self.vector_k = vector_k or settings.HYBRID_VECTOR_FETCH_K
+        self.keyword_k = keyword_k or settings.HYBRID_KEYWORD_FETCH_K
+        self.weights = [settings.HYBRID_SEARCH_WEIGHT, 1 - settings.HYBRID_SEARCH_WEIGHT]
+        self.searches = 0
+        self.timed_out_collections = 0
+        self.failed_collections = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="federated-search")
+
+    async def ainvoke(self, query: str, collections: Optional[List[str]] = None,
+                      query_vector: Optional[List[float]] = None) -> List[Document]:
+        """collections(파일명 또는 컬렉션명, 없으면 전체)를 검색해 융합 순위가 높은 문서 k개를 반환합니다.
+
+        query_vector가 주어지면(호출자가 이미 임베딩한 질의) 질의를 다시 임베딩하지 않습니다.
+        """
+        names = self.pdf_service.resolve_collections(collections)
+        if not names:
+            return []
+        self.searches += 1
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        try:
+            # 질의 임베딩은 한 번만 계산해 모든 컬렉션에서 재사용
+            if query_vector is None:
+                query_vector = await asyncio.wait_for(self.pdf_service.embeddings.aembed_query(query), self.timeout)
+            shared_hits = None
+            if self.pdf_service.shared_mode:
+                shared_hits = await asyncio.wait_for(
+                    loop.run_in_executor(self._executor, self._search_shared_vectors, names, query_vector),
+                    max(deadline - loop.time(), 0)
+                )
+        except asyncio.TimeoutError:
+            self.timed_out_collections += len(names)
+            self.logger.warning(f"검색 시간 예산({self.timeout}s) 초과 - 질의 임베딩/공유 벡터 검색이 끝나지 않음")
+            return []
+
+        # 풀에서 아직 시작하지 않은 검색은 시간 초과 시 취소됨 (실행 중인 스레드는 끝날 때까지 풀의 자리를 차지)
+        tasks = {
+            loop.run_in_executor(
+                self._executor, self._search_collection, name, query, query_vector,
+                shared_hits.get(name, []) if shared_hits is not None else None
+            ): name
+            for name in names
+        }
+        done, pending = await asyncio.wait(tasks, timeout=max(deadline - loop.time(), 0))
+        for task in pending:
+            task.cancel()
+        if pending:
+            self.timed_out_collections += len(pending)
+            self.logger.warning(
+                f"검색 시간 예산({self.timeout}s) 초과로 {len(pending)}개 컬렉션 제외: "
+                f"{', '.join(sorted(tasks[task] for task in pending))}"
+            )
+
+        vector_hits: List[Tuple[str, float]] = []
+        keyword_hits: List[Tuple[str, float]] = []
+        documents: Dict[str, Document] = {}
+        for task in sorted(done, key=lambda task: tasks[task]):
+            try:
+                collection_vector_hits, collection_keyword_hits, collection_documents = task.result()
+            except Exception as e:
+                self.failed_collections += 1
+                self.logger.error(f"컬렉션 '{tasks[task]}' 검색 실패: {e}")
+                continue
+            vector_hits.extend(collection_vector_hits)
+            keyword_hits.extend(collection_keyword_hits)
+            documents.update(collection_documents)
+        return self._merge(vector_hits, keyword_hits, documents)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "searches": self.searches,
+            "timed_out_collections": self.timed_out_collections,
+            "failed_collections": self.failed_collections,
+        }
+
+    def _merge(self, vector_hits: List[Tuple[str, float]], keyword_hits: List[Tuple[str, float]],
+               documents: Dict[str, Document]) -> List[Document]:
+        """컬렉션들의 후보를 검색기별 전체 순위로 모아 fuse로 융합하고, 컬렉션당 per_collection_k개 이내로 상위 k개를 고릅니다."""
+        vector_hits = sorted(vector_hits, key=lambda hit: hit[1], reverse=True)[:self.vector_k]
+        keyword_hits = sorted(keyword_hits, key=lambda hit: hit[1], reverse=True)[:self.keyword_k]
+        per_collection: Dict[str, int] = {}
+        results: List[Document] = []
+        for key, _ in fuse([vector_hits, keyword_hits], self.weights, self.mode):
+            doc = documents.get(key)
+            if doc is None:
+                continue
+            name = doc.metadata["collection"]
+            if per_collection.get(name, 0) >= self.per_collection_k:
+                continue
+            per_collection[name] = per_collection.get(name, 0) + 1
+            results.append(doc)
+            if len(results) == self.k:
+                break
+        return results
+
+    def _search_shared_vectors(self, names: List[str], query_vector: List[float]) -> Dict[str, List[Tuple[Document, float]]]:
+        """공유 컬렉션에서 대상 문서들로 필터링한 벡터 검색을 한 번 하고 결과를 문서별로 나눕니다."""
+        vectorstore = self.pdf_service._get_shared_vectorstore()
+        doc_filter = {"doc_id": names[0]} if len(names) == 1 else {"doc_id": {"$in": names}}
+        hits: Dict[str, List[Tuple[Document, float]]] = {}
+        for doc, distance in vectorstore.similarity_search_by_vector_with_relevance_scores(
+            query_vector, k=self.vector_k, filter=doc_filter
+        ):
+            hits.setdefault(doc.metadata.get("doc_id"), []).append((doc, distance))
+        return hits
+
+    def _search_collection(self, name: str, query: str, query_vector: List[float],
+                           vector_hits: Optional[List[Tuple[Document, float]]] = None
+                           ) -> Tuple[List[Tuple[str, float]], List[Tuple[str, float]], Dict[str, Document]]:
+        """한 컬렉션에서 벡터 후보 vector_k개와 BM25 후보 keyword_k개를 가져옵니다.
+
+        컬렉션 사이에 비교할 수 있는 점수(벡터 관련도, 최대 점수 대비 BM25 비율)의 (키, 점수) 목록 두 개와
+        키별 문서를 반환합니다. 키는 "컬렉션명/청크 ID"입니다. vector_hits가 주어지면(공유 컬렉션에서 이미
+        검색한 결과) 벡터 검색을 다시 하지 않습니다.
+        """
+        entry = self.pdf_service.collections.get(name)
+        if entry is None:
+            return [], [], {}
+        vectorstore = entry.vectorstore
+        documents: Dict[str, Document] = {}
+
+        relevance = vectorstore._select_relevance_score_fn()
+        if vector_hits is None:
+            vector_hits = vectorstore.similarity_search_by_vector_with_relevance_scores(query_vector, k=self.vector_k)
+        vector_scores = []
+        for doc, distance in vector_hits:
+            doc_id = doc.id or doc.metadata.get("chunk_hash")
+            vector_scores.append((f"{name}/{doc_id}", min(1.0, max(0.0, relevance(distance)))))
+            documents[doc_id] = doc
+
+        keyword_scores = []
+        if entry.bm25_retriever is not None:
+            index = entry.bm25_retriever.index
+            upper_bound = index.max_score(query)
+            hits = index.search(query, self.keyword_k) if upper_bound > 0 else []
+            keyword_scores = [(f"{name}/{doc_id}", score / upper_bound) for doc_id, score in hits]
+            # 벡터 검색에 없던 BM25 결과의 본문만 추가로 조회
+            missing = [doc_id for doc_id, _ in hits if doc_id not in documents]
+            if missing:
+                stored = vectorstore.get(ids=missing, include=["documents", "metadatas"])
+                for doc_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"]):
+                    documents[doc_id] = Document(page_content=text, metadata=metadata or {}, id=doc_id)
+
+        for doc in documents.values():
+            doc.metadata["collection"] = name
+        return vector_scores, keyword_scores, {f"{name}/{doc_id}": doc for doc_id, doc in documents.items()}
+
+
+# 전역 통합 검색기 인스턴스
+federated_retriever = FederatedRetriever(pdf_service)
@@ -0,0 +1,128 @@
+import asyncio
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from langchain.schema import Document
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+from config.settings import settings
+
+
+FUSION_MODES = ("rrf", "minmax", "zscore")
+
+# 동기 호출 시 키워드 검색을 벡터 검색과 동시에 돌리는 스레드 풀
+_keyword_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hybrid-keyword")
+
+
+def _normalize(scores: Sequence[float], mode: str) -> List[float]:
+    """한 검색기의 점수 목록을 0 근처로 맞춘 값으로 바꿉니다 (minmax: 0~1, zscore: 평균 0 / 표준편차 1)."""
+    if mode == "minmax":
+        low, high = min(scores), max(scores)
+        if high == low:
+            return [1.0] * len(scores)
+        return [(score - low) / (high - low) for score in scores]
+    mean = sum(scores) / len(scores)
+    std = math.sqrt(sum((score - mean) ** 2 for score in scores) / len(scores))
+    if std == 0:
+        return [0.0] * len(scores)
+    return [(score - mean) / std for score in scores]
+
+
+def fuse(ranked_lists: Sequence[Sequence[Tuple[str, float]]], weights: Sequence[float],
+         mode: str = "rrf", rrf_k: int = None) -> List[Tuple[str, float]]:
+    """검색기별 (문서 ID, 점수) 목록(점수 내림차순)을 하나의 순위로 합칩니다.
+
+    rrf는 순위만 사용해 weight / (rrf_k + 순위)를 더하고, minmax/zscore는 검색기별로 점수를 정규화해
+    가중합합니다. 한쪽 목록에 없는 문서는 그 검색기에서 minmax는 0, zscore는 목록 최저값보다 1 낮은 값을 받습니다.
+    """
+    if mode not in FUSION_MODES:
+        raise ValueError(f"Unknown fusion mode: {mode} (available: {', '.join(FUSION_MODES)})")
+    rrf_k = settings.RRF_K if rrf_k is None else rrf_k
+    fused: Dict[str, float] = {}
+    if mode == "rrf":
+        for hits, weight in zip(ranked_lists, weights):
+            for rank, (doc_id, _) in enumerate(hits, start=1):
+                fused[doc_id] = fused.get(doc_id, 0.0) + weight / (rrf_k + rank)
+    else:
+        normalized = []
+        for hits in ranked_lists:
+            values = _normalize([score for _, score in hits], mode) if hits else []
+            floor = 0.0 if mode == "minmax" else min(values, default=0.0) - 1.0
+            normalized.append(({doc_id: value for (doc_id, _), value in zip(hits, values)}, floor))
+        doc_ids = {doc_id for hits in ranked_lists for doc_id, _ in hits}
+        for doc_id in doc_ids:
+            fused[doc_id] = sum(weight * by_id.get(doc_id, floor)
+                                for (by_id, floor), weight in zip(normalized, weights))
+    # 점수가 같으면 먼저 나온 검색기의 순위를 따르도록 안정 정렬
+    order: Dict[str, int] = {}
+    for hits in ranked_lists:
+        for doc_id, _ in hits:
+            order.setdefault(doc_id, len(order))
+    return sorted(fused.items(), key=lambda item: (-item[1], order[item[0]]))
+
+
+class HybridFusionRetriever(BaseRetriever):
+    """벡터 검색과 BM25 검색을 동시에 실행하고, 각각 넉넉히 가져온 후보를 선택한 방식으로 융합해 상위 k개를 반환하는 검색기
+
+    EnsembleRetriever와 달리 검색기별 후보 수(vector_k, keyword_k)를 최종 k와 따로 정하고,
+    RRF 외에 점수 기반 정규화(minmax, zscore) 융합을 선택할 수 있습니다.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vectorstore: Any
+    index: Any
+    search_filter: Optional[Dict[str, Any]] = None
+    mode: str = "rrf"
+    weights: List[float] = [0.5, 0.5]
+    vector_k: int = 20
+    keyword_k: int = 20
+    k: int = 4
+    rrf_k: int = 60
+
+    def _vector_hits(self, query_vector: List[float]) -> List[Tuple[Document, float]]:
+        """질의 벡터로 벡터 검색을 하고 (문서, 관련도) 목록을 반환합니다."""
+        relevance = self.vectorstore._select_relevance_score_fn()
+        hits = self.vectorstore.similarity_search_by_vector_with_relevance_scores(
+            query_vector, k=self.vector_k, filter=self.search_filter
+        )
+        return [(doc, relevance(distance)) for doc, distance in hits]
+
+    def _keyword_hits(self, query: str) -> List[Tuple[str, float]]:
+        return self.index.search(query, self.keyword_k)
+
+    def _merge(self, vector_hits: List[Tuple[Document, float]], keyword_hits: List[Tuple[str, float]]) -> List[Document]:
+        """두 검색 결과를 융합하고, 벡터 검색에 없던 상위 문서의 본문만 벡터스토어에서 ID로 조회합니다."""
+        documents = {doc.id: doc for doc, _ in vector_hits}
+        ranked = fuse(
+            [[(doc.id, score) for doc, score in vector_hits], keyword_hits],
+            self.weights, self.mode, self.rrf_k
+        )[:self.k]
+        missing = [doc_id for doc_id, _ in ranked if doc_id not in documents]
+        if missing:
+            stored = self.vectorstore.get(ids=missing, include=["documents", "metadatas"])
+            for doc_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"]):
+                documents[doc_id] = Document(page_content=text, metadata=metadata or {}, id=doc_id)
+        return [documents[doc_id] for doc_id, _ in ranked if doc_id in documents]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        keyword_future = _keyword_pool.submit(self._keyword_hits, query)
+        vector_hits = self._vector_hits(self.vectorstore.embeddings.embed_query(query))
+        return self._merge(vector_hits, keyword_future.result())
+
+    async def _aget_relevant_documents(self, query: str, *,
+                                       run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        async def vector_search():
+            query_vector = await self.vectorstore.embeddings.aembed_query(query)
+            return await asyncio.to_thread(self._vector_hits, query_vector)
+
+        vector_hits, keyword_hits = await asyncio.gather(vector_search(), asyncio.to_thread(self._keyword_hits, query))
+        return await asyncio.to_thread(self._merge, vector_hits, keyword_hits)
+
+    async def asearch_by_vector(self, query: str, query_vector: List[float]) -> List[Document]:
+        """이미 계산한 질의 벡터로 검색합니다. 질의 임베딩을 다시 계산하지 않습니다."""
+        vector_hits, keyword_hits = await asyncio.gather(
+            asyncio.to_thread(self._vector_hits, query_vector), asyncio.to_thread(self._keyword_hits, query)
+        )
+        return await asyncio.to_thread(self._merge, vector_hits, keyword_hits)
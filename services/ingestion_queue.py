@@ -0,0 +1,120 @@
+import os
+import uuid
+import asyncio
+import logging
+import traceback
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional
+from schemas.models import JobStatus
+from services.pdf_service import pdf_service
+from config.settings import settings
+
+
+class QueueFullError(Exception):
+    """인제스트 대기열이 가득 찼을 때 발생합니다."""
+
+
+class IngestionQueue:
+    """PDF 인제스트 작업을 대기열에 넣고 제한된 수의 워커로 백그라운드 처리합니다."""
+
+    def __init__(self, workers: int = None, max_queue_size: int = None, job_history: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.workers = workers or settings.INGESTION_WORKERS
+        self.max_queue_size = max_queue_size or settings.INGESTION_QUEUE_SIZE
+        self.job_history = job_history or settings.INGESTION_JOB_HISTORY
+        self.jobs: "OrderedDict[str, JobStatus]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """워커들을 시작합니다."""
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(i), name=f"ingestion-worker-{i}")
+            for i in range(self.workers)
+        ]
+        self.logger.info(f"인제스트 워커 {self.workers}개 시작 (대기열 크기: {self.max_queue_size})")
+
+    async def stop(self):
+        """워커들을 중지합니다. 처리 중인 작업은 취소됩니다."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+
+    def submit(self, file_path: str, filename: str, file_size: int, sha256: str = None) -> JobStatus:
+        """작업을 대기열에 추가합니다. 대기열이 가득 차면 QueueFullError를 발생시킵니다.
+
+        file_path는 이 작업만 쓰는 업로드 파일이며 작업이 실패하면 삭제됩니다. filename은 표시용 원래 파일명입니다.
+        """
+        if self._queue is None:
+            raise RuntimeError("Ingestion queue is not running")
+
+        job = JobStatus(job_id=str(uuid.uuid4()), filename=filename, size=file_size, sha256=sha256)
+        try:
+            self._queue.put_nowait((job, file_path))
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Ingestion queue is full ({self.max_queue_size} jobs waiting)")
+
+        self.jobs[job.job_id] = job
+        self._prune_history()
+        return job
+
+    def get_job(self, job_id: str) -> Optional[JobStatus]:
+        """작업 상태를 반환합니다."""
+        return self.jobs.get(job_id)
+
+    def queued_count(self) -> int:
+        """대기 중인 작업 수를 반환합니다."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _worker(self, worker_id: int):
+        """대기열에서 작업을 꺼내 PDF를 처리합니다."""
+        while True:
+            job, file_path = await self._queue.get()
+            try:
+                await self._run_job(job, file_path)
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job: JobStatus, file_path: str):
+        """단일 인제스트 작업을 실행하고 결과를 작업 상태에 기록합니다."""
+        def progress(**fields):
+            for key, value in fields.items():
+                setattr(job, key, value)
+            job.updated_at = datetime.now()
+
+        try:
+            result = await pdf_service.process_pdf(
+                file_path, job.filename, job.size, progress=progress, file_hash=job.sha256
+            )
+            progress(stage="completed", result=result)
+        except asyncio.CancelledError:
+            progress(stage="failed", error="Ingestion cancelled")
+            raise
+        except Exception as e:
+            self.logger.error(f"PDF 인제스트 실패 - 작업: {job.job_id}, 파일: {job.filename}")
+            self.logger.error(f"에러 위치: {traceback.format_exc()}")
+            progress(stage="failed", error=str(e))
+
+            # 업로드된 파일 정리
+            if os.path.exists(file_path):
+                try:
+                    os.remove(file_path)
+                    self.logger.info(f"실패한 파일 삭제: {file_path}")
+                except Exception as cleanup_error:
+                    self.logger.error(f"파일 삭제 실패: {cleanup_error}")
+
+    def _prune_history(self):
+        """보관 한도를 넘은 오래된 완료 작업을 제거합니다."""
+        finished = [job_id for job_id, job in self.jobs.items() if job.stage in ("completed", "failed")]
+        for job_id in finished[:max(0, len(self.jobs) - self.job_history)]:
+            del self.jobs[job_id]
+
+
+# 전역 인제스트 대기열 인스턴스
+ingestion_queue = IngestionQueue()
@@ -0,0 +1,365 @@
+import re
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import fitz  # PyMuPDF
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from config.settings import settings
+
+# 워커 프로세스(spawn)는 이 모듈만 다시 불러오므로, 여기서는 임베딩 클라이언트나 서비스 인스턴스를 만들지 않습니다.
+
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+_extraction_pool_lock = threading.Lock()
+
+
+def _get_extraction_pool() -> ProcessPoolExecutor:
+    """페이지 추출용 프로세스 풀을 반환합니다. 처음 사용할 때 생성합니다."""
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            # 스레드가 많은 서버 프로세스에서 fork는 안전하지 않으므로 spawn 사용
+            _extraction_pool = ProcessPoolExecutor(
+                max_workers=settings.PDF_EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            atexit.register(_extraction_pool.shutdown, wait=False, cancel_futures=True)
+        return _extraction_pool
+
+
+def use_parallel_extraction(page_count: int) -> bool:
+    """이 페이지 수의 문서를 워커 프로세스에 나눠 추출할지 결정합니다."""
+    return (settings.PARALLEL_PAGE_EXTRACTION and
+            settings.PDF_EXTRACTION_WORKERS > 1 and
+            page_count >= settings.PARALLEL_EXTRACTION_MIN_PAGES)
+
+
+def extract_pages_parallel(worker: Callable[..., List[Any]], file_path: str, page_count: int, *args,
+                           progress: Optional[Callable[..., None]] = None) -> List[Any]:
+    """페이지 범위를 워커 프로세스에 나눠 worker(file_path, start, end, *args)로 추출하고 페이지 순서대로 합칩니다."""
+    pool = _get_extraction_pool()
+    step = settings.PDF_EXTRACTION_PAGES_PER_TASK
+    futures = {
+        pool.submit(worker, file_path, start, min(start + step, page_count), *args): start
+        for start in range(0, page_count, step)
+    }
+
+    results: Dict[int, List[Any]] = {}
+    pages_parsed = 0
+    try:
+        for future in as_completed(futures):
+            start = futures[future]
+            results[start] = future.result()
+            pages_parsed += len(results[start])
+            if progress:
+                progress(pages_parsed=pages_parsed)
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+
+    return [page for start in sorted(results) for page in results[start]]
+
+
+def extract_page_texts(file_path: str, start: int, end: int) -> List[str]:
+    """워커 프로세스에서 실행됩니다. [start, end) 페이지의 평문을 PyMuPDFLoader와 같은 방식으로 추출합니다."""
+    with fitz.open(file_path) as pdf_document:
+        return [pdf_document[page_num].get_text().strip() for page_num in range(start, end)]
+
+
+def extract_page_range(file_path: str, start: int, end: int, filename: str) -> List[Dict[str, Any]]:
+    """워커 프로세스에서 실행됩니다. 문서를 직접 열어 [start, end) 페이지의 내용을 추출합니다."""
+    with fitz.open(file_path) as pdf_document:
+        return [
+            extract_page_content(pdf_document[page_num], page_num + 1, filename)
+            for page_num in range(start, end)
+        ]
+
+
+def extract_page_content(page, page_num: int, filename: str) -> Dict[str, Any]:
+    """페이지에서 텍스트, 테이블, 이미지 정보를 추출합니다."""
+    page_data = {
+        'text': '',
+        'tables': [],
+        'images': [],
+        'headers': [],
+        'footers': [],
+        'page_num': page_num,
+        'filename': filename
+    }
+
+    if settings.SINGLE_PASS_PAGE_PARSING:
+        # 1-2. 페이지를 한 번만 파싱해 블록/라인/스팬 구조에서 평문을 재구성
+        blocks = page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT)
+        raw_text = _text_from_blocks(blocks)
+    else:
+        # 1. 기본 텍스트 추출
+        raw_text = page.get_text()
+
+        # 2. 구조화된 텍스트 추출 (블록 단위)
+        blocks = page.get_text("dict")
+
+    # 3. 헤더/푸터 감지 및 제거
+    if settings.REMOVE_HEADERS_FOOTERS:
+        cleaned_text, headers, footers = _remove_headers_footers(raw_text, page)
+        page_data['text'] = cleaned_text
+        page_data['headers'] = headers
+        page_data['footers'] = footers
+    else:
+        page_data['text'] = raw_text
+
+    # 4. 테이블 추출
+    if settings.EXTRACT_TABLES:
+        if settings.SINGLE_PASS_PAGE_PARSING:
+            page_data['tables'] = _tables_from_blocks(blocks)
+            if settings.FIND_RULED_TABLES:
+                page_data['tables'] = _merge_ruled_tables(page, page_data['tables'])
+        else:
+            page_data['tables'] = _extract_tables(page, raw_text)
+
+    # 5. 이미지 정보 추출
+    if settings.EXTRACT_IMAGES:
+        page_data['images'] = _extract_image_info(page)
+
+    # 6. 제목 및 섹션 헤더 감지
+    page_data['sections'] = _extract_sections(blocks)
+
+    return page_data
+
+
+def _text_from_blocks(blocks: Dict) -> str:
+    """get_text("dict") 결과에서 page.get_text()와 같은 평문을 만듭니다."""
+    lines = []
+    for block in blocks.get('blocks', []):
+        if block.get('type') == 0:  # 텍스트 블록
+            for line in block.get('lines', []):
+                lines.append(''.join(span.get('text', '') for span in line.get('spans', [])) + '\n')
+    return ''.join(lines)
+
+
+def _remove_headers_footers(text: str, page) -> Tuple[str, List[str], List[str]]:
+    """헤더와 푸터를 감지하고 제거합니다."""
+    lines = text.split('\n')
+    if len(lines) <= 3:
+        return text, [], []
+
+    headers = []
+    footers = []
+    content_lines = lines[:]
+
+    # 상단 3줄에서 헤더 패턴 감지
+    for i in range(min(3, len(lines))):
+        line = lines[i].strip()
+        if _is_header_footer_pattern(line):
+            headers.append(line)
+            content_lines[i] = ''
+
+    # 하단 3줄에서 푸터 패턴 감지
+    for i in range(max(0, len(lines) - 3), len(lines)):
+        line = lines[i].strip()
+        if _is_header_footer_pattern(line):
+            footers.append(line)
+            content_lines[i] = ''
+
+    cleaned_text = '\n'.join([line for line in content_lines if line.strip()])
+    return cleaned_text, headers, footers
+
+
+def _is_header_footer_pattern(text: str) -> bool:
+    """헤더/푸터 패턴을 감지합니다."""
+    if not text or len(text.strip()) < 3:
+        return False
+
+    # 페이지 번호 패턴
+    if re.match(r'^\s*\d+\s*$', text):
+        return True
+
+    # 날짜 패턴
+    if re.search(r'\d{4}[-/]\d{1,2}[-/]\d{1,2}', text):
+        return True
+
+    # 짧고 반복될 가능성이 높은 텍스트
+    if len(text.strip()) < 50 and (
+        'page' in text.lower() or
+        'chapter' in text.lower() or
+        'section' in text.lower() or
+        '©' in text or
+        'copyright' in text.lower()
+    ):
+        return True
+
+    return False
+
+
+def _tables_from_blocks(blocks: Dict) -> List[Dict[str, Any]]:
+    """get_text("dict") 결과에서 테이블을 찾습니다. 페이지를 다시 파싱하지 않으므로 선이 없는 표도 감지합니다.
+
+    세로 위치가 겹치는 라인들을 한 행으로 묶고, 라인 안의 탭/3칸 이상 공백도 칸 구분으로 봅니다.
+    칸이 2개 이상이고 칸 수가 같은 행이 2개 이상 가까이 이어지면 하나의 테이블로 인식합니다.
+    """
+    lines = []
+    for block in blocks.get('blocks', []):
+        if block.get('type') == 0:  # 텍스트 블록
+            for line in block.get('lines', []):
+                text = ''.join(span.get('text', '') for span in line.get('spans', []))
+                if text.strip():
+                    lines.append((fitz.Rect(line['bbox']), text))
+    lines.sort(key=lambda item: ((item[0].y0 + item[0].y1) / 2, item[0].x0))
+
+    # 세로 중심이 라인 높이의 절반 이내인 라인들을 한 행으로 묶음
+    rows: List[Tuple[fitz.Rect, List[str]]] = []
+    row_center = None
+    for rect, text in lines:
+        center = (rect.y0 + rect.y1) / 2
+        cells = [cell.strip() for cell in re.split(r'\t|\s{3,}', text) if cell.strip()]
+        if rows and center - row_center <= rect.height / 2:
+            rows[-1][0].include_rect(rect)
+            rows[-1][1].extend(cells)
+        else:
+            rows.append((fitz.Rect(rect), cells))
+            row_center = center
+
+    tables = []
+    run: List[Tuple[fitz.Rect, List[str]]] = []
+    for rect, cells in rows + [(None, [])]:
+        # 칸이 2개 이상이고 (본문 단 나눔이 아닌) 짧은 칸들로 된 행만 표의 행으로 봄
+        tabular = len(cells) >= 2 and all(len(cell) <= 60 for cell in cells)
+        if (tabular and run and len(cells) == len(run[-1][1]) and
+                rect.y0 - run[-1][0].y1 <= rect.height):
+            run.append((rect, cells))
+            continue
+        if len(run) >= 2:
+            bbox = fitz.Rect(run[0][0])
+            for row_rect, _ in run[1:]:
+                bbox.include_rect(row_rect)
+            table_rows = [row_cells for _, row_cells in run]
+            tables.append({
+                'table_id': f"table_{len(tables)}",
+                'bbox': tuple(bbox),
+                'rows': table_rows,
+                'summary': _generate_table_summary(table_rows)
+            })
+        run = [(rect, cells)] if tabular else []
+    return tables
+
+
+def _merge_ruled_tables(page, tables: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """선이 그려진 페이지는 find_tables로 다시 찾은 표(병합 셀 등을 더 정확히 구분)로 겹치는 후보를 대체합니다.
+
+    find_tables는 페이지를 다시 파싱하므로 FIND_RULED_TABLES가 켜진 경우에만 호출합니다.
+    """
+    if not page.get_cdrawings():
+        return tables
+    ruled = _extract_tables(page)
+    ruled_boxes = [fitz.Rect(table['bbox']) for table in ruled if 'bbox' in table]
+    kept = [table for table in tables
+            if not any(fitz.Rect(table['bbox']).intersects(box) for box in ruled_boxes)]
+    merged = sorted(ruled + kept, key=lambda table: (table.get('bbox') or (0, 0))[1])
+    for i, table in enumerate(merged):
+        table['table_id'] = f"table_{i}"
+    return merged
+
+
+def _extract_tables(page, raw_text: Optional[str] = None) -> List[Dict[str, Any]]:
+    """find_tables로 테이블 정보를 추출합니다. 실패하면 텍스트에서 표 형태를 찾습니다."""
+    tables = []
+    try:
+        # PyMuPDF의 테이블 추출 기능 사용
+        tabs = page.find_tables()
+        for i, tab in enumerate(tabs):
+            table_data = {
+                'table_id': f"table_{i}",
+                'bbox': tab.bbox,  # 테이블 위치
+                'rows': tab.extract(),  # 테이블 데이터
+                'summary': _generate_table_summary(tab.extract())
+            }
+            tables.append(table_data)
+    except:
+        # 테이블 추출 실패 시 텍스트 기반 테이블 감지
+        tables = _detect_text_tables(raw_text if raw_text is not None else page.get_text())
+
+    return tables
+
+
+def _generate_table_summary(table_data: List[List[str]]) -> str:
+    """테이블의 요약 설명을 생성합니다."""
+    if not table_data or len(table_data) < 2:
+        return "Empty table"
+
+    headers = table_data[0] if table_data[0] else ["Column " + str(i) for i in range(len(table_data[0]))]
+    row_count = len(table_data) - 1
+    col_count = len(headers)
+
+    return f"Table with {row_count} rows and {col_count} columns. Headers: {', '.join(headers[:3])}{'...' if len(headers) > 3 else ''}"
+
+
+def _detect_text_tables(text: str) -> List[Dict[str, Any]]:
+    """텍스트에서 테이블 형태를 감지합니다."""
+    tables = []
+    lines = text.split('\n')
+
+    for i, line in enumerate(lines):
+        # 탭이나 여러 공백으로 구분된 컬럼이 있는 경우
+        if '\t' in line or re.search(r'\s{3,}', line):
+            # 연속된 유사한 패턴의 라인들을 찾아 테이블로 인식
+            table_lines = [line]
+            j = i + 1
+            while j < len(lines) and ('\t' in lines[j] or re.search(r'\s{3,}', lines[j])):
+                table_lines.append(lines[j])
+                j += 1
+
+            if len(table_lines) >= 2:  # 최소 2줄 이상
+                tables.append({
+                    'table_id': f"text_table_{len(tables)}",
+                    'lines': table_lines,
+                    'summary': f"Text table with {len(table_lines)} rows detected"
+                })
+
+    return tables
+
+
+def _extract_image_info(page) -> List[Dict[str, Any]]:
+    """이미지 정보를 추출합니다."""
+    images = []
+    try:
+        image_list = page.get_images()
+        for i, img in enumerate(image_list):
+            images.append({
+                'image_id': f"image_{i}",
+                'bbox': page.get_image_bbox(img),
+                'size': f"{img[2]}x{img[3]}",  # width x height
+                'description': f"Image {i+1} on page"
+            })
+    except:
+        pass
+
+    return images
+
+
+def _extract_sections(blocks: Dict) -> List[Dict[str, Any]]:
+    """섹션 제목을 추출합니다."""
+    sections = []
+
+    for block in blocks.get('blocks', []):
+        if block.get('type') == 0:  # 텍스트 블록
+            for line in block.get('lines', []):
+                for span in line.get('spans', []):
+                    text = span.get('text', '').strip()
+                    font_size = span.get('size', 0)
+                    font_flags = span.get('flags', 0)
+
+                    # 제목/섹션 헤더 감지 (큰 폰트, 볼드체 등)
+                    if (font_size > 12 and
+                        (font_flags & 2**4 or font_flags & 2**6) and  # bold or italic
+                        len(text) < 100 and
+                        text and
+                        not text.endswith('.')):
+
+                        sections.append({
+                            'text': text,
+                            'font_size': font_size,
+                            'is_bold': bool(font_flags & 2**4),
+                            'bbox': span.get('bbox')
+                        })
+
+    return sections
@@ -1,183 +1,536 @@
 import os
 import re
+import asyncio
+import hashlib
 import logging
-from typing import Optional, Dict
+import shutil
+import threading
+import weakref
+from typing import Optional, Dict, Iterable, List, Callable, Tuple
+import chromadb
+from chromadb.config import Settings as ChromaSettings
+import fitz  # PyMuPDF
+from langchain.schema import Document
 from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_chroma import Chroma
 from langchain_openai import OpenAIEmbeddings
-from langchain.retrievers import EnsembleRetriever
-from langchain_community.retrievers import BM25Retriever
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from schemas.models import UploadResponse
+from services.bm25_index import BM25Index, BM25IndexRetriever
+from services.collection_cache import CollectionCache, CollectionEntry
+from services.hybrid_fusion import HybridFusionRetriever
+from services.embedding_cache import with_embedding_cache, with_query_memo
+from services.embedding_pipeline import EmbeddingPipeline
+from services.page_extraction import extract_page_texts, extract_pages_parallel, use_parallel_extraction
 from config.settings import settings
 
 
 class PDFService:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.vectorstores: Dict[str, Chroma] = {}
-        self.bm25_retrievers: Dict[str, BM25Retriever] = {}
-        self.ensemble_retrievers: Dict[str, EnsembleRetriever] = {}
-        self.embeddings = OpenAIEmbeddings(
-            model=settings.EMBEDDING_MODEL,
-            openai_api_key=settings.OPENAI_API_KEY,
-            dimensions=settings.EMBEDDING_DIMENSIONS
-        )
+        self.persist_directory = settings.CHROMA_PERSIST_DIRECTORY
+        # per_file: 파일마다 컬렉션 / shared: 모든 청크를 한 컬렉션에 두고 doc_id 메타데이터로 구분
+        self.collection_mode = settings.COLLECTION_MODE
+        # 자주 쓰는 컬렉션만 열어 두고, 나머지는 Chroma 카탈로그에 이름만 보관했다가 첫 검색 시 엶
+        self.collections = CollectionCache(self._open_collection)
+        self.file_hashes: Dict[str, str] = {}  # 파일 SHA-256 -> 컬렉션명
+        # 컬렉션명 -> (BM25 인덱스의 버전 파일 stat, 내용 버전) - 버전 파일이 바뀐 경우에만 다시 읽음
+        self._stored_versions: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+        # 사용 중(보유/대기)인 잠금만 남도록 약한 참조로 보관 - 처리가 끝난 컬렉션의 잠금은 자동으로 사라짐
+        self._collection_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._client = None
+        self._shared_vectorstore: Optional[Chroma] = None
+        self._catalog: Optional[Dict[str, None]] = None  # 삽입 순서를 유지하는 컬렉션 이름 집합
+        self._file_hashes_loaded = False
+        self._catalog_lock = threading.Lock()
+        # 문서 임베딩은 영구 캐시, 질의 임베딩은 메모리 LRU로 재사용
+        self.embeddings = with_query_memo(with_embedding_cache(self._create_embeddings()))
+        # 인제스트 배치용 클라이언트 - SDK 내부 재시도를 끄고 429를 파이프라인의 동시성 제한기(AIMD)가 직접 처리
+        self.document_embeddings = with_embedding_cache(self._create_embeddings(max_retries=0))
     
-    async def process_pdf(self, file_path: str, filename: str, file_size: int) -> UploadResponse:
-        """PDF 파일을 처리하고 벡터스토어를 생성합니다."""
-        try:
-            # 파일명에서 확장자 제거하고 안전한 컬렉션명 생성
-            collection_name = self._get_collection_name(filename)
-            
-            # 이미 처리된 파일인지 확인
-            if collection_name in self.vectorstores:
+    async def process_pdf(self, file_path: str, filename: str, file_size: int,
+                          progress: Optional[Callable[..., None]] = None,
+                          file_hash: Optional[str] = None) -> UploadResponse:
+        """PDF 파일을 처리하고 벡터스토어를 생성합니다.
+
+        progress 콜백이 주어지면 처리 단계(stage)와 진행 상황(pages_parsed, chunks_embedded 등)을
+        키워드 인자로 보고합니다. 파싱과 임베딩은 스레드에서 실행되어 이벤트 루프를 막지 않습니다.
+
+        중복 제거는 내용 기준입니다. 파일 SHA-256이 이미 등록되어 있으면 이름과 관계없이 임베딩 없이
+        반환하고, 같은 이름의 변경된 파일은 청크 해시를 비교해 바뀐 청크만 임베딩합니다.
+
+        shared 모드에서는 컬렉션명이 문서 ID(doc_id)가 되어 공유 컬렉션의 청크 메타데이터에 기록됩니다.
+        """
+        # 파일명에서 확장자 제거하고 안전한 컬렉션명 생성
+        collection_name = self._get_collection_name(filename)
+        
+        # 같은 컬렉션을 동시에 처리하지 않도록 잠금
+        async with self._get_collection_lock(collection_name):
+            vectorstore = None
+            created = False
+            try:
+                # 파일 내용 해시로 이미 처리된 파일인지 확인
+                if file_hash is None:
+                    file_hash = await asyncio.to_thread(self._hash_file, file_path)
+                await asyncio.to_thread(self._load_file_hashes)
+                existing_collection = self.file_hashes.get(file_hash)
+                if existing_collection is not None:
+                    return UploadResponse(
+                        message=f"PDF '{filename}' already exists in database (collection '{existing_collection}')",
+                        filename=filename,
+                        size=file_size,
+                        chunks=0
+                    )
+                
+                # 문서 파싱 및 분할
+                self._report_progress(progress, stage="parsing")
+                split_documents = await asyncio.to_thread(self._load_documents, file_path, filename, progress)
+                split_documents = self._assign_chunk_hashes(split_documents, file_hash, collection_name)
+                chunk_ids = [doc.id for doc in split_documents]
+                
+                # 벡터스토어 준비 (파일명별 또는 공유 컬렉션) - 같은 이름의 기존 문서는 증분 갱신
+                entry = await asyncio.to_thread(self.collections.get, collection_name)
+                if entry is not None:
+                    vectorstore = entry.vectorstore
+                else:
+                    vectorstore = await asyncio.to_thread(self._create_vectorstore, collection_name)
+                    created = True
+                scope = self.scope_filter(collection_name)
+                existing_ids = set(await asyncio.to_thread(lambda: vectorstore.get(where=scope, include=[])["ids"]))
+                
+                # 바뀐 청크만 임베딩 - 배치를 동시에 보내고 완료되는 대로 컬렉션에 저장
+                new_documents = [doc for doc in split_documents if doc.id not in existing_ids]
+                self._report_progress(progress, stage="embedding", total_chunks=len(new_documents))
+                pipeline = EmbeddingPipeline(self.document_embeddings)
+                await pipeline.run(
+                    new_documents,
+                    sink=lambda batch, vectors: asyncio.to_thread(self._add_embedded_documents, vectorstore, batch, vectors),
+                    progress=lambda count: self._report_progress(progress, chunks_embedded=count)
+                )
+                
+                # 이전 버전에만 있던 청크 삭제, 유지된 청크는 메타데이터(페이지 등)만 갱신
+                stale_ids = list(existing_ids - set(chunk_ids))
+                if stale_ids:
+                    await asyncio.to_thread(vectorstore.delete, stale_ids)
+                kept_documents = [doc for doc in split_documents if doc.id in existing_ids]
+                if kept_documents:
+                    await asyncio.to_thread(
+                        vectorstore._collection.update,
+                        ids=[doc.id for doc in kept_documents],
+                        metadatas=[doc.metadata for doc in kept_documents]
+                    )
+                
+                # BM25 및 하이브리드 검색기 생성 후 최근 사용 컬렉션으로 등록
+                self._report_progress(progress, stage="indexing")
+                entry = await asyncio.to_thread(self._build_entry, collection_name, vectorstore, split_documents)
+                self.collections.put(collection_name, entry)
+                self._add_to_catalog(collection_name)
+                self._register_file_hash(file_hash, collection_name)
+
+                if created:
+                    message = "PDF uploaded and processed successfully"
+                else:
+                    message = (f"PDF '{filename}' updated: {len(new_documents)} new chunks embedded, "
+                               f"{len(kept_documents)} reused, {len(stale_ids)} removed")
                 return UploadResponse(
-                    message=f"PDF '{filename}' already exists in database",
+                    message=message,
                     filename=filename,
                     size=file_size,
-                    chunks=0
+                    chunks=len(new_documents)
                 )
-            
-            # 향상된 문서 처리기 사용
-            if settings.USE_SEMANTIC_CHUNKING:
-                try:
-                    from services.document_processor import enhanced_processor
-                    split_documents = enhanced_processor.process_pdf_enhanced(file_path, filename)
-                except ImportError as ie:
-                    self.logger.error(f"Document processor import failed: {ie}")
-                    # Fallback to basic processing
-                    loader = PyMuPDFLoader(file_path)
-                    docs = loader.load()
-                    text_splitter = RecursiveCharacterTextSplitter(
-                        chunk_size=settings.CHUNK_SIZE,
-                        chunk_overlap=settings.CHUNK_OVERLAP
-                    )
-                    split_documents = text_splitter.split_documents(docs)
-                except Exception as e:
-                    self.logger.error(f"Enhanced processing failed: {e}, falling back to basic")
-                    # Fallback to basic processing
-                    loader = PyMuPDFLoader(file_path)
-                    docs = loader.load()
-                    text_splitter = RecursiveCharacterTextSplitter(
-                        chunk_size=settings.CHUNK_SIZE,
-                        chunk_overlap=settings.CHUNK_OVERLAP
+            except Exception as e:
+                self.logger.error(f"PDF 처리 실패 - 파일: {filename}, 경로: {file_path}")
+                self.logger.error(f"에러 상세: {str(e)}")
+                import traceback
+                self.logger.error(f"스택 트레이스: {traceback.format_exc()}")
+                
+                # 이번 요청에서 새로 만든 컬렉션(문서)이면 제거 (기존 것은 다음 업로드에서 다시 비교)
+                if created:
+                    try:
+                        if self.shared_mode:
+                            vectorstore._collection.delete(where=self.scope_filter(collection_name))
+                        else:
+                            vectorstore.delete_collection()
+                        shutil.rmtree(self._bm25_index_path(collection_name), ignore_errors=True)
+                    except Exception as cleanup_error:
+                        self.logger.error(f"컬렉션 삭제 실패: {cleanup_error}")
+                    self.collections.pop(collection_name)
+                    self._remove_from_catalog(collection_name)
+                elif vectorstore is not None:
+                    # 실패 전에 일부 청크가 바뀌었을 수 있으므로 저장된 청크로 인덱스와 내용 버전을 다시 만듦
+                    try:
+                        index = self._rebuild_index(collection_name, vectorstore)
+                        self.collections.put(collection_name, self._create_entry(collection_name, vectorstore, index))
+                    except Exception as rebuild_error:
+                        self.logger.error(f"BM25 인덱스 재생성 실패: {rebuild_error}")
+                
+                raise Exception(f"Error processing PDF: {str(e)}")
+    
+    def _create_embeddings(self, **kwargs) -> OpenAIEmbeddings:
+        """설정된 모델과 차원으로 OpenAI 임베딩 클라이언트를 만듭니다."""
+        return OpenAIEmbeddings(
+            model=settings.EMBEDDING_MODEL,
+            openai_api_key=settings.OPENAI_API_KEY,
+            dimensions=settings.EMBEDDING_DIMENSIONS,
+            **kwargs
+        )
+    
+    def _load_documents(self, file_path: str, filename: str,
+                        progress: Optional[Callable[..., None]] = None) -> List[Document]:
+        """PDF를 파싱하고 청크로 분할합니다."""
+        # 향상된 문서 처리기 사용
+        if settings.USE_SEMANTIC_CHUNKING:
+            try:
+                from services.document_processor import enhanced_processor
+                return enhanced_processor.process_pdf_enhanced(file_path, filename, progress)
+            except ImportError as ie:
+                self.logger.error(f"Document processor import failed: {ie}")
+            except Exception as e:
+                self.logger.error(f"Enhanced processing failed: {e}, falling back to basic")
+        
+        # 기존 방식 사용 (향상된 처리 실패 시 fallback)
+        return self._load_documents_basic(file_path, progress)
+    
+    def _load_documents_basic(self, file_path: str,
+                              progress: Optional[Callable[..., None]] = None) -> List[Document]:
+        """PyMuPDFLoader로 페이지를 읽고 고정 크기로 분할합니다."""
+        with fitz.open(file_path) as pdf_document:
+            page_count = pdf_document.page_count
+            self._report_progress(progress, total_pages=page_count, pages_parsed=0)
+            metadata = {
+                "source": file_path,
+                "file_path": file_path,
+                "total_pages": page_count,
+                **{k: v for k, v in pdf_document.metadata.items() if isinstance(v, (str, int))}
+            }
+
+        if use_parallel_extraction(page_count):
+            # 큰 문서는 페이지 범위를 워커 프로세스에 나눠 추출 (PyMuPDFLoader와 같은 평문, 페이지 번호는 0부터)
+            texts = extract_pages_parallel(
+                extract_page_texts, file_path, page_count,
+                progress=lambda **fields: self._report_progress(progress, **fields)
+            )
+            docs = [Document(page_content=text, metadata={**metadata, "page": page_num})
+                    for page_num, text in enumerate(texts)]
+        else:
+            loader = PyMuPDFLoader(file_path)
+            docs = []
+            for doc in loader.lazy_load():
+                docs.append(doc)
+                self._report_progress(progress, pages_parsed=len(docs))
+        
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=settings.CHUNK_SIZE,
+            chunk_overlap=settings.CHUNK_OVERLAP
+        )
+        return text_splitter.split_documents(docs)
+    
+    def _get_client(self):
+        """모든 컬렉션이 공유하는 Chroma 클라이언트를 반환합니다."""
+        with self._catalog_lock:
+            if self._client is None:
+                # 벡터 세그먼트 메모리는 Chroma가 LRU로 제한 (CollectionCache에서 컬렉션을 빼도 Chroma가 세그먼트를 계속 들고 있음)
+                self._client = chromadb.PersistentClient(
+                    path=self.persist_directory,
+                    settings=ChromaSettings(
+                        chroma_segment_cache_policy="LRU",
+                        chroma_memory_limit_bytes=settings.CHROMA_MEMORY_LIMIT_BYTES
                     )
-                    split_documents = text_splitter.split_documents(docs)
-            else:
-                # 기존 방식 사용
-                loader = PyMuPDFLoader(file_path)
-                docs = loader.load()
-                text_splitter = RecursiveCharacterTextSplitter(
-                    chunk_size=settings.CHUNK_SIZE,
-                    chunk_overlap=settings.CHUNK_OVERLAP
                 )
-                split_documents = text_splitter.split_documents(docs)
+            return self._client
+    
+    @property
+    def shared_mode(self) -> bool:
+        return self.collection_mode == "shared"
+    
+    def scope_filter(self, collection_name: str) -> Optional[Dict[str, str]]:
+        """공유 컬렉션에서 문서 하나로 검색 범위를 좁히는 메타데이터 필터를 반환합니다. per_file 모드에서는 None입니다."""
+        return {"doc_id": collection_name} if self.shared_mode else None
+    
+    def _create_vectorstore(self, collection_name: str) -> Chroma:
+        """비어 있는 Chroma 컬렉션을 생성합니다. shared 모드에서는 공유 컬렉션을 반환합니다."""
+        if self.shared_mode:
+            return self._get_shared_vectorstore()
+        return Chroma(
+            client=self._get_client(),
+            collection_name=collection_name,
+            embedding_function=self.embeddings,
+            collection_metadata={"hnsw:space": "cosine", "hnsw:M": 16, "hnsw:construction_ef": 200}
+        )
+    
+    def _get_shared_vectorstore(self) -> Chroma:
+        """모든 문서의 청크를 담는 공유 컬렉션을 반환합니다."""
+        if self._shared_vectorstore is None:
+            vectorstore = Chroma(
+                client=self._get_client(),
+                collection_name=settings.SHARED_COLLECTION_NAME,
+                embedding_function=self.embeddings,
+                collection_metadata={"hnsw:space": "cosine", "hnsw:M": 16, "hnsw:construction_ef": 200}
+            )
+            with self._catalog_lock:
+                if self._shared_vectorstore is None:
+                    self._shared_vectorstore = vectorstore
+        return self._shared_vectorstore
+    
+    def _open_collection(self, collection_name: str) -> Optional[CollectionEntry]:
+        """카탈로그에 있는 컬렉션을 열고 저장된 BM25 인덱스를 메모리 맵으로 불러옵니다.
 
-            # 벡터스토어 구축 (파일명별 컬렉션)
-            vectorstore = Chroma.from_documents(
-                documents=split_documents,
-                embedding=self.embeddings,
-                persist_directory="./chroma_db",
+        인덱스가 없거나 설정된 토크나이저와 다른 토크나이저로 만든 컬렉션은 저장된 청크로 한 번 인덱스를
+        다시 만들어 저장합니다.
+        """
+        if collection_name not in self._get_catalog():
+            return None
+        if self.shared_mode:
+            vectorstore = self._get_shared_vectorstore()
+        else:
+            vectorstore = Chroma(
+                client=self._get_client(),
                 collection_name=collection_name,
-                collection_metadata={"hnsw:space": "cosine", "hnsw:M": 16, "hnsw:ef_construction": 200}
+                embedding_function=self.embeddings
             )
+        try:
+            index = BM25Index.load(self._bm25_index_path(collection_name), tokenizer=settings.BM25_TOKENIZER)
+        except Exception as e:
+            self.logger.error(f"BM25 인덱스 로드 실패 ({collection_name}): {e}")
+            index = None
+        if index is None:
+            index = self._rebuild_index(collection_name, vectorstore)
+            self.logger.info(f"컬렉션 '{collection_name}' BM25 인덱스 생성 ({len(index.doc_ids)} 청크)")
+        return self._create_entry(collection_name, vectorstore, index)
+    
+    def _rebuild_index(self, collection_name: str, vectorstore: Chroma) -> BM25Index:
+        """컬렉션에 저장된 청크로 BM25 인덱스와 내용 버전을 다시 만들어 저장합니다."""
+        stored = vectorstore.get(where=self.scope_filter(collection_name), include=["documents", "metadatas"])
+        index = BM25Index.build(stored["ids"], stored["documents"], tokenizer=settings.BM25_TOKENIZER)
+        index.content_version = self._content_version(
+            (chunk_id, (metadata or {}).get("file_sha256", ""))
+            for chunk_id, metadata in zip(stored["ids"], stored["metadatas"])
+        )
+        index.save(self._bm25_index_path(collection_name))
+        return index
+    
+    def _build_entry(self, collection_name: str, vectorstore: Chroma, documents: List[Document]) -> CollectionEntry:
+        """청크로 BM25 인덱스를 만들어 컬렉션 옆에 저장하고 검색기를 구성합니다."""
+        index = BM25Index.build(
+            [doc.id for doc in documents],
+            [doc.page_content for doc in documents],
+            tokenizer=settings.BM25_TOKENIZER
+        )
+        index.content_version = self._content_version(
+            (doc.id, doc.metadata.get("file_sha256", "")) for doc in documents
+        )
+        index.save(self._bm25_index_path(collection_name))
+        return self._create_entry(collection_name, vectorstore, index)
+    
+    def _create_entry(self, collection_name: str, vectorstore: Chroma, index: BM25Index) -> CollectionEntry:
+        """벡터스토어와 BM25 인덱스로 하이브리드 검색기를 만들고, 캐시가 관리하는 메모리(BM25 인덱스) 크기를 기록합니다."""
+        entry = CollectionEntry(vectorstore=vectorstore, content_version=index.content_version)
+        if index.doc_ids:
+            # BM25 검색기 (키워드 검색용) - 상위 청크 본문만 벡터스토어에서 ID로 조회
+            entry.bm25_retriever = BM25IndexRetriever(index=index, vectorstore=vectorstore, k=settings.SEARCH_K)
             
-            # BM25 검색기 생성 (키워드 검색용)
-            bm25_retriever = BM25Retriever.from_documents(split_documents)
-            bm25_retriever.k = settings.SEARCH_K
-            
-            # 하이브리드 검색기 생성
-            ensemble_retriever = EnsembleRetriever(
-                retrievers=[
-                    vectorstore.as_retriever(search_kwargs={"k": settings.SEARCH_K}),
-                    bm25_retriever
-                ],
-                weights=[settings.HYBRID_SEARCH_WEIGHT, 1 - settings.HYBRID_SEARCH_WEIGHT]
+            # 하이브리드 검색기 생성 - 두 검색을 동시에 실행하고 넉넉히 가져온 후보를 융합
+            entry.hybrid_retriever = HybridFusionRetriever(
+                vectorstore=vectorstore,
+                index=index,
+                search_filter=self.scope_filter(collection_name),
+                mode=settings.HYBRID_FUSION_MODE,
+                weights=[settings.HYBRID_SEARCH_WEIGHT, 1 - settings.HYBRID_SEARCH_WEIGHT],
+                vector_k=settings.HYBRID_VECTOR_FETCH_K,
+                keyword_k=settings.HYBRID_KEYWORD_FETCH_K,
+                k=settings.SEARCH_K,
+                rrf_k=settings.RRF_K
             )
-            
-            # 메모리에 저장
-            self.vectorstores[collection_name] = vectorstore
-            self.bm25_retrievers[collection_name] = bm25_retriever
-            self.ensemble_retrievers[collection_name] = ensemble_retriever
+        # 벡터 세그먼트는 Chroma 클라이언트가 보관하므로 캐시에서 빼도 해제되지 않음 - 여기서는 BM25 인덱스만 셈
+        entry.size_bytes = index.nbytes
+        return entry
+    
+    def _bm25_index_path(self, collection_name: str) -> str:
+        """컬렉션의 BM25 인덱스 디렉토리 경로를 반환합니다."""
+        return os.path.join(self.persist_directory, "bm25", collection_name)
+    
+    def _get_catalog(self) -> Dict[str, None]:
+        """Chroma 카탈로그에서 컬렉션 이름 목록을 한 번 읽어 옵니다. 컬렉션은 열지 않습니다.
 
-            return UploadResponse(
-                message="PDF uploaded and processed successfully",
-                filename=filename,
-                size=file_size,
-                chunks=len(split_documents)
-            )
-        except Exception as e:
-            self.logger.error(f"PDF 처리 실패 - 파일: {filename}, 경로: {file_path}")
-            self.logger.error(f"에러 상세: {str(e)}")
-            import traceback
-            self.logger.error(f"스택 트레이스: {traceback.format_exc()}")
-            
-            # 실패한 컬렉션이 생성되었다면 제거
-            collection_name = self._get_collection_name(filename)
-            if collection_name in self.vectorstores:
-                del self.vectorstores[collection_name]
-            if collection_name in self.bm25_retrievers:
-                del self.bm25_retrievers[collection_name]
-            if collection_name in self.ensemble_retrievers:
-                del self.ensemble_retrievers[collection_name]
-            
-            raise Exception(f"Error processing PDF: {str(e)}")
+        shared 모드에서는 문서마다 하나씩 있는 BM25 인덱스 디렉토리가 문서 목록 역할을 합니다.
+        """
+        if self._catalog is None:
+            catalog: Dict[str, None] = {}
+            if self.shared_mode:
+                bm25_directory = os.path.join(self.persist_directory, "bm25")
+                if os.path.isdir(bm25_directory):
+                    catalog = dict.fromkeys(sorted(
+                        name for name in os.listdir(bm25_directory) if ".tmp-" not in name and ".old-" not in name
+                    ))
+            elif os.path.exists(self.persist_directory):
+                try:
+                    names = [getattr(c, "name", c) for c in self._get_client().list_collections()]
+                    # 기본 컬렉션(첫 번째)이 재시작마다 바뀌지 않도록 이름순 정렬
+                    catalog = dict.fromkeys(sorted(names))
+                except Exception as e:
+                    self.logger.error(f"컬렉션 목록 조회 실패: {e}")
+            with self._catalog_lock:
+                if self._catalog is None:
+                    self._catalog = catalog
+        return self._catalog
+    
+    def _add_to_catalog(self, collection_name: str):
+        self._get_catalog()[collection_name] = None
+    
+    def _remove_from_catalog(self, collection_name: str):
+        self._get_catalog().pop(collection_name, None)
+    
+    def _load_file_hashes(self):
+        """내용 기반 중복 제거를 위해 각 컬렉션에 저장된 파일 해시를 처음 한 번 복원합니다."""
+        if self._file_hashes_loaded:
+            return
+        for collection_name in list(self._get_catalog()):
+            try:
+                storage = settings.SHARED_COLLECTION_NAME if self.shared_mode else collection_name
+                stored = self._get_client().get_collection(storage).get(
+                    where=self.scope_filter(collection_name), limit=1, include=["metadatas"]
+                )
+                if stored["metadatas"] and stored["metadatas"][0].get("file_sha256"):
+                    self.file_hashes.setdefault(stored["metadatas"][0]["file_sha256"], collection_name)
+            except Exception:
+                continue
+        self._file_hashes_loaded = True
+    
+    def _add_embedded_documents(self, vectorstore: Chroma, documents: List[Document], vectors: List[List[float]]):
+        """미리 계산한 임베딩과 함께 청크를 컬렉션에 저장합니다."""
+        vectorstore._collection.upsert(
+            ids=[doc.id for doc in documents],
+            embeddings=vectors,
+            documents=[doc.page_content for doc in documents],
+            metadatas=[doc.metadata or None for doc in documents]
+        )
+    
+    def _assign_chunk_hashes(self, documents: List[Document], file_hash: str, collection_name: str) -> List[Document]:
+        """청크마다 내용 해시와 문서 ID를 메타데이터에 기록하고, 같은 내용의 중복 청크는 하나만 남깁니다.
+
+        저장 ID는 per_file 모드에서는 청크 해시, shared 모드에서는 다른 문서의 같은 청크와 겹치지 않도록
+        "문서 ID:청크 해시"입니다.
+        """
+        unique_documents = {}
+        for doc in documents:
+            chunk_hash = self._hash_text(doc.page_content)
+            if chunk_hash in unique_documents:
+                continue
+            doc.metadata["chunk_hash"] = chunk_hash
+            doc.metadata["file_sha256"] = file_hash
+            doc.metadata["doc_id"] = collection_name
+            doc.id = f"{collection_name}:{chunk_hash}" if self.shared_mode else chunk_hash
+            unique_documents[chunk_hash] = doc
+        return list(unique_documents.values())
+    
+    def _register_file_hash(self, file_hash: str, collection_name: str):
+        """파일 해시와 컬렉션을 연결합니다. 컬렉션의 이전 버전 해시는 제거합니다."""
+        for old_hash in [h for h, name in self.file_hashes.items() if name == collection_name]:
+            del self.file_hashes[old_hash]
+        self.file_hashes[file_hash] = collection_name
+    
+    def _hash_file(self, file_path: str) -> str:
+        """파일 내용의 SHA-256을 계산합니다."""
+        hasher = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(block)
+        return hasher.hexdigest()
+    
+    def _hash_text(self, text: str) -> str:
+        """텍스트의 SHA-256을 계산합니다."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    
+    def _get_collection_lock(self, collection_name: str) -> asyncio.Lock:
+        """컬렉션별 처리 잠금을 반환합니다. 잠금을 보유하거나 기다리는 작업이 참조하는 동안만 유지됩니다."""
+        lock = self._collection_locks.get(collection_name)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._collection_locks[collection_name] = lock
+        return lock
+    
+    def _report_progress(self, progress: Optional[Callable[..., None]], **fields):
+        """진행 상황 콜백이 있으면 호출합니다."""
+        if progress is not None:
+            progress(**fields)
     
     def get_vectorstore(self, filename: str = None) -> Optional[Chroma]:
-        """벡터스토어를 반환합니다. filename이 없으면 첫 번째 벡터스토어를 반환합니다."""
-        if filename:
-            collection_name = self._get_collection_name(filename)
-            return self.vectorstores.get(collection_name)
-        
-        # filename이 없으면 첫 번째 벡터스토어 반환
-        if self.vectorstores:
-            return next(iter(self.vectorstores.values()))
-        return None
+        """벡터스토어를 반환합니다. filename이 없으면 첫 번째 벡터스토어를 반환합니다.
+
+        메모리에 열려 있지 않은 컬렉션은 이때 열립니다.
+        """
+        entry = self._get_entry(filename)
+        return entry.vectorstore if entry else None
     
-    def get_hybrid_retriever(self, filename: str = None) -> Optional[EnsembleRetriever]:
+    def get_hybrid_retriever(self, filename: str = None) -> Optional[HybridFusionRetriever]:
         """하이브리드 검색기를 반환합니다. filename이 없으면 첫 번째 검색기를 반환합니다."""
-        if filename:
-            collection_name = self._get_collection_name(filename)
-            return self.ensemble_retrievers.get(collection_name)
-        
-        # filename이 없으면 첫 번째 하이브리드 검색기 반환
-        if self.ensemble_retrievers:
-            return next(iter(self.ensemble_retrievers.values()))
-        return None
+        entry = self._get_entry(filename)
+        return entry.hybrid_retriever if entry else None
     
     def has_vectorstore(self, filename: str = None) -> bool:
-        """벡터스토어가 존재하는지 확인합니다."""
+        """벡터스토어가 존재하는지 확인합니다. 컬렉션을 열지 않고 카탈로그만 확인합니다."""
         if filename:
             collection_name = self._get_collection_name(filename)
-            return collection_name in self.vectorstores
-        return len(self.vectorstores) > 0
+            return collection_name in self._get_catalog()
+        return len(self._get_catalog()) > 0
     
     def get_all_collections(self) -> list:
         """모든 컬렉션 이름을 반환합니다."""
-        return list(self.vectorstores.keys())
+        return list(self._get_catalog())
     
-    def load_existing_collections(self):
-        """기존 컬렉션들을 로드합니다."""
-        chroma_dir = "./chroma_db"
-        if os.path.exists(chroma_dir):
-            try:
-                # Chroma 디렉토리에서 기존 컬렉션들을 찾아서 로드
-                for item in os.listdir(chroma_dir):
-                    if os.path.isdir(os.path.join(chroma_dir, item)) and item != "chroma.sqlite3":
-                        try:
-                            vectorstore = Chroma(
-                                persist_directory=chroma_dir,
-                                embedding_function=self.embeddings,
-                                collection_name=item
-                            )
-                            self.vectorstores[item] = vectorstore
-                            
-                            # 기존 커렉션을 위한 BM25 및 하이브리드 검색기는 문서가 필요하므로 사용 시 생성
-                        except Exception:
-                            continue
-            except Exception:
-                pass
+    def collection_versions(self, names: List[str]) -> Dict[str, str]:
+        """컬렉션별 내용 버전을 반환합니다. 같은 버전이면 같은 청크(같은 파일에서 나온)로 이루어져 있습니다.
+
+        버전은 BM25 인덱스와 함께 저장된 내용 해시이므로 어느 워커가 문서를 다시 처리해도 모든 워커가 같은 값을 봅니다.
+        컬렉션마다 버전 파일의 stat만 확인하고, 파일이 바뀐 경우에만 다시 읽습니다.
+        """
+        return {name: self._stored_version(name) for name in names}
+    
+    def _stored_version(self, collection_name: str) -> str:
+        """저장된 내용 버전을 반환합니다. 다른 워커가 다시 처리해 버전이 바뀌었으면 메모리에 열린 이전 인덱스를 닫습니다."""
+        directory = self._bm25_index_path(collection_name)
+        try:
+            stat = os.stat(os.path.join(directory, BM25Index.CONTENT_VERSION_FILE))
+        except OSError:
+            return ""
+        key = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+        cached = self._stored_versions.get(collection_name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        version = BM25Index.read_content_version(directory) or ""
+        self._stored_versions[collection_name] = (key, version)
+        entry = self.collections.peek(collection_name)
+        if entry is not None and entry.content_version != version:
+            self.collections.pop(collection_name)
+        return version
+    
+    def _content_version(self, chunks: Iterable[Tuple[str, str]]) -> str:
+        """(청크 ID, 파일 SHA-256) 쌍들로 컬렉션 내용 버전을 만듭니다. 순서와 관계없이 같은 내용이면 같은 값입니다."""
+        return self._hash_text("\n".join(sorted(f"{chunk_id}:{file_hash}" for chunk_id, file_hash in chunks)))[:16]
+    
+    def resolve_collections(self, collections: Optional[List[str]] = None) -> List[str]:
+        """파일명 또는 컬렉션명 목록을 존재하는 컬렉션명으로 바꿉니다. 없으면 전체 컬렉션을 반환합니다."""
+        catalog = self._get_catalog()
+        if not collections:
+            return list(catalog)
+        names = []
+        for name in collections:
+            collection_name = self._get_collection_name(name)
+            if collection_name not in catalog:
+                self.logger.warning(f"존재하지 않는 컬렉션 무시: {name}")
+            elif collection_name not in names:
+                names.append(collection_name)
+        return names
+    
+    def _get_entry(self, filename: str = None) -> Optional[CollectionEntry]:
+        """파일명(없으면 첫 번째 컬렉션)에 해당하는 열린 컬렉션을 반환합니다."""
+        if filename:
+            collection_name = self._get_collection_name(filename)
+        else:
+            collection_name = next(iter(self._get_catalog()), None)
+            if collection_name is None:
+                return None
+        return self.collections.get(collection_name)
     
     def _get_collection_name(self, filename: str) -> str:
         """파일명을 안전한 컬렉션명으로 변환합니다."""
@@ -195,7 +548,5 @@ class PDFService:
         return name
 
 
-# 전역 PDF 서비스 인스턴스
-pdf_service = PDFService()
-# 시작 시 기존 컬렉션들 로드
-pdf_service.load_existing_collections()
\ No newline at end of file
+# 전역 PDF 서비스 인스턴스 (기존 컬렉션은 첫 사용 시 카탈로그에서 찾아 엶)
+pdf_service = PDFService()
\ No newline at end of file
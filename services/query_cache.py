@@ -0,0 +1,94 @@
+import re
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from config.settings import settings
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """유니코드 정규화(NFKC), 소문자 변환, 공백 정리로 표기만 다른 같은 질의를 하나로 맞춥니다."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", query)).strip().lower()
+
+
+class QueryCache:
+    """같은 질의의 검색 결과(또는 최종 답변)를 재사용하는 TTL/LRU 캐시
+
+    키는 정규화한 질의와 검색 대상 컬렉션별 내용 버전입니다. 컬렉션을 다시 처리하면 버전이 바뀌므로
+    이전 결과는 더 이상 조회되지 않고 TTL이나 LRU로 밀려나 사라집니다.
+    값을 계산하는 데 걸린 시간을 함께 보관해 적중으로 절약한 시간을 집계합니다.
+    """
+
+    def __init__(self, max_entries: int = None, ttl: float = None, enabled: bool = True,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries or settings.QUERY_CACHE_MAX_ENTRIES
+        self.ttl = settings.QUERY_CACHE_TTL if ttl is None else ttl
+        self.enabled = enabled
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+        # 키 -> (만료 시각, 계산 시간, 값)
+        self._entries: "OrderedDict[Hashable, Tuple[float, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(query: str, versions: Dict[str, str], *extra: Hashable) -> Tuple:
+        """질의, 컬렉션별 버전(컬렉션명 -> 버전)과 추가 구분값(모델명 등)으로 캐시 키를 만듭니다."""
+        return (normalize_query(query), tuple(sorted(versions.items())), extra)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """유효한 값이 있으면 반환하고 가장 최근 사용으로 옮깁니다. 없거나 만료되었으면 None을 반환합니다."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] <= self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += item[1]
+            return item[2]
+
+    def put(self, key: Hashable, value: Any, cost_seconds: float = 0.0):
+        """값과 계산에 걸린 시간을 저장하고, 한도를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self.clock() + self.ttl, cost_seconds, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """적중/미스, 만료/제거 횟수와 적중으로 절약한 누적 시간을 반환합니다."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "saved_seconds": round(self.saved_seconds, 3),
+            }
@@ -0,0 +1,119 @@
+import time
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+import numpy as np
+from config.settings import settings
+
+
+class SemanticCache:
+    """의미가 비슷한 질의의 답변을 재사용하는 캐시
+
+    과거 질의 벡터를 정규화해 고정 크기 행렬에 보관하고, 새 질의 벡터와의 코사인 유사도가 threshold 이상인
+    항목 중 가장 비슷한 것의 값을 반환합니다. 항목은 범위(scope, 예: 검색 대상 컬렉션과 버전, 모델)가 같을 때만
+    비교되며, TTL이 지나면 만료되고 가득 차면 가장 오래 사용되지 않은 자리를 재사용합니다.
+    """
+
+    def __init__(self, threshold: float = None, max_entries: int = None, ttl: float = None,
+                 enabled: bool = True, clock: Callable[[], float] = time.monotonic):
+        self.threshold = settings.SEMANTIC_CACHE_THRESHOLD if threshold is None else threshold
+        self.max_entries = max_entries or settings.SEMANTIC_CACHE_MAX_ENTRIES
+        self.ttl = settings.SEMANTIC_CACHE_TTL if ttl is None else ttl
+        self.enabled = enabled
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+        self._vectors: Optional[np.ndarray] = None  # (max_entries, 차원), 첫 항목의 차원으로 생성
+        self._scopes = np.full(self.max_entries, -1, dtype=np.int64)  # 범위 번호, -1은 빈 자리
+        self._expires = np.zeros(self.max_entries)
+        self._last_used = np.zeros(self.max_entries)
+        self._costs = np.zeros(self.max_entries)
+        self._values: List[Any] = [None] * self.max_entries
+        self._scope_ids: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, vector: List[float], scope: Hashable) -> Optional[Any]:
+        """같은 범위에서 가장 비슷한 과거 질의의 값을 반환합니다. 유사도가 threshold 미만이면 None을 반환합니다."""
+        if not self.enabled:
+            return None
+        query = self._normalize(vector)
+        with self._lock:
+            now = self.clock()
+            scope_id = self._scope_ids.get(scope)
+            if self._vectors is None or scope_id is None or query.shape[0] != self._vectors.shape[1]:
+                self.misses += 1
+                return None
+            candidates = np.flatnonzero((self._scopes == scope_id) & (self._expires > now))
+            if candidates.size:
+                similarities = self._vectors[candidates] @ query
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    slot = candidates[best]
+                    self._last_used[slot] = now
+                    self.hits += 1
+                    self.saved_seconds += self._costs[slot]
+                    return self._values[slot]
+            self.misses += 1
+            return None
+
+    def put(self, vector: List[float], scope: Hashable, value: Any, cost_seconds: float = 0.0):
+        """질의 벡터와 값을 저장합니다. 빈 자리나 만료된 자리가 없으면 가장 오래 사용되지 않은 자리를 씁니다."""
+        if not self.enabled:
+            return
+        query = self._normalize(vector)
+        with self._lock:
+            now = self.clock()
+            if self._vectors is None or query.shape[0] != self._vectors.shape[1]:
+                # 임베딩 차원이 바뀌면(모델 변경) 기존 항목은 비교할 수 없으므로 비움
+                self._vectors = np.zeros((self.max_entries, query.shape[0]), dtype=np.float32)
+                self._scopes[:] = -1
+            free = np.flatnonzero((self._scopes < 0) | (self._expires <= now))
+            if free.size:
+                slot = int(free[0])
+            else:
+                slot = int(np.argmin(self._last_used))
+                self.evictions += 1
+            if scope not in self._scope_ids and len(self._scope_ids) >= self.max_entries:
+                self._compact_scopes(now)
+            self._vectors[slot] = query
+            self._scopes[slot] = self._scope_ids.setdefault(scope, max(self._scope_ids.values(), default=-1) + 1)
+            self._expires[slot] = now + self.ttl
+            self._last_used[slot] = now
+            self._costs[slot] = cost_seconds
+            self._values[slot] = value
+
+    def clear(self):
+        with self._lock:
+            self._scopes[:] = -1
+            self._values = [None] * self.max_entries
+            self._scope_ids.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """적중/미스, 제거 횟수, 유효 항목 수와 적중으로 절약한 누적 시간을 반환합니다."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": int(((self._scopes >= 0) & (self._expires > self.clock())).sum()),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "saved_seconds": round(self.saved_seconds, 3),
+            }
+
+    def _compact_scopes(self, now: float):
+        """더 이상 유효한 항목이 없는 범위(예: 이전 컬렉션 버전)의 번호를 정리합니다. 호출자가 잠금을 잡고 있어야 합니다."""
+        live = set(self._scopes[(self._scopes >= 0) & (self._expires > now)].tolist())
+        self._scope_ids = {scope: scope_id for scope, scope_id in self._scope_ids.items() if scope_id in live}
+        self._scopes[~np.isin(self._scopes, list(live))] = -1
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm > 0 else array
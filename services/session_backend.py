@@ -0,0 +1,271 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from schemas.models import ChatSession, ChatMessage
+from config.settings import settings
+
+
+class SessionBackend(ABC):
+    """세션 영구 저장소 인터페이스 - SessionStore가 메모리 캐시 뒤에서 읽기/쓰기를 위임합니다."""
+
+    @abstractmethod
+    def load(self, session_id: str, max_messages: int) -> Optional[ChatSession]:
+        """세션과 최근 max_messages개 메시지를 불러옵니다. 없거나 만료되었으면 None을 반환합니다."""
+
+    @abstractmethod
+    def save(self, session: ChatSession):
+        """세션 전체(메시지 포함)를 저장합니다. 같은 ID의 기존 세션은 덮어씁니다."""
+
+    @abstractmethod
+    def append(self, session_id: str, message: ChatMessage):
+        """세션에 메시지 하나를 추가합니다."""
+
+    @abstractmethod
+    def revision(self, session_id: str) -> Optional[Tuple[int, int]]:
+        """세션에 지금까지 추가된 메시지 수와 요약 위치(fold 참고)를 반환합니다. 세션이 없으면 None을 반환합니다."""
+
+    @abstractmethod
+    def fold(self, session_id: str, upto: int, summary: str):
+        """지금까지 추가된 메시지 중 앞에서부터 upto개(메시지 한도로 이미 빠진 메시지 포함)가 요약에 반영되었다고
+        표시하고 요약을 저장합니다. 요약 위치는 뒤로만 움직입니다."""
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        """세션과 메시지를 삭제합니다."""
+
+    @abstractmethod
+    def expire(self, idle_ttl: float) -> int:
+        """idle_ttl 동안 기록이 없는 세션을 삭제하고 삭제한 수를 반환합니다."""
+
+    def flush(self):
+        """버퍼에 쌓인 쓰기를 저장소에 반영합니다."""
+
+    def close(self):
+        self.flush()
+
+    def stats(self) -> Dict[str, float]:
+        return {}
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """SQLite(WAL) 기반 세션 저장소 - 같은 호스트의 여러 uvicorn 워커가 파일 하나로 세션을 공유합니다.
+
+    메시지는 추가만 하는(append-only) 행으로 기록하며, 메시지 추가는 메모리 버퍼에 모았다가
+    batch_size개가 쌓이거나 flush()가 호출될 때(SessionStore의 백그라운드 작업이 commit_interval마다 호출)
+    한 트랜잭션으로 커밋합니다. 세션 생성/삭제는 다른 워커가 바로 볼 수 있도록 즉시 커밋합니다.
+    """
+
+    def __init__(self, path: str = None, batch_size: int = None, clock=time.time):
+        self.logger = logging.getLogger(__name__)
+        self.path = path or settings.SESSION_DB_PATH
+        self.batch_size = batch_size or settings.SESSION_DB_BATCH_SIZE
+        self.clock = clock
+        self.commits = 0
+        self.flushed_messages = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # 아직 커밋하지 않은 메시지 (session_id, role, content, timestamp)와 세션별 개수
+        self._pending: List[Tuple[str, str, str, str]] = []
+        self._pending_counts: Dict[str, int] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        """처음 사용할 때 SQLite 파일을 열고 스키마를 준비합니다. 호출자가 잠금을 잡고 있어야 합니다."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, created_at TEXT NOT NULL, updated_at TEXT NOT NULL, "
+                "message_count INTEGER NOT NULL, last_write REAL NOT NULL, "
+                "folded INTEGER NOT NULL DEFAULT 0, summary TEXT NOT NULL DEFAULT '')"
+            )
+            # 요약 컬럼이 없던 이전 파일에 컬럼 추가
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+            if "folded" not in columns:
+                conn.execute("ALTER TABLE sessions ADD COLUMN folded INTEGER NOT NULL DEFAULT 0")
+            if "summary" not in columns:
+                conn.execute("ALTER TABLE sessions ADD COLUMN summary TEXT NOT NULL DEFAULT ''")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                "role TEXT NOT NULL, content TEXT NOT NULL, timestamp TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_last_write ON sessions(last_write)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def load(self, session_id: str, max_messages: int) -> Optional[ChatSession]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT created_at, updated_at, message_count, folded, summary FROM sessions WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            # 요약 위치(folded)보다 앞의 메시지는 제외
+            pending = [pending[1:] for pending in self._pending if pending[0] == session_id]
+            live = min(max_messages, row[2] + len(pending) - row[3])
+            rows = conn.execute(
+                "SELECT role, content, timestamp FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                (session_id, max(live, 0))
+            ).fetchall()
+            rows.reverse()
+            rows = (rows + pending)[-live:] if live > 0 else []
+        messages = [
+            ChatMessage(role=role, content=content, timestamp=datetime.fromisoformat(timestamp))
+            for role, content, timestamp in rows
+        ]
+        return ChatSession(
+            session_id=session_id, messages=messages, summary=row[4],
+            created_at=datetime.fromisoformat(row[0]),
+            updated_at=messages[-1].timestamp if messages else datetime.fromisoformat(row[1])
+        )
+
+    def save(self, session: ChatSession):
+        with self._lock:
+            conn = self._connection()
+            self._write_pending(conn)
+            self._drop_pending(session.session_id)
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session.session_id,))
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions "
+                "(session_id, created_at, updated_at, message_count, last_write, folded, summary) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?)",
+                (session.session_id, session.created_at.isoformat(), session.updated_at.isoformat(),
+                 len(session.messages), self.clock(), session.summary)
+            )
+            conn.executemany(
+                "INSERT INTO messages (session_id, role, content, timestamp) VALUES (?, ?, ?, ?)",
+                [(session.session_id, m.role, m.content, m.timestamp.isoformat()) for m in session.messages]
+            )
+            conn.commit()
+            self.commits += 1
+
+    def append(self, session_id: str, message: ChatMessage):
+        with self._lock:
+            self._pending.append((session_id, message.role, message.content, message.timestamp.isoformat()))
+            self._pending_counts[session_id] = self._pending_counts.get(session_id, 0) + 1
+            if len(self._pending) >= self.batch_size:
+                self._commit_pending()
+
+    def revision(self, session_id: str) -> Optional[Tuple[int, int]]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT message_count, folded FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            return row[0] + self._pending_counts.get(session_id, 0), row[1]
+
+    def fold(self, session_id: str, upto: int, summary: str):
+        with self._lock:
+            conn = self._connection()
+            self._write_pending(conn)
+            conn.execute(
+                "UPDATE sessions SET folded = MAX(folded, ?), summary = ? WHERE session_id = ?",
+                (upto, summary, session_id)
+            )
+            conn.commit()
+            self.commits += 1
+
+    def delete(self, session_id: str):
+        with self._lock:
+            conn = self._connection()
+            self._drop_pending(session_id)
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            conn.commit()
+            self.commits += 1
+
+    def expire(self, idle_ttl: float) -> int:
+        with self._lock:
+            conn = self._connection()
+            self._write_pending(conn)
+            cutoff = self.clock() - idle_ttl
+            conn.execute(
+                "DELETE FROM messages WHERE session_id IN (SELECT session_id FROM sessions WHERE last_write < ?)",
+                (cutoff,)
+            )
+            removed = conn.execute("DELETE FROM sessions WHERE last_write < ?", (cutoff,)).rowcount
+            conn.commit()
+            self.commits += 1
+            return removed
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self._commit_pending()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            sessions, messages = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(message_count), 0) FROM sessions"
+            ).fetchone()
+            return {
+                "type": "sqlite",
+                "path": self.path,
+                "sessions": sessions,
+                "messages": messages,
+                "pending_messages": len(self._pending),
+                "flushed_messages": self.flushed_messages,
+                "commits": self.commits,
+            }
+
+    def _commit_pending(self):
+        """버퍼의 메시지를 한 트랜잭션으로 커밋합니다. 호출자가 잠금을 잡고 있어야 합니다."""
+        conn = self._connection()
+        self._write_pending(conn)
+        conn.commit()
+        self.commits += 1
+
+    def _write_pending(self, conn: sqlite3.Connection):
+        """버퍼의 메시지를 기록합니다 (커밋은 호출자가 합니다). 다른 워커가 삭제한 세션의 메시지는 버립니다."""
+        if not self._pending:
+            return
+        conn.executemany(
+            "INSERT INTO messages (session_id, role, content, timestamp) "
+            "SELECT ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM sessions WHERE session_id = ?)",
+            [(*pending, pending[0]) for pending in self._pending]
+        )
+        now = self.clock()
+        latest = {pending[0]: pending[3] for pending in self._pending}
+        conn.executemany(
+            "UPDATE sessions SET message_count = message_count + ?, updated_at = ?, last_write = ? "
+            "WHERE session_id = ?",
+            [(count, latest[session_id], now, session_id) for session_id, count in self._pending_counts.items()]
+        )
+        self.flushed_messages += len(self._pending)
+        self._pending = []
+        self._pending_counts = {}
+
+    def _drop_pending(self, session_id: str):
+        if self._pending_counts.pop(session_id, None):
+            self._pending = [pending for pending in self._pending if pending[0] != session_id]
+
+
+def create_session_backend() -> Optional[SessionBackend]:
+    """SESSION_BACKEND 설정에 맞는 영구 저장소를 만듭니다. memory면 None(프로세스 메모리에만 보관)을 반환합니다."""
+    if settings.SESSION_BACKEND == "memory":
+        return None
+    if settings.SESSION_BACKEND == "sqlite":
+        return SQLiteSessionBackend()
+    raise ValueError(f"지원하지 않는 세션 저장소: {settings.SESSION_BACKEND}")
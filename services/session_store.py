@@ -0,0 +1,271 @@
+import sys
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from schemas.models import ChatSession, ChatMessage
+from services.session_backend import SessionBackend
+from config.settings import settings
+
+
+# ChatMessage 객체와 역할/시각 필드의 대략적인 고정 크기 (본문 문자열은 따로 계산)
+_MESSAGE_OVERHEAD_BYTES = 400
+
+
+def _message_bytes(message: ChatMessage) -> int:
+    return sys.getsizeof(message.content) + _MESSAGE_OVERHEAD_BYTES
+
+
+class SessionStore(MutableMapping):
+    """세션 ID -> ChatSession 매핑을 메모리 한도 안에서 유지하는 저장소
+
+    dict처럼 사용할 수 있으며, 다음 한도를 지킵니다.
+    - 세션 수가 max_sessions를 넘으면 가장 오래 사용되지 않은 세션부터 제거 (LRU)
+    - idle_ttl 동안 사용되지 않은 세션은 조회 시 또는 백그라운드 정리 작업이 제거
+    - 세션마다 최근 max_messages개 메시지만 보관 (오래된 메시지부터 버림)
+
+    backend가 주어지면 이 저장소는 영구 저장소 앞의 읽기 캐시가 됩니다. 캐시에 없는 세션은 backend에서
+    불러오고, 캐시된 세션도 backend의 리비전과 비교해 다른 워커가 메시지를 추가했거나 세션을 삭제했으면
+    다시 불러오거나 제거합니다. 리비전 확인은 세션마다 revision_ttl 동안 재사용하므로 한 요청 안의 반복 조회는
+    backend를 거치지 않습니다. 이때 LRU/유휴 제거는 캐시에서만 빠지는 것이며,
+    세션 삭제와 유휴 세션 만료는 backend에도 반영됩니다.
+    """
+
+    def __init__(self, max_sessions: int = None, idle_ttl: float = None, max_messages: int = None,
+                 sweep_interval: float = None, clock: Callable[[], float] = time.monotonic,
+                 backend: Optional[SessionBackend] = None, revision_ttl: float = None):
+        self.logger = logging.getLogger(__name__)
+        self.max_sessions = max_sessions or settings.SESSION_MAX_SESSIONS
+        self.idle_ttl = settings.SESSION_IDLE_TTL if idle_ttl is None else idle_ttl
+        self.max_messages = max_messages or settings.SESSION_MAX_MESSAGES
+        self.sweep_interval = sweep_interval or settings.SESSION_SWEEP_INTERVAL
+        self.clock = clock
+        self.backend = backend
+        self.commit_interval = settings.SESSION_DB_COMMIT_INTERVAL
+        self.revision_ttl = settings.SESSION_REVISION_TTL if revision_ttl is None else revision_ttl
+        self.evictions = 0
+        self.expirations = 0
+        self.trimmed_messages = 0
+        self.backend_loads = 0
+        # 세션 ID -> 마지막 사용 시각 (사용 순서대로 정렬, 앞쪽이 가장 오래됨)
+        self._last_access: "OrderedDict[str, float]" = OrderedDict()
+        self._sessions: Dict[str, ChatSession] = {}
+        self._bytes: Dict[str, int] = {}
+        self._total_bytes = 0
+        # 세션 ID -> 캐시가 반영한 backend 리비전 (추가된 메시지 수, 요약 위치) (backend 사용 시)
+        self._synced: Dict[str, Tuple[int, int]] = {}
+        # 세션 ID -> backend 리비전을 마지막으로 확인한 시각 (backend 사용 시)
+        self._checked: Dict[str, float] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    def __getitem__(self, session_id: str) -> ChatSession:
+        if session_id in self._sessions and self._expired(session_id):
+            self._discard(session_id)
+            if self.backend is None:
+                self.expirations += 1
+        if self.backend is not None:
+            return self._read_through(session_id)
+        if session_id not in self._sessions:
+            raise KeyError(session_id)
+        self._touch(session_id)
+        return self._sessions[session_id]
+
+    def __setitem__(self, session_id: str, session: ChatSession):
+        overflow = len(session.messages) - self.max_messages
+        if overflow > 0:
+            del session.messages[:overflow]
+            self.trimmed_messages += overflow
+        if self.backend is not None:
+            self.backend.save(session)
+        self._cache(session_id, session, (len(session.messages), 0))
+
+    def __delitem__(self, session_id: str):
+        if session_id not in self:
+            raise KeyError(session_id)
+        if self.backend is not None:
+            self.backend.delete(session_id)
+        self._discard(session_id)
+
+    def __iter__(self) -> Iterator[str]:
+        # backend 사용 시에도 이 프로세스에 캐시된 세션만 순회합니다
+
+        return iter(list(self._last_access))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __repr__(self) -> str:
+        return f"SessionStore({len(self)} sessions)"
+
+    def append_message(self, session_id: str, message: ChatMessage) -> List[ChatMessage]:
+        """세션에 메시지를 추가하고, 메시지 한도를 넘어 버린 오래된 메시지 목록을 반환합니다."""
+        session = self[session_id]
+        session.messages.append(message)
+        session.updated_at = message.timestamp
+        if self.backend is not None:
+            self.backend.append(session_id, message)
+            appended, folded = self._synced[session_id]
+            self._synced[session_id] = (appended + 1, folded)
+        added = _message_bytes(message)
+        dropped: List[ChatMessage] = []
+        overflow = len(session.messages) - self.max_messages
+        if overflow > 0:
+            dropped = session.messages[:overflow]
+            del session.messages[:overflow]
+            self.trimmed_messages += overflow
+            added -= sum(_message_bytes(old) for old in dropped)
+        self._bytes[session_id] += added
+        self._total_bytes += added
+        return dropped
+
+    def fold_messages(self, session_id: str, messages: List[ChatMessage], summary: str) -> int:
+        """요약에 반영한 메시지를 세션 앞쪽에서 제거하고 요약을 바꿉니다. 제거한 메시지 수를 반환합니다.
+
+        요약하는 동안 메시지 한도 때문에 앞쪽 메시지가 이미 빠졌을 수 있으므로, 세션 맨 앞과 같은 메시지만 제거합니다.
+        backend에는 제거한 개수가 아니라 요약이 어디까지 덮는지(지금까지 추가된 메시지 중 앞에서부터 몇 개인지)를
+        기록하므로, 한도로 빠진 메시지가 있어도 다른 워커가 이미 요약된 메시지를 다시 불러오지 않습니다.
+        """
+        session = self[session_id]
+        # 세션 맨 앞 메시지가 지금까지 추가된 메시지 중 몇 번째인지 (앞쪽은 한도로 빠졌거나 이미 요약됨)
+        offset = self._synced[session_id][0] - len(session.messages) if self.backend is not None else 0
+        count = 0
+        for message in messages:
+            if count < len(session.messages) and session.messages[count] == message:
+                count += 1
+        removed = session.messages[:count]
+        del session.messages[:count]
+        session.summary = summary
+        freed = sum(_message_bytes(message) for message in removed)
+        self._bytes[session_id] -= freed
+        self._total_bytes -= freed
+        if self.backend is not None:
+            self.backend.fold(session_id, offset + count, summary)
+            appended, folded = self._synced[session_id]
+            self._synced[session_id] = (appended, max(folded, offset + count))
+        return count
+
+    def sweep(self) -> int:
+        """유휴 시간이 지난 세션을 제거하고 제거한 수를 반환합니다.
+        backend가 있으면 캐시에서는 빼기만 하고, 만료(삭제)는 모든 워커의 기록을 기준으로 backend에서 합니다."""
+        removed = self._sweep_cache()
+        if self.backend is not None:
+            removed = self.backend.expire(self.idle_ttl)
+            self.expirations += removed
+        return removed
+
+    def start_sweeper(self):
+        """sweep_interval마다 유휴 세션을 정리하고, backend가 있으면 commit_interval마다 쓰기 버퍼를 커밋하는
+        백그라운드 작업을 시작합니다."""
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_forever(), name="session-sweeper")
+        if self.backend is not None and self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_forever(), name="session-flusher")
+
+    async def stop_sweeper(self):
+        """백그라운드 작업을 멈추고 backend의 남은 쓰기를 커밋합니다."""
+        tasks = [task for task in (self._sweeper, self._flusher) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._sweeper = None
+        self._flusher = None
+        if self.backend is not None:
+            await asyncio.to_thread(self.backend.close)
+
+    def stats(self) -> Dict[str, int]:
+        """세션 수, 보관 중인 메시지 수와 추정 메모리, 제거 횟수를 반환합니다."""
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "messages": sum(len(session.messages) for session in self._sessions.values()),
+            "max_messages_per_session": self.max_messages,
+            "bytes_retained": self._total_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "trimmed_messages": self.trimmed_messages,
+            "backend_loads": self.backend_loads,
+            "backend": self.backend.stats() if self.backend is not None else {"type": "memory"},
+        }
+
+    async def _sweep_forever(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            removed = self._sweep_cache()
+            if self.backend is not None:
+                # SQLite 쓰기는 잠금을 기다릴 수 있으므로 이벤트 루프 밖에서 실행합니다
+                removed = await asyncio.to_thread(self.backend.expire, self.idle_ttl)
+                self.expirations += removed
+            if removed:
+                self.logger.info(f"유휴 세션 {removed}개 제거 (현재 {len(self._sessions)}개)")
+
+    async def _flush_forever(self):
+        while True:
+            await asyncio.sleep(self.commit_interval)
+            await asyncio.to_thread(self.backend.flush)
+
+    def _sweep_cache(self) -> int:
+        """유휴 시간이 지난 세션을 캐시에서 제거합니다. 오래된 세션이 앞에 있으므로 앞에서부터 확인합니다.
+        backend가 없을 때만 만료로 세어 그 수를 반환합니다."""
+        removed = 0
+        while self._last_access:
+            session_id = next(iter(self._last_access))
+            if not self._expired(session_id):
+                break
+            self._discard(session_id)
+            if self.backend is None:
+                self.expirations += 1
+                removed += 1
+        return removed
+
+    def _read_through(self, session_id: str) -> ChatSession:
+        """backend의 리비전이 캐시와 다르면(다른 워커가 메시지를 추가하거나 요약) 다시 불러오고,
+        backend에 없으면 캐시에서도 제거합니다. revision_ttl 안에 확인한 캐시된 세션은 그대로 반환합니다."""
+        now = self.clock()
+        if session_id in self._sessions and now - self._checked[session_id] < self.revision_ttl:
+            self._touch(session_id)
+            return self._sessions[session_id]
+        revision = self.backend.revision(session_id)
+        if revision is None:
+            self._discard(session_id)
+            raise KeyError(session_id)
+        if self._synced.get(session_id) != revision:
+            session = self.backend.load(session_id, self.max_messages)
+            if session is None:
+                self._discard(session_id)
+                raise KeyError(session_id)
+            self.backend_loads += 1
+            self._cache(session_id, session, revision)
+        self._checked[session_id] = now
+        self._touch(session_id)
+        return self._sessions[session_id]
+
+    def _cache(self, session_id: str, session: ChatSession, synced: Tuple[int, int]):
+        """세션을 캐시에 넣고 세션 수 한도를 넘으면 가장 오래 사용되지 않은 세션을 캐시에서 제거합니다."""
+        self._discard(session_id)
+        self._sessions[session_id] = session
+        self._synced[session_id] = synced
+        self._checked[session_id] = self.clock()
+        self._bytes[session_id] = sum(_message_bytes(message) for message in session.messages)
+        self._total_bytes += self._bytes[session_id]
+        self._touch(session_id)
+        while len(self._sessions) > self.max_sessions:
+            oldest = next(iter(self._last_access))
+            self._discard(oldest)
+            self.evictions += 1
+
+    def _expired(self, session_id: str) -> bool:
+        return self.clock() - self._last_access[session_id] >= self.idle_ttl
+
+    def _touch(self, session_id: str):
+        self._last_access[session_id] = self.clock()
+        self._last_access.move_to_end(session_id)
+
+    def _discard(self, session_id: str):
+        if self._sessions.pop(session_id, None) is not None:
+            self._last_access.pop(session_id, None)
+            self._synced.pop(session_id, None)
+            self._checked.pop(session_id, None)
+            self._total_bytes -= self._bytes.pop(session_id, 0)
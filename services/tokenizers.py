@@ -0,0 +1,95 @@
+import re
+from functools import lru_cache, partial
+from typing import Callable, Dict, List, Tuple
+from config.settings import settings
+
+
+# 한글 음절 덩어리, 영문/숫자 덩어리 단위로 자름 (구두점은 버림)
+_TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z0-9]+(?:[._-][a-z0-9]+)*")
+
+# 체언 뒤에 붙는 조사와 서술격 조사 활용형
+_JOSA = {
+    "으로부터", "에서부터", "에게서", "한테서", "로부터", "이라고", "이라는", "이라면", "으로서", "으로써",
+    "입니다", "이에요", "이었다", "였다", "이다", "에서는", "에서도", "에게는", "으로는", "로는", "과의", "와의",
+    "까지", "부터", "에서", "에게", "한테", "께서", "처럼", "보다", "마다", "조차", "마저", "이나", "이며",
+    "이고", "으로", "로서", "로써", "라고", "라는", "에는", "에도", "와는", "과는", "은", "는", "이", "가",
+    "을", "를", "의", "에", "와", "과", "도", "만", "로", "나", "랑", "며",
+}
+# 긴 조사부터 검사하도록 길이 목록을 내림차순으로 보관
+_JOSA_LENGTHS = sorted({len(josa) for josa in _JOSA}, reverse=True)
+
+# 명사의 끝 음절과 겹치기 쉬운 조사는 어간이 두 음절 이상일 때만 제거 (예: 나이, 고도, 결과)
+_AMBIGUOUS_JOSA = {"이", "가", "도", "나", "의", "며", "로", "과", "와", "과는", "와는", "과의", "와의"}
+
+
+@lru_cache(maxsize=settings.JOSA_STEM_CACHE_SIZE)
+def strip_josa(word: str) -> str:
+    """한글 어절 끝의 조사를 제거해 어간을 반환합니다."""
+    for length in _JOSA_LENGTHS:
+        if len(word) > length and word[-length:] in _JOSA:
+            josa, stem = word[-length:], word[:-length]
+            if josa in _AMBIGUOUS_JOSA and len(stem) < 2:
+                continue
+            return stem
+    return word
+
+
+def tokenize_whitespace(text: str) -> List[str]:
+    """공백 기준으로 토큰화합니다 (BM25Retriever 기본 동작과 동일)."""
+    return text.split()
+
+
+def tokenize_korean_josa(text: str) -> List[str]:
+    """한글은 조사를 떼어 낸 어간, 영문/숫자는 소문자 단어로 토큰화합니다."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(strip_josa(token) if "가" <= token[0] <= "힣" else token)
+    return tokens
+
+
+def tokenize_korean_bigram(text: str) -> List[str]:
+    """한글 어절은 음절 바이그램으로, 영문/숫자는 소문자 단어로 토큰화합니다."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if "가" <= token[0] <= "힣" and len(token) > 1:
+            tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            tokens.append(token)
+    return tokens
+
+
+TOKENIZERS: Dict[str, Callable[[str], List[str]]] = {
+    "whitespace": tokenize_whitespace,
+    "korean_josa": tokenize_korean_josa,
+    "korean_bigram": tokenize_korean_bigram,
+}
+
+
+def get_tokenizer(name: str) -> Callable[[str], List[str]]:
+    """이름에 해당하는 토크나이저를 반환합니다."""
+    if name not in TOKENIZERS:
+        raise ValueError(f"Unknown tokenizer: {name} (available: {', '.join(TOKENIZERS)})")
+    return TOKENIZERS[name]
+
+
+@lru_cache(maxsize=settings.QUERY_TOKENIZER_CACHE_SIZE)
+def _query_tokens(name: str, query: str) -> Tuple[str, ...]:
+    return tuple(TOKENIZERS[name](query))
+
+
+def get_query_tokenizer(name: str) -> Callable[[str], Tuple[str, ...]]:
+    """질의용 토크나이저를 반환합니다. 반복되는 질의의 결과만 작은 LRU에 캐시합니다.
+
+    청크는 인덱스를 만들 때 한 번만 토큰화하므로 캐시하지 않습니다 (청크 본문을 키로 두면 캐시가 수백 MB가 됩니다).
+    """
+    get_tokenizer(name)
+    return partial(_query_tokens, name)
+
+
+def tokenizer_cache_info() -> Dict[str, Dict[str, int]]:
+    """질의 토큰화와 조사 제거 캐시의 적중/미스 통계를 반환합니다."""
+    stats = {}
+    for name, cached in (("query", _query_tokens), ("josa_stem", strip_josa)):
+        info = cached.cache_info()
+        stats[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+    return stats
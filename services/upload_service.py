@@ -0,0 +1,148 @@
+import os
+import uuid
+import hashlib
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+import anyio
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from config.settings import settings
+
+
+class UploadTooLargeError(Exception):
+    """업로드 크기가 허용 한도를 넘었을 때 발생합니다."""
+
+
+class InvalidUploadError(Exception):
+    """multipart 본문이 잘못되었거나, 파일 필드가 없거나, 허용되지 않는 파일 형식일 때 발생합니다."""
+
+
+@dataclass
+class SpooledUpload:
+    path: str
+    size: int
+    sha256: str
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+
+
+class _FilePartCollector:
+    """MultipartParser 콜백 - field_name 파일 파트의 헤더를 확인하고 본문 조각을 모읍니다."""
+
+    def __init__(self, field_name: str, max_size: int, allowed_content_types: Optional[List[str]]):
+        self.field_name = field_name
+        self.max_size = max_size
+        self.allowed_content_types = allowed_content_types
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.size = 0
+        self.found = False
+        self.capturing = False
+        self.chunks: List[bytes] = []
+        self._headers: Dict[bytes, bytes] = {}
+        self._field = b""
+        self._value = b""
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._field.lower()] = self._value
+        self._field = b""
+        self._value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if self.found or options.get(b"name", b"").decode("latin-1") != self.field_name:
+            return
+        # 파일 형식은 본문을 받기 전에 헤더에서 바로 거절
+        content_type = self._headers.get(b"content-type", b"").decode("latin-1")
+        if self.allowed_content_types is not None and content_type not in self.allowed_content_types:
+            raise InvalidUploadError("Only PDF files are allowed")
+        self.filename = os.path.basename(options.get(b"filename", b"").decode("utf-8", "replace")) or None
+        self.content_type = content_type
+        self.capturing = True
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if not self.capturing:
+            return
+        self.size += end - start
+        if self.size > self.max_size:
+            raise UploadTooLargeError(f"File too large. Max size is {self.max_size // (1024*1024)}MB")
+        # 파서는 입력 버퍼를 재사용하므로 복사해 둠
+        self.chunks.append(bytes(data[start:end]))
+
+    def on_part_end(self):
+        if self.capturing:
+            self.capturing = False
+            self.found = True
+
+
+async def spool_multipart_upload(content_type: str, body: AsyncIterator[bytes], field_name: str = "file",
+                                 dest_dir: str = None, max_size: int = None, max_body_size: int = None,
+                                 allowed_content_types: Optional[List[str]] = None) -> SpooledUpload:
+    """multipart/form-data 요청 본문을 받는 대로 파싱해 field_name 파일 파트만 디스크에 비동기로 기록합니다.
+
+    요청 본문 전체를 미리 받아 두지 않으므로, 파일 크기가 max_size를 넘거나 (Content-Length가 없는
+    chunked 요청을 포함해) 받은 본문이 max_body_size를 넘는 순간 나머지 전송을 읽지 않고 중단합니다.
+    파일 형식은 파트 헤더를 받자마자 확인합니다. 실패하면 임시 파일을 지우고 예외를 발생시킵니다.
+    """
+    max_size = max_size or settings.MAX_FILE_SIZE
+    max_body_size = max_body_size or max_size + settings.MULTIPART_OVERHEAD
+    dest_dir = dest_dir or settings.UPLOAD_DIR
+
+    mime_type, options = parse_options_header(content_type or "")
+    boundary = options.get(b"boundary")
+    if mime_type != b"multipart/form-data" or not boundary:
+        raise InvalidUploadError("Expected a multipart/form-data request body")
+
+    collector = _FilePartCollector(field_name, max_size, allowed_content_types)
+    parser = MultipartParser(boundary, collector.callbacks())
+    os.makedirs(dest_dir, exist_ok=True)
+    temp_path = os.path.join(dest_dir, f".{uuid.uuid4().hex}.part")
+    hasher = hashlib.sha256()
+    received = 0
+
+    try:
+        async with await anyio.open_file(temp_path, "wb") as out:
+            async for chunk in body:
+                received += len(chunk)
+                if received > max_body_size:
+                    raise UploadTooLargeError(f"File too large. Max size is {max_size // (1024*1024)}MB")
+                parser.write(chunk)
+                if collector.chunks:
+                    data = b"".join(collector.chunks)
+                    collector.chunks.clear()
+                    hasher.update(data)
+                    await out.write(data)
+            parser.finalize()
+        if not collector.found:
+            raise InvalidUploadError(f"Missing file field '{field_name}'")
+    except MultipartParseError as e:
+        os.remove(temp_path)
+        raise InvalidUploadError(f"Malformed multipart body: {e}")
+    except BaseException:
+        # 중단된 업로드의 임시 파일 정리
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return SpooledUpload(path=temp_path, size=collector.size, sha256=hasher.hexdigest(),
+                         filename=collector.filename, content_type=collector.content_type)
@@ -0,0 +1,29 @@
+import fitz
+import pytest
+
+
+class FakeClock:
+    """테스트에서 시각을 직접 정하는 시계 - 캐시/세션 저장소의 clock 인자로 넘깁니다."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def make_pdf():
+    """make_pdf(path, pages) - 페이지마다 pages의 텍스트 한 항목을 넣은 PDF를 저장하고 경로를 반환합니다."""
+    def make(path, pages):
+        document = fitz.open()
+        for text in pages:
+            document.new_page().insert_text((72, 72), text)
+        document.save(str(path))
+        return str(path)
+    return make
@@ -0,0 +1,75 @@
+import numpy as np
+from langchain_core.embeddings import FakeEmbeddings
+from langchain_chroma import Chroma
+
+from services.bm25_index import BM25Index, BM25IndexRetriever
+
+
+TEXTS = [
+    "hybrid search combines vectors and keywords",
+    "keywords keywords keywords everywhere",
+    "vectors only here",
+    "nothing relevant",
+]
+IDS = ["a", "b", "c", "d"]
+
+
+class TestBM25Index:
+    def test_ranks_by_term_frequency_and_rarity(self):
+        index = BM25Index.build(IDS, TEXTS)
+
+        results = index.search("keywords vectors", k=3)
+
+        assert [doc_id for doc_id, _ in results] == ["b", "a", "c"]
+        assert results[0][1] > results[1][1] > results[2][1] > 0
+        assert index.search("unknown", k=3) == []
+
+    def test_save_and_memory_mapped_load_give_same_results(self, tmp_path):
+        index = BM25Index.build(IDS, TEXTS)
+        index.save(str(tmp_path / "bm25"))
+        index.save(str(tmp_path / "bm25"))  # 기존 인덱스 교체
+
+        loaded = BM25Index.load(str(tmp_path / "bm25"))
+
+        assert isinstance(loaded.postings, np.memmap)
+        assert loaded.search("keywords vectors", k=4) == index.search("keywords vectors", k=4)
+        assert BM25Index.load(str(tmp_path / "missing")) is None
+
+    async def test_retriever_fetches_top_chunks_from_vectorstore(self, tmp_path):
+        vectorstore = Chroma(
+            collection_name="bm25-test",
+            embedding_function=FakeEmbeddings(size=4),
+            persist_directory=str(tmp_path / "chroma_db")
+        )
+        vectorstore.add_texts(TEXTS, ids=IDS, metadatas=[{"page": i} for i in range(4)])
+        retriever = BM25IndexRetriever(index=BM25Index.build(IDS, TEXTS), vectorstore=vectorstore, k=2)
+
+        documents = await retriever.ainvoke("keywords")
+
+        assert [doc.page_content for doc in documents] == [TEXTS[1], TEXTS[0]]
+        assert documents[0].metadata == {"page": 1}
+
+    def test_maxscore_pruning_matches_exhaustive_search(self):
+        rng = np.random.default_rng(7)
+        vocabulary = [f"w{i}" for i in range(300)]
+        # 지프 분포 - 흔한 용어의 긴 포스팅 목록에서 가지치기가 일어나도록
+        texts = [" ".join(vocabulary[min(r, 299)] for r in rng.zipf(1.3, 40) - 1) for _ in range(2000)]
+        index = BM25Index.build([str(i) for i in range(2000)], texts)
+
+        for _ in range(50):
+            query = " ".join(vocabulary[min(r, 299)] for r in rng.zipf(1.3, 4) - 1)
+            pruned = index.search(query, k=5)
+            exhaustive = index.search_exhaustive(query, k=5)
+            assert [doc_id for doc_id, _ in pruned] == [doc_id for doc_id, _ in exhaustive]
+            assert np.allclose([s for _, s in pruned], [s for _, s in exhaustive], rtol=1e-5)
+
+    def test_korean_tokenizer_matches_particle_inflected_forms(self, tmp_path):
+        texts = ["계약서를 검토한 결과입니다", "회의록에서 일정을 확인합니다"]
+        index = BM25Index.build(["a", "b"], texts, tokenizer="korean_josa")
+
+        assert [doc_id for doc_id, _ in index.search("계약서의 검토 결과", k=2)] == ["a"]
+        assert BM25Index.build(["a", "b"], texts).search("계약서의", k=2) == []
+
+        index.save(str(tmp_path / "bm25"))
+        assert BM25Index.load(str(tmp_path / "bm25"), tokenizer="korean_josa").tokenizer == "korean_josa"
+        assert BM25Index.load(str(tmp_path / "bm25"), tokenizer="whitespace") is None
@@ -1,11 +1,15 @@
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 from datetime import datetime
 import uuid
+import asyncio
+import time
 
 from services.chat_service import ChatService, chat_service
 from schemas.models import ChatRequest, ChatResponse, ChatData, SourceInfo, ChatSession, ChatMessage
+from services.context_budget import HistoryWindow, count_tokens, message_tokens
 from config.settings import settings
+from langchain.schema import Document
 
 
 class TestChatService:
@@ -89,21 +93,72 @@ class TestChatService:
         expected = "이전 대화:\n사용자: 안녕하세요\n어시스턴트: 안녕하세요! 무엇을 도와드릴까요?\n\n현재 질문: "
         assert context == expected
     
-    def test_get_conversation_context_limit_messages(self):
+    def test_get_conversation_context_limit_messages(self, monkeypatch):
+        monkeypatch.setattr(settings, "CONTEXT_TOKEN_BUDGET", 400)
+        monkeypatch.setattr(settings, "HISTORY_TOKEN_SHARE", 0.5)
         session_id = "test-session"
         
         for i in range(10):
-            self.chat_service.add_message_to_session(session_id, "user", f"메시지 {i}")
-            self.chat_service.add_message_to_session(session_id, "assistant", f"답변 {i}")
+            self.chat_service.add_message_to_session(session_id, "user", f"메시지 {i} " + "질문 내용 " * 10)
+            self.chat_service.add_message_to_session(session_id, "assistant", f"답변 {i} " + "답변 내용 " * 10)
         
         context = self.chat_service.get_conversation_context(session_id)
         
         assert "메시지 0" not in context
-        assert "메시지 1" not in context
-        assert "메시지 2" not in context
-        assert "메시지 3" not in context
-        assert "메시지 6" in context
-        assert "메시지 9" in context
+        assert "메시지 9" in context and "답변 9" in context
+        history = context.removeprefix("이전 대화:\n").removesuffix("\n현재 질문: ")
+        assert count_tokens(history) <= 200
+    
+    def test_get_conversation_context_stops_at_oversized_message(self, monkeypatch):
+        monkeypatch.setattr(settings, "CONTEXT_TOKEN_BUDGET", 1000)
+        session_id = "test-session"
+        self.chat_service.add_message_to_session(session_id, "user", "첫 질문")
+        self.chat_service.add_message_to_session(session_id, "user", "긴 글 " * 2000)
+        self.chat_service.add_message_to_session(session_id, "assistant", "요약했습니다")
+        self.chat_service.add_message_to_session(session_id, "user", "다음 질문")
+        
+        context = self.chat_service.get_conversation_context(session_id)
+        
+        assert context == "이전 대화:\n어시스턴트: 요약했습니다\n사용자: 다음 질문\n\n현재 질문: "
+    
+    def test_fit_documents_uses_budget_left_by_history(self, monkeypatch):
+        session_id = "test-session"
+        self.chat_service.add_message_to_session(session_id, "user", "질문")
+        documents = [Document(page_content="첫 번째 문서 " * 20), Document(page_content="두 번째 문서 " * 200),
+                     Document(page_content="세 번째 문서")]
+        history_tokens = message_tokens(self.chat_service.sessions[session_id].messages[0])
+        budget = history_tokens + count_tokens(documents[0].page_content) + count_tokens(documents[2].page_content)
+        monkeypatch.setattr(settings, "CONTEXT_TOKEN_BUDGET", budget)
+        
+        fitted = self.chat_service._fit_documents(session_id, documents)
+        
+        assert fitted == [documents[0], documents[2]]
+    
+    def test_incremental_context_matches_full_rebuild(self, monkeypatch):
+        monkeypatch.setattr(settings, "CONTEXT_TOKEN_BUDGET", 600)
+        monkeypatch.setattr(self.chat_service.sessions, "max_messages", 12)
+        session_id = "test-session"
+        lengths = [3, 40, 5, 400, 2, 60, 8, 8, 30, 1, 90, 4, 4, 20, 7, 50, 3, 3]
+        
+        for i, words in enumerate(lengths):
+            self.chat_service.add_message_to_session(session_id, "user" if i % 2 == 0 else "assistant",
+                                                     f"메시지 {i} " + "내용 " * words)
+            session = self.chat_service.sessions[session_id]
+            rebuilt = HistoryWindow.build(session.messages, self.chat_service._history_budget())
+            assert self.chat_service.get_conversation_context(session_id) == rebuilt.context()
+    
+    def test_context_window_is_updated_in_place_and_render_reused(self):
+        session_id = "test-session"
+        self.chat_service.add_message_to_session(session_id, "user", "첫 질문")
+        first = self.chat_service.get_conversation_context(session_id)
+        window = self.chat_service.sessions[session_id]._history
+        
+        assert self.chat_service.get_conversation_context(session_id) is first
+        self.chat_service.add_message_to_session(session_id, "assistant", "첫 답변")
+        context = self.chat_service.get_conversation_context(session_id)
+        
+        assert self.chat_service.sessions[session_id]._history is window
+        assert context == "이전 대화:\n사용자: 첫 질문\n어시스턴트: 첫 답변\n\n현재 질문: "
     
     def test_extract_source_info_empty(self):
         source_info = self.chat_service._extract_source_info([])
@@ -142,28 +197,22 @@ class TestChatService:
     
     @patch('services.chat_service.pdf_service')
     @patch('services.chat_service.ChatOpenAI')
-    @patch('services.chat_service.RetrievalQA')
-    async def test_process_chat_success(self, mock_retrieval_qa, mock_chat_openai, mock_pdf_service):
+    @patch('services.chat_service.create_stuff_documents_chain')
+    async def test_process_chat_success(self, mock_create_chain, mock_chat_openai, mock_pdf_service):
         mock_pdf_service.has_vectorstore.return_value = True
         
-        mock_vectorstore = Mock()
         mock_retriever = Mock()
-        mock_vectorstore.as_retriever.return_value = mock_retriever
-        mock_pdf_service.get_vectorstore.return_value = mock_vectorstore
+        mock_retriever.ainvoke = AsyncMock(return_value=[
+            Mock(page_content="본문", metadata={"page": 1, "source": "test.pdf"})
+        ])
+        mock_pdf_service.get_hybrid_retriever.return_value = mock_retriever
         
         mock_llm = Mock()
         mock_chat_openai.return_value = mock_llm
         
-        mock_qa_chain = Mock()
-        mock_retrieval_qa.from_chain_type.return_value = mock_qa_chain
-        
-        mock_result = {
-            "result": "테스트 답변입니다",
-            "source_documents": [
-                Mock(metadata={"page": 1, "source": "test.pdf"})
-            ]
-        }
-        mock_qa_chain.invoke.return_value = mock_result
+        mock_answer_chain = Mock()
+        mock_answer_chain.ainvoke = AsyncMock(return_value="테스트 답변입니다")
+        mock_create_chain.return_value = mock_answer_chain
         
         request = ChatRequest(message="테스트 질문입니다", session_id="test-session")
         response = await self.chat_service.process_chat(request)
@@ -182,10 +231,136 @@ class TestChatService:
         assert session.messages[1].role == "assistant"
         assert session.messages[1].content == "테스트 답변입니다"
     
+    @patch('services.chat_service.pdf_service')
+    @patch('services.chat_service.ChatOpenAI')
+    @patch('services.chat_service.create_stuff_documents_chain')
+    async def test_repeated_question_reuses_cached_retrieval_until_reingest(self, mock_create_chain, mock_chat_openai,
+                                                                           mock_pdf_service):
+        versions = {"manual": 1}
+        mock_pdf_service.has_vectorstore.return_value = True
+        mock_pdf_service.get_all_collections.return_value = ["manual"]
+        mock_pdf_service.resolve_collections.return_value = ["manual"]
+        mock_pdf_service.collection_versions.side_effect = lambda names: dict(versions)
+        mock_retriever = Mock()
+        mock_retriever.ainvoke = AsyncMock(return_value=[Mock(page_content="본문", metadata={"page": 1, "source": "test.pdf"})])
+        mock_pdf_service.get_hybrid_retriever.return_value = mock_retriever
+        mock_answer_chain = Mock()
+        mock_answer_chain.ainvoke = AsyncMock(return_value="답변")
+        mock_create_chain.return_value = mock_answer_chain
+
+        # 새 세션마다 같은 질문 (대화 맥락이 같음)
+        await self.chat_service.process_chat(ChatRequest(message="반품 정책은?", session_id="a"))
+        await self.chat_service.process_chat(ChatRequest(message="반품  정책은?", session_id="b"))
+        assert mock_retriever.ainvoke.call_count == 1
+
+        versions["manual"] = 2  # 컬렉션 재처리
+        await self.chat_service.process_chat(ChatRequest(message="반품 정책은?", session_id="c"))
+        assert mock_retriever.ainvoke.call_count == 2
+        stats = self.chat_service.retrieval_cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+    
+    @patch('services.chat_service.pdf_service')
+    @patch('services.chat_service.ChatOpenAI')
+    @patch('services.chat_service.create_stuff_documents_chain')
+    async def test_cached_answer_skips_retrieval_and_llm(self, mock_create_chain, mock_chat_openai, mock_pdf_service):
+        self.chat_service.answer_cache.enabled = True
+        mock_pdf_service.has_vectorstore.return_value = True
+        mock_pdf_service.get_all_collections.return_value = ["manual"]
+        mock_pdf_service.resolve_collections.return_value = ["manual"]
+        mock_pdf_service.collection_versions.return_value = {"manual": 1}
+        mock_retriever = Mock()
+        mock_retriever.ainvoke = AsyncMock(return_value=[Mock(page_content="본문", metadata={"page": 1, "source": "test.pdf"})])
+        mock_pdf_service.get_hybrid_retriever.return_value = mock_retriever
+        mock_answer_chain = Mock()
+        mock_answer_chain.ainvoke = AsyncMock(return_value="답변")
+        mock_create_chain.return_value = mock_answer_chain
+
+        first = await self.chat_service.process_chat(ChatRequest(message="반품 정책은?", session_id="a"))
+        second = await self.chat_service.process_chat(ChatRequest(message="반품 정책은?", session_id="b"))
+
+        assert second.data["answer"] == first.data["answer"] == "답변"
+        assert second.data["sources"] == first.data["sources"]
+        assert mock_answer_chain.ainvoke.call_count == 1
+        assert mock_retriever.ainvoke.call_count == 1
+        assert self.chat_service.sessions["b"].messages[-1].content == "답변"
+    
+    @patch('services.chat_service.pdf_service')
+    @patch('services.chat_service.ChatOpenAI')
+    @patch('services.chat_service.create_stuff_documents_chain')
+    async def test_paraphrased_first_question_reuses_semantic_cache(self, mock_create_chain, mock_chat_openai,
+                                                                    mock_pdf_service):
+        self.chat_service.semantic_cache.enabled = True
+        self.chat_service.semantic_cache.threshold = 0.9
+        vectors = {"환불은 어떻게 하나요?": [1.0, 0.0], "환불 방법 알려줘": [0.98, 0.05], "배송은 얼마나 걸리나요?": [0.0, 1.0]}
+        mock_pdf_service.has_vectorstore.return_value = True
+        mock_pdf_service.get_all_collections.return_value = ["manual"]
+        mock_pdf_service.resolve_collections.return_value = ["manual"]
+        mock_pdf_service.collection_versions.return_value = {"manual": 1}
+        # 첫 질문의 검색 질의(history 모드는 이전 대화 형식을 붙인 질의)는 질문으로 끝남
+        mock_pdf_service.embeddings.aembed_query = AsyncMock(
+            side_effect=lambda text: next(vector for question, vector in vectors.items() if text.endswith(question))
+        )
+        documents = [Mock(page_content="본문", metadata={"page": 3, "source": "manual.pdf"})]
+        mock_retriever = Mock()
+        mock_retriever.ainvoke = AsyncMock(return_value=documents)
+        mock_retriever.asearch_by_vector = AsyncMock(return_value=documents)
+        mock_pdf_service.get_hybrid_retriever.return_value = mock_retriever
+        mock_answer_chain = Mock()
+        mock_answer_chain.ainvoke = AsyncMock(return_value="환불 답변")
+        mock_create_chain.return_value = mock_answer_chain
+
+        await self.chat_service.process_chat(ChatRequest(message="환불은 어떻게 하나요?", session_id="a"))
+        cached = await self.chat_service.process_chat(ChatRequest(message="환불 방법 알려줘", session_id="b"))
+        assert cached.data["answer"] == "환불 답변"
+        assert cached.data["query"] == "환불 방법 알려줘"
+        assert cached.data["sources"] == [{"page": "3", "source": "manual.pdf"}]
+        assert mock_answer_chain.ainvoke.call_count == 1
+
+        # 다른 질문, 이전 대화가 있는 질문, 캐시 우회 요청은 새로 생성
+        await self.chat_service.process_chat(ChatRequest(message="배송은 얼마나 걸리나요?", session_id="c"))
+        await self.chat_service.process_chat(ChatRequest(message="환불 방법 알려줘", session_id="a"))
+        await self.chat_service.process_chat(ChatRequest(message="환불 방법 알려줘", session_id="d", bypass_cache=True))
+        assert mock_answer_chain.ainvoke.call_count == 4
+        assert mock_pdf_service.embeddings.aembed_query.call_count == 4
+    
+    @patch('services.chat_service.federated_retriever')
+    @patch('services.chat_service.pdf_service')
+    @patch('services.chat_service.ChatOpenAI')
+    @patch('services.chat_service.create_stuff_documents_chain')
+    async def test_first_question_miss_embeds_the_query_once(self, mock_create_chain, mock_chat_openai,
+                                                            mock_pdf_service, mock_federated_retriever):
+        self.chat_service.semantic_cache.enabled = True
+        mock_pdf_service.has_vectorstore.return_value = True
+        mock_pdf_service.get_all_collections.return_value = ["manual", "faq"]
+        mock_pdf_service.resolve_collections.return_value = ["manual", "faq"]
+        mock_pdf_service.collection_versions.return_value = {"manual": "a", "faq": "b"}
+        mock_pdf_service.embeddings.aembed_query = AsyncMock(return_value=[1.0, 0.0])
+
+        async def search(query, collections=None, query_vector=None):
+            # 통합 검색기는 벡터를 받지 못하면 질의를 직접 임베딩함
+            if query_vector is None:
+                await mock_pdf_service.embeddings.aembed_query(query)
+            return [Mock(page_content="본문", metadata={"page": 1, "source": "manual.pdf"})]
+
+        mock_federated_retriever.ainvoke = AsyncMock(side_effect=search)
+        mock_answer_chain = Mock()
+        mock_answer_chain.ainvoke = AsyncMock(return_value="답변")
+        mock_create_chain.return_value = mock_answer_chain
+
+        response = await self.chat_service.process_chat(ChatRequest(message="환불은 어떻게 하나요?", session_id="s"))
+
+        assert response.success is True
+        # 의미 기반 캐시 조회에 쓴 질의 벡터를 검색이 그대로 재사용
+        assert mock_pdf_service.embeddings.aembed_query.call_count == 1
+        query, _ = mock_federated_retriever.ainvoke.call_args[0]
+        assert mock_pdf_service.embeddings.aembed_query.call_args[0][0] == query
+        assert mock_federated_retriever.ainvoke.call_args[1]["query_vector"] == [1.0, 0.0]
+    
     @patch('services.chat_service.pdf_service')
     @patch('services.chat_service.ChatOpenAI')
     async def test_process_chat_exception(self, mock_chat_openai, mock_pdf_service):
         mock_pdf_service.has_vectorstore.return_value = True
+        mock_pdf_service.get_hybrid_retriever.return_value = None
         mock_pdf_service.get_vectorstore.side_effect = Exception("테스트 에러")
         
         request = ChatRequest(message="테스트 질문")
@@ -197,26 +372,20 @@ class TestChatService:
     
     @patch('services.chat_service.pdf_service')
     @patch('services.chat_service.ChatOpenAI')
-    @patch('services.chat_service.RetrievalQA')
-    async def test_process_chat_with_conversation_context(self, mock_retrieval_qa, mock_chat_openai, mock_pdf_service):
+    @patch('services.chat_service.create_stuff_documents_chain')
+    async def test_process_chat_with_conversation_context(self, mock_create_chain, mock_chat_openai, mock_pdf_service):
         mock_pdf_service.has_vectorstore.return_value = True
         
-        mock_vectorstore = Mock()
         mock_retriever = Mock()
-        mock_vectorstore.as_retriever.return_value = mock_retriever
-        mock_pdf_service.get_vectorstore.return_value = mock_vectorstore
+        mock_retriever.ainvoke = AsyncMock(return_value=[])
+        mock_pdf_service.get_hybrid_retriever.return_value = mock_retriever
         
         mock_llm = Mock()
         mock_chat_openai.return_value = mock_llm
         
-        mock_qa_chain = Mock()
-        mock_retrieval_qa.from_chain_type.return_value = mock_qa_chain
-        
-        mock_result = {
-            "result": "두 번째 답변입니다",
-            "source_documents": []
-        }
-        mock_qa_chain.invoke.return_value = mock_result
+        mock_answer_chain = Mock()
+        mock_answer_chain.ainvoke = AsyncMock(return_value="두 번째 답변입니다")
+        mock_create_chain.return_value = mock_answer_chain
         
         session_id = "context-test-session"
         self.chat_service.add_message_to_session(session_id, "user", "첫 번째 질문")
@@ -227,36 +396,103 @@ class TestChatService:
         
         assert response.success is True
         
-        called_query = mock_qa_chain.invoke.call_args[0][0]["query"]
+        called_query = mock_answer_chain.ainvoke.call_args[0][0]["question"]
         assert "이전 대화:" in called_query
         assert "첫 번째 질문" in called_query
         assert "첫 번째 답변" in called_query
         assert "두 번째 질문" in called_query
+        assert mock_retriever.ainvoke.call_args[0][0] == called_query
+    
+    @patch('services.chat_service.pdf_service')
+    @patch('services.chat_service.ChatOpenAI')
+    @patch('services.chat_service.create_stuff_documents_chain')
+    async def test_question_mode_retrieves_on_current_message_only(self, mock_create_chain, mock_chat_openai,
+                                                                   mock_pdf_service, monkeypatch):
+        monkeypatch.setattr(settings, "RETRIEVAL_QUERY_MODE", "question")
+        mock_pdf_service.has_vectorstore.return_value = True
+        mock_retriever = Mock()
+        mock_retriever.ainvoke = AsyncMock(return_value=[])
+        mock_pdf_service.get_hybrid_retriever.return_value = mock_retriever
+        mock_answer_chain = Mock()
+        mock_answer_chain.ainvoke = AsyncMock(return_value="두 번째 답변입니다")
+        mock_create_chain.return_value = mock_answer_chain
+        
+        session_id = "question-mode-session"
+        self.chat_service.add_message_to_session(session_id, "user", "첫 번째 질문")
+        self.chat_service.add_message_to_session(session_id, "assistant", "첫 번째 답변")
+        await self.chat_service.process_chat(ChatRequest(message="두 번째 질문", session_id=session_id))
+        
+        # 이전 대화는 답변 생성에만 사용하고 검색은 현재 질문으로
+        assert "첫 번째 답변" in mock_answer_chain.ainvoke.call_args[0][0]["question"]
+        assert mock_retriever.ainvoke.call_args[0][0] == "두 번째 질문"
     
     @patch('services.chat_service.pdf_service')
     @patch('services.chat_service.ChatOpenAI')
-    @patch('services.chat_service.RetrievalQA')
+    @patch('services.chat_service.create_stuff_documents_chain')
+    async def test_condensed_mode_retrieves_on_rewritten_question(self, mock_create_chain, mock_chat_openai,
+                                                                  mock_pdf_service, monkeypatch):
+        monkeypatch.setattr(settings, "RETRIEVAL_QUERY_MODE", "condensed")
+        mock_pdf_service.has_vectorstore.return_value = True
+        mock_retriever = Mock()
+        mock_retriever.ainvoke = AsyncMock(return_value=[])
+        mock_pdf_service.get_hybrid_retriever.return_value = mock_retriever
+        mock_answer_chain = Mock()
+        mock_answer_chain.ainvoke = AsyncMock(return_value="답변")
+        mock_create_chain.return_value = mock_answer_chain
+        condense_chain = Mock()
+        condense_chain.ainvoke = AsyncMock(return_value=" 환불 기간은 며칠인가요? ")
+        monkeypatch.setattr(self.chat_service, "_get_condense_chain", lambda: condense_chain)
+
+        await self.chat_service.process_chat(ChatRequest(message="환불 정책 알려줘", session_id="s"))
+        assert condense_chain.ainvoke.call_count == 0  # 이전 대화가 없으면 재작성하지 않음
+        assert mock_retriever.ainvoke.call_args[0][0] == "환불 정책 알려줘"
+
+        await self.chat_service.process_chat(ChatRequest(message="그건 며칠이야?", session_id="s"))
+        inputs = condense_chain.ainvoke.call_args[0][0]
+        assert inputs["question"] == "그건 며칠이야?"
+        assert inputs["chat_history"] == "사용자: 환불 정책 알려줘\n어시스턴트: 답변\n"
+        assert mock_retriever.ainvoke.call_args[0][0] == "환불 기간은 며칠인가요?"
+    
+    @patch('services.chat_service.pdf_service')
+    @patch('services.chat_service.ChatOpenAI')
+    @patch('services.chat_service.create_stuff_documents_chain')
+    async def test_llm_clients_and_chains_are_reused_across_requests(self, mock_create_chain, mock_chat_openai,
+                                                                     mock_pdf_service):
+        mock_pdf_service.has_vectorstore.return_value = True
+        mock_retriever = Mock()
+        mock_retriever.ainvoke = AsyncMock(return_value=[])
+        mock_pdf_service.get_hybrid_retriever.return_value = mock_retriever
+        mock_answer_chain = Mock()
+        mock_answer_chain.ainvoke = AsyncMock(return_value="답변")
+        mock_create_chain.return_value = mock_answer_chain
+
+        for i in range(3):
+            await self.chat_service.process_chat(ChatRequest(message=f"질문 {i}", session_id=f"s{i}"))
+
+        assert mock_chat_openai.call_count == 1
+        assert mock_create_chain.call_count == 1
+        http_client = mock_chat_openai.call_args.kwargs["http_async_client"]
+        await self.chat_service.aclose()
+        assert http_client.is_closed
+    
+    @patch('services.chat_service.pdf_service')
+    @patch('services.chat_service.ChatOpenAI')
+    @patch('services.chat_service.create_stuff_documents_chain')
     @patch('uuid.uuid4')
-    async def test_process_chat_auto_generate_session_id(self, mock_uuid, mock_retrieval_qa, mock_chat_openai, mock_pdf_service):
+    async def test_process_chat_auto_generate_session_id(self, mock_uuid, mock_create_chain, mock_chat_openai, mock_pdf_service):
         mock_uuid.return_value = "auto-generated-session-id"
         mock_pdf_service.has_vectorstore.return_value = True
         
-        mock_vectorstore = Mock()
         mock_retriever = Mock()
-        mock_vectorstore.as_retriever.return_value = mock_retriever
-        mock_pdf_service.get_vectorstore.return_value = mock_vectorstore
+        mock_retriever.ainvoke = AsyncMock(return_value=[])
+        mock_pdf_service.get_hybrid_retriever.return_value = mock_retriever
         
         mock_llm = Mock()
         mock_chat_openai.return_value = mock_llm
         
-        mock_qa_chain = Mock()
-        mock_retrieval_qa.from_chain_type.return_value = mock_qa_chain
-        
-        mock_result = {
-            "result": "자동 생성된 세션 답변",
-            "source_documents": []
-        }
-        mock_qa_chain.invoke.return_value = mock_result
+        mock_answer_chain = Mock()
+        mock_answer_chain.ainvoke = AsyncMock(return_value="자동 생성된 세션 답변")
+        mock_create_chain.return_value = mock_answer_chain
         
         request = ChatRequest(message="세션 ID 없는 질문")
         response = await self.chat_service.process_chat(request)
@@ -264,7 +500,102 @@ class TestChatService:
         assert response.success is True
         assert response.data["session_id"] == "auto-generated-session-id"
         assert "auto-generated-session-id" in self.chat_service.sessions
-
+    
+    @patch('services.chat_service.pdf_service')
+    @patch('services.chat_service.ChatOpenAI')
+    @patch('services.chat_service.create_stuff_documents_chain')
+    async def test_process_chat_does_not_block_event_loop(self, mock_create_chain, mock_chat_openai, mock_pdf_service):
+        mock_pdf_service.has_vectorstore.return_value = True
+        
+        mock_retriever = Mock()
+        mock_retriever.ainvoke = AsyncMock(return_value=[])
+        mock_pdf_service.get_hybrid_retriever.return_value = mock_retriever
+        
+        async def slow_ainvoke(inputs):
+            await asyncio.sleep(0.2)
+            return "동시 답변"
+        
+        mock_answer_chain = Mock()
+        mock_answer_chain.ainvoke = AsyncMock(side_effect=slow_ainvoke)
+        mock_create_chain.return_value = mock_answer_chain
+        
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            self.chat_service.process_chat(ChatRequest(message=f"질문 {i}", session_id=f"session-{i}"))
+            for i in range(5)
+        ])
+        elapsed = time.perf_counter() - start
+        
+        assert all(response.success for response in responses)
+        assert elapsed < 0.2 * 3
+        mock_answer_chain.invoke.assert_not_called()
+    
+    @patch('services.chat_service.pdf_service')
+    @patch('services.chat_service.ChatOpenAI')
+    @patch('services.chat_service.create_stuff_documents_chain')
+    async def test_stream_chat_sends_sources_then_tokens(self, mock_create_chain, mock_chat_openai, mock_pdf_service):
+        mock_pdf_service.has_vectorstore.return_value = True
+        
+        mock_retriever = Mock()
+        mock_retriever.ainvoke = AsyncMock(return_value=[
+            Mock(page_content="본문", metadata={"page": 3, "source": "stream.pdf"})
+        ])
+        mock_pdf_service.get_hybrid_retriever.return_value = mock_retriever
+        
+        async def fake_astream(inputs):
+            for token in ["스트리밍 ", "답변", "입니다"]:
+                yield token
+        
+        mock_answer_chain = Mock()
+        mock_answer_chain.astream = fake_astream
+        mock_create_chain.return_value = mock_answer_chain
+        
+        request = ChatRequest(message="스트리밍 질문", session_id="stream-session")
+        events = [event async for event in self.chat_service.stream_chat(request)]
+        
+        assert events[0].startswith("event: sources\n")
+        assert '"stream.pdf"' in events[0]
+        assert [event.split("\n")[0] for event in events[1:4]] == ["event: token"] * 3
+        assert events[-1].startswith("event: done\n")
+        assert "스트리밍 답변입니다" in events[-1]
+        
+        session = self.chat_service.sessions["stream-session"]
+        assert [msg.role for msg in session.messages] == ["user", "assistant"]
+        assert session.messages[1].content == "스트리밍 답변입니다"
+    
+    @patch('services.chat_service.pdf_service')
+    async def test_stream_chat_no_vectorstore(self, mock_pdf_service):
+        mock_pdf_service.has_vectorstore.return_value = False
+        
+        request = ChatRequest(message="안녕하세요")
+        events = [event async for event in self.chat_service.stream_chat(request)]
+        
+        assert len(events) == 1
+        assert events[0].startswith("event: error\n")
+        assert "No PDF uploaded" in events[0]
+    
+    @patch('services.chat_service.federated_retriever')
+    @patch('services.chat_service.pdf_service')
+    @patch('services.chat_service.ChatOpenAI')
+    @patch('services.chat_service.create_stuff_documents_chain')
+    async def test_process_chat_searches_requested_collections(self, mock_create_chain, mock_chat_openai,
+                                                                mock_pdf_service, mock_federated):
+        mock_pdf_service.has_vectorstore.return_value = True
+        mock_federated.ainvoke = AsyncMock(return_value=[
+            Mock(page_content="본문", metadata={"page": 2, "source": "b.pdf", "collection": "b"})
+        ])
+        mock_answer_chain = Mock()
+        mock_answer_chain.ainvoke = AsyncMock(return_value="통합 검색 답변")
+        mock_create_chain.return_value = mock_answer_chain
+        
+        request = ChatRequest(message="두 문서 비교", session_id="federated", collections=["a.pdf", "b.pdf"])
+        response = await self.chat_service.process_chat(request)
+        
+        assert response.success is True
+        mock_federated.ainvoke.assert_awaited_once()
+        assert mock_federated.ainvoke.await_args.args[1] == ["a.pdf", "b.pdf"]
+        mock_pdf_service.get_hybrid_retriever.assert_not_called()
+        assert response.data["sources"][0]["source"] == "b.pdf"
 
 def test_global_chat_service_instance():
     assert chat_service is not None
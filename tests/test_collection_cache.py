@@ -0,0 +1,35 @@
+from services.collection_cache import CollectionCache, CollectionEntry
+
+
+class TestCollectionCache:
+    def test_loads_on_miss_and_evicts_least_recently_used_over_budget(self):
+        loaded = []
+
+        def loader(name):
+            if name == "missing":
+                return None
+            loaded.append(name)
+            return CollectionEntry(vectorstore=name, size_bytes=40)
+
+        cache = CollectionCache(loader, max_collections=10, max_bytes=100)
+
+        assert cache.get("a").vectorstore == "a"
+        cache.get("b")
+        cache.get("a")  # a를 최근 사용으로 갱신
+        cache.get("c")
+
+        assert cache.get("missing") is None
+        assert loaded == ["a", "b", "c"]
+        assert cache.names() == ["a", "c"]
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] == 80
+        assert stats["hits"] == 1
+        assert stats["loads"] == 3
+
+    def test_keeps_newest_entry_even_if_it_alone_exceeds_budget(self):
+        cache = CollectionCache(lambda name: None, max_collections=10, max_bytes=100)
+        cache.put("small", CollectionEntry(vectorstore=None, size_bytes=10))
+        cache.put("huge", CollectionEntry(vectorstore=None, size_bytes=500))
+
+        assert cache.names() == ["huge"]
@@ -0,0 +1,145 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from config.settings import settings
+from services.chat_service import ChatService
+
+
+def fake_chain(summary="요약"):
+    chain = Mock()
+    chain.ainvoke = AsyncMock(return_value=summary)
+    return chain
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "CONVERSATION_SUMMARY_ENABLED", True)
+    monkeypatch.setattr(settings, "CONTEXT_TOKEN_BUDGET", 1000)
+    monkeypatch.setattr(settings, "HISTORY_TOKEN_SHARE", 0.5)
+    monkeypatch.setattr(settings, "CONVERSATION_SUMMARY_MAX_TOKENS", 100)
+    chat = ChatService()
+    chat.summarizer.chain_factory = lambda: chat._test_chain
+    chat._test_chain = fake_chain()
+    return chat
+
+
+def add_turn(chat, session_id, i):
+    chat.add_message_to_session(session_id, "user", f"질문 {i} " + "내용 " * 40)
+    chat.add_message_to_session(session_id, "assistant", f"답변 {i} " + "설명 " * 40)
+
+
+class TestConversationSummarizer:
+    async def test_folds_evicted_messages_into_summary(self, service):
+        service.summarizer.start()
+        for i in range(6):
+            add_turn(service, "s", i)
+        await service.summarizer._queue.join()
+        await service.summarizer.stop()
+
+        session = service.sessions["s"]
+        assert session.summary == "요약"
+        assert session.messages[-1].content.startswith("답변 5")
+        assert "질문 0" not in "".join(m.content for m in session.messages)
+        prompt = service._test_chain.ainvoke.call_args.args[0]
+        assert "질문 0" in prompt["conversation"]
+        context = service.get_conversation_context("s")
+        assert context.startswith("이전 대화 요약: 요약\n\n이전 대화:\n")
+
+    async def test_history_size_stays_flat_over_long_sessions(self, service):
+        service.summarizer.start()
+        sizes = []
+        for i in range(100):
+            add_turn(service, "s", i)
+            await service.summarizer._queue.join()
+            sizes.append(service._select_history(service.sessions["s"])[1])
+        await service.summarizer.stop()
+
+        budget = int(settings.CONTEXT_TOKEN_BUDGET * settings.HISTORY_TOKEN_SHARE)
+        assert max(sizes) <= budget
+        assert len(service.sessions["s"].messages) < 10
+        assert service.summarizer.stats()["runs"] < 100
+
+    async def test_does_not_summarize_below_minimum(self, service):
+        service.summarizer.start()
+        add_turn(service, "s", 0)
+        await asyncio.sleep(0)
+        await service.summarizer.stop()
+
+        assert service._test_chain.ainvoke.await_count == 0
+        assert service.sessions["s"].summary == ""
+
+    async def test_failed_summary_keeps_dropped_messages_for_retry(self, service):
+        service.summarizer.start()
+        add_turn(service, "s", 0)
+        dropped = list(service.sessions["s"].messages)
+        service.summarizer.add_dropped("s", dropped)
+        service._test_chain.ainvoke = AsyncMock(side_effect=RuntimeError("rate limited"))
+
+        with pytest.raises(RuntimeError):
+            await service.summarizer.summarize("s")
+        await service.summarizer.stop()
+
+        assert service.summarizer._dropped["s"] == dropped
+
+    def test_disabled_summarizer_never_queues(self, monkeypatch):
+        monkeypatch.setattr(settings, "CONVERSATION_SUMMARY_ENABLED", False)
+        chat = ChatService()
+        for i in range(20):
+            add_turn(chat, "s", i)
+        assert chat.summarizer.stats()["queued"] == 0
+        assert chat._history_budget() == int(settings.CONTEXT_TOKEN_BUDGET * settings.HISTORY_TOKEN_SHARE)
+
+
+class TestSummarizerWithSQLiteBackend:
+    async def test_trimming_while_summarizing_keeps_folded_messages_out(self, tmp_path, clock):
+        from schemas.models import ChatMessage, ChatSession
+        from services.conversation_summarizer import ConversationSummarizer
+        from services.session_backend import SQLiteSessionBackend
+        from services.session_store import SessionStore
+
+        def make_store():
+            backend = SQLiteSessionBackend(path=str(tmp_path / "sessions.sqlite3"), clock=clock)
+            return SessionStore(max_sessions=10, idle_ttl=60, max_messages=4, backend=backend, revision_ttl=0)
+
+        worker_a, worker_b = make_store(), make_store()
+        release = asyncio.Event()
+
+        async def lagging_summary(inputs):
+            await release.wait()
+            return "요약"
+
+        chain = Mock()
+        chain.ainvoke = lagging_summary
+        summarizer = ConversationSummarizer(worker_a, lambda: chain, lambda session: session.messages[:2],
+                                            enabled=True, min_messages=1)
+        summarizer.start()
+
+        def append(i):
+            summarizer.add_dropped("s", worker_a.append_message("s", ChatMessage(role="user", content=f"m{i}")))
+
+        worker_a["s"] = ChatSession(session_id="s")
+        for i in range(4):
+            append(i)
+
+        # 요약이 밀린 동안 한도 때문에 요약 대상(m0, m1)이 세션에서 빠짐
+        run = asyncio.create_task(summarizer.summarize("s"))
+        await asyncio.sleep(0)
+        append(4)
+        append(5)
+        release.set()
+        await run
+        assert summarizer._dropped.get("s") is None  # 이미 요약한 메시지를 다시 요약하지 않음
+
+        release.clear()
+        run = asyncio.create_task(summarizer.summarize("s"))  # m2, m3 요약
+        await asyncio.sleep(0)
+        append(6)  # m2가 빠짐
+        release.set()
+        await run
+        await summarizer.stop()
+
+        for worker in (worker_a, worker_b):
+            assert [m.content for m in worker["s"].messages] == ["m4", "m5", "m6"]
+            assert worker["s"].summary == "요약"
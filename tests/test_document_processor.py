@@ -0,0 +1,105 @@
+import fitz
+
+from config.settings import settings
+from services.document_processor import enhanced_processor
+
+
+class TestParallelPageExtraction:
+    def test_parallel_extraction_matches_serial_order_and_reports_progress(self, tmp_path, monkeypatch, make_pdf):
+        pages = [f"Section {i} heading\nBody text for page {i} with enough words to keep." for i in range(7)]
+        pdf_path = make_pdf(tmp_path / "doc.pdf", pages)
+        monkeypatch.setattr(settings, "PARALLEL_PAGE_EXTRACTION", False)
+        serial = enhanced_processor._extract_pages(pdf_path, "doc.pdf")
+
+        monkeypatch.setattr(settings, "PARALLEL_PAGE_EXTRACTION", True)
+        monkeypatch.setattr(settings, "PDF_EXTRACTION_WORKERS", 2)
+        monkeypatch.setattr(settings, "PARALLEL_EXTRACTION_MIN_PAGES", 1)
+        monkeypatch.setattr(settings, "PDF_EXTRACTION_PAGES_PER_TASK", 3)
+        reported = []
+        parallel = enhanced_processor._extract_pages(
+            pdf_path, "doc.pdf", progress=lambda **fields: reported.append(fields)
+        )
+
+        assert [page["page_num"] for page in parallel] == list(range(1, 8))
+        assert [page["text"] for page in parallel] == [page["text"] for page in serial]
+        assert reported[0] == {"total_pages": 7, "pages_parsed": 0}
+        assert reported[-1] == {"pages_parsed": 7}
+
+
+class TestSinglePassParsing:
+    def test_single_pass_matches_legacy_extraction(self, tmp_path, monkeypatch):
+        document = fitz.open()
+        page = document.new_page()
+        page.insert_text((72, 40), "Page 1")
+        page.insert_text((72, 80), "Overview of retrieval", fontsize=16, fontname="hebo")
+        page.insert_text((72, 110), "Item    10    OK")
+        page.insert_text((72, 124), "Item    20    OK")
+        for row in range(3):
+            for col in range(2):
+                cell = fitz.Rect(72 + col * 100, 200 + row * 20, 172 + col * 100, 220 + row * 20)
+                page.draw_rect(cell)
+                page.insert_text((cell.x0 + 4, cell.y1 - 5), f"R{row}C{col}")
+        document.new_page().insert_text((72, 72), "Plain page without drawings")
+        path = tmp_path / "doc.pdf"
+        document.save(str(path))
+
+        def extract(single_pass):
+            monkeypatch.setattr(settings, "SINGLE_PASS_PAGE_PARSING", single_pass)
+            with fitz.open(str(path)) as pdf:
+                return [enhanced_processor._extract_page_content(pdf[i], i + 1, "doc.pdf") for i in range(len(pdf))]
+
+        legacy, single = extract(False), extract(True)
+
+        for old, new in zip(legacy, single):
+            assert new["text"] == old["text"]
+            assert new["headers"] == old["headers"]
+            assert [s["text"] for s in new["sections"]] == [s["text"] for s in old["sections"]]
+            # 선으로 그린 표는 같게 찾고, 단일 파싱은 선 없는 표("Item    10    OK" 행)도 찾음
+            assert all(t["rows"] in [n["rows"] for n in new["tables"]] for t in old["tables"])
+        assert [t["rows"] for t in single[0]["tables"]] == [
+            [["Item", "10", "OK"], ["Item", "20", "OK"]],
+            [["R0C0", "R0C1"], ["R1C0", "R1C1"], ["R2C0", "R2C1"]],
+        ]
+        assert single[1]["tables"] == []
+
+    def test_single_pass_finds_borderless_table_without_reparsing(self, monkeypatch):
+        monkeypatch.setattr(settings, "SINGLE_PASS_PAGE_PARSING", True)
+        monkeypatch.setattr(settings, "FIND_RULED_TABLES", False)
+        document = fitz.open()
+        page = document.new_page()
+        page.insert_text((72, 80), "Price list for the spring catalogue, valid until further notice.")
+        for row, cells in enumerate([("Name", "Qty", "Price"), ("Bolt", "10", "0.50"), ("Nut", "25", "0.20")]):
+            for col, text in enumerate(cells):
+                page.insert_text((72 + col * 90, 120 + row * 14), text)
+
+        calls = []
+
+        def record(name):
+            original = getattr(fitz.Page, name)
+
+            def wrapper(self, *args, **kwargs):
+                calls.append(name)
+                return original(self, *args, **kwargs)
+            return wrapper
+
+        for name in ("get_text", "find_tables", "get_cdrawings"):
+            monkeypatch.setattr(fitz.Page, name, record(name))
+
+        page_data = enhanced_processor._extract_page_content(page, 1, "doc.pdf")
+
+        assert [t["rows"] for t in page_data["tables"]] == [
+            [["Name", "Qty", "Price"], ["Bolt", "10", "0.50"], ["Nut", "25", "0.20"]]
+        ]
+        # 텍스트, 섹션, 테이블을 모두 get_text("dict") 한 번으로 얻음
+        assert calls == ["get_text"]
+
+
+class TestExtractionWorkerImports:
+    def test_page_extraction_module_builds_no_services(self):
+        import subprocess
+        import sys
+        # spawn 워커는 page_extraction만 불러오므로 임베딩 클라이언트를 만드는 모듈이 딸려 오면 안 됨
+        code = ("import sys, services.page_extraction; "
+                "print(any(m in sys.modules for m in ('services.document_processor', 'langchain_openai', 'sklearn')))")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == "False"
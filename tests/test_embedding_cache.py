@@ -0,0 +1,110 @@
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from services.embedding_cache import EmbeddingCacheStore, CachedEmbeddings, MemoizedQueryEmbeddings
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    calls: int = 0
+    query_calls: int = 0
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return super().embed_query(text)
+
+
+class TestEmbeddingCache:
+    def test_second_call_is_served_from_cache(self, tmp_path):
+        store = EmbeddingCacheStore(str(tmp_path / "cache.sqlite3"), max_bytes=10 * 1024 * 1024)
+        underlying = CountingEmbeddings(size=8)
+        embeddings = CachedEmbeddings(underlying, store, model="test-model", dimensions=8)
+
+        first = embeddings.embed_documents(["가", "나", "가"])
+        second = embeddings.embed_documents(["나", "가"])
+
+        assert underlying.calls == 2
+        assert second == [first[1], first[0]]
+        stats = store.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 3
+        assert stats["entries"] == 2
+
+    def test_cache_persists_and_is_keyed_by_model_and_dimensions(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        underlying = CountingEmbeddings(size=8)
+        CachedEmbeddings(underlying, EmbeddingCacheStore(path), model="m", dimensions=8).embed_documents(["문서"])
+
+        reopened = EmbeddingCacheStore(path)
+        CachedEmbeddings(underlying, reopened, model="m", dimensions=8).embed_documents(["문서"])
+        assert underlying.calls == 1
+
+        CachedEmbeddings(underlying, reopened, model="m", dimensions=4).embed_documents(["문서"])
+        assert underlying.calls == 2
+
+    def test_evicts_least_recently_used_when_over_budget(self, tmp_path):
+        # 8차원 float32 벡터 = 32 bytes, 3개까지만 허용
+        store = EmbeddingCacheStore(str(tmp_path / "cache.sqlite3"), max_bytes=96)
+        embeddings = CachedEmbeddings(CountingEmbeddings(size=8), store, model="m", dimensions=8)
+
+        embeddings.embed_documents(["a", "b", "c"])
+        embeddings.embed_documents(["a"])  # a를 최근 사용으로 갱신
+        embeddings.embed_documents(["d"])
+
+        stats = store.stats()
+        assert stats["evictions"] >= 1
+        assert stats["bytes"] <= 96
+        assert store.get_many([embeddings._key("a")])
+
+    def test_reads_record_last_access_in_batches(self, tmp_path):
+        store = EmbeddingCacheStore(str(tmp_path / "cache.sqlite3"), access_flush=2)
+        embeddings = CachedEmbeddings(CountingEmbeddings(size=8), store, model="m", dimensions=8)
+        embeddings.embed_documents(["a", "b"])
+        changes = store._conn.total_changes
+
+        embeddings.embed_documents(["a"])
+        assert store._conn.total_changes == changes
+        embeddings.embed_documents(["b"])
+        assert store._conn.total_changes == changes + 2
+
+    def test_ingestion_and_query_wrappers_share_the_configured_namespace(self):
+        from config.settings import settings
+        from services.pdf_service import pdf_service
+        from services.document_processor import enhanced_processor
+
+        namespace = f"{settings.EMBEDDING_MODEL}:{settings.EMBEDDING_DIMENSIONS}"
+        assert pdf_service.embeddings.underlying.namespace == namespace
+        assert enhanced_processor.embeddings.namespace == namespace
+        assert pdf_service.embeddings.namespace == f"query:{namespace}"
+
+
+class TestQueryEmbeddingMemo:
+    async def test_repeated_queries_skip_the_embedding_model(self):
+        underlying = CountingEmbeddings(size=8)
+        embeddings = MemoizedQueryEmbeddings(underlying, model="m", dimensions=8, max_entries=2)
+
+        first = await embeddings.aembed_query("환불 정책")
+        assert embeddings.embed_query("환불 정책") == first
+        embeddings.embed_query("배송")
+        embeddings.embed_query("교환")  # 가장 오래 사용되지 않은 "환불 정책" 제거
+        embeddings.embed_query("환불 정책")
+
+        assert underlying.query_calls == 4
+        stats = embeddings.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 4, 2)
+        assert embeddings.embed_documents(["문서"]) == underlying.embed_documents(["문서"])
+
+    async def test_persisted_queries_survive_restart(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        underlying = CountingEmbeddings(size=8)
+        first = await MemoizedQueryEmbeddings(underlying, "m", 8, store=EmbeddingCacheStore(path)).aembed_query("질문")
+
+        restarted = MemoizedQueryEmbeddings(underlying, "m", 8, store=EmbeddingCacheStore(path))
+        assert await restarted.aembed_query("질문") == first
+        assert restarted.embed_query("질문") == first
+
+        assert underlying.query_calls == 1
+        stats = restarted.stats()
+        assert (stats["persistent_hits"], stats["hits"], stats["misses"]) == (1, 1, 0)
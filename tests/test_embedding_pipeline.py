@@ -0,0 +1,90 @@
+import asyncio
+from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
+
+from services.embedding_pipeline import EmbeddingPipeline, AdaptiveConcurrencyLimiter
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class FlakyEmbeddings(Embeddings):
+    """처음 몇 번은 429를 돌려주고, 동시 호출 수를 기록하는 임베딩 스텁"""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def embed_documents(self, texts):
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text))]
+
+    async def aembed_documents(self, texts):
+        if self.failures > 0:
+            self.failures -= 1
+            raise RateLimitError("rate limited")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return self.embed_documents(texts)
+
+
+def make_documents(count: int, words: int = 10):
+    return [Document(page_content=" ".join(["word"] * words) + f" {i}", metadata={"i": i}) for i in range(count)]
+
+
+class TestEmbeddingPipeline:
+    def test_batches_respect_item_and_token_limits(self):
+        pipeline = EmbeddingPipeline(FlakyEmbeddings(), batch_size=4, batch_tokens=25)
+        documents = make_documents(10)
+
+        batches = pipeline.make_batches(documents)
+
+        assert [doc for batch in batches for doc in batch] == documents
+        assert all(len(batch) <= 4 for batch in batches)
+        assert all(sum(pipeline.count_tokens(doc.page_content) for doc in batch) <= 25 for batch in batches)
+
+    async def test_runs_batches_concurrently_and_feeds_sink(self):
+        embeddings = FlakyEmbeddings()
+        pipeline = EmbeddingPipeline(embeddings, batch_size=2, batch_tokens=10**6, concurrency=3)
+        received = []
+
+        async def sink(batch, vectors):
+            received.extend(zip(batch, vectors))
+
+        progress = []
+        embedded = await pipeline.run(make_documents(12), sink, progress=progress.append)
+
+        assert embedded == 12
+        assert len(received) == 12
+        assert progress[-1] == 12
+        assert embeddings.max_in_flight == 3
+
+    async def test_retries_rate_limited_batches(self, monkeypatch):
+        monkeypatch.setattr("services.embedding_pipeline.random.random", lambda: 0.0)
+        embeddings = FlakyEmbeddings(failures=2)
+        pipeline = EmbeddingPipeline(embeddings, batch_size=5, batch_tokens=10**6, concurrency=2, max_retries=3)
+
+        async def sink(batch, vectors):
+            pass
+
+        embedded = await pipeline.run(make_documents(5), sink)
+
+        assert embedded == 5
+        assert pipeline.rate_limited_count == 2
+
+    async def test_limiter_halves_on_rate_limit_and_recovers(self):
+        limiter = AdaptiveConcurrencyLimiter(8)
+
+        await limiter.acquire()
+        await limiter.release(rate_limited=True)
+        assert limiter.limit == 4
+
+        await limiter.acquire()
+        await limiter.release()
+        assert limiter.limit == 5
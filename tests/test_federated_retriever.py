@@ -0,0 +1,136 @@
+import time
+import asyncio
+import threading
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from services.pdf_service import PDFService
+from services.federated_retriever import FederatedRetriever
+
+
+@pytest.fixture(params=["per_file", "shared"])
+async def service(request, tmp_path, make_pdf):
+    service = PDFService()
+    service.collection_mode = request.param
+    service.embeddings = service.document_embeddings = DeterministicFakeEmbedding(size=16)
+    service.persist_directory = str(tmp_path / "chroma_db")
+    manuals = {
+        "alpha": ["alpha pump maintenance schedule", "alpha warranty terms"],
+        "bravo": ["bravo turbine inspection checklist", "bravo safety guide"],
+        "charlie": ["charlie invoice template", "charlie budget summary"],
+    }
+    for name, pages in manuals.items():
+        await service.process_pdf(make_pdf(tmp_path / f"{name}.pdf", pages), f"{name}.pdf", 100)
+    return service
+
+
+class TestFederatedRetriever:
+    async def test_merges_results_across_collections(self, service):
+        retriever = FederatedRetriever(service, k=2, per_collection_k=2)
+
+        documents = await retriever.ainvoke("turbine inspection checklist")
+
+        assert len(documents) == 2
+        assert documents[0].metadata["collection"] == "bravo"
+        assert "turbine" in documents[0].page_content
+
+    async def test_limits_search_to_requested_collections(self, service):
+        retriever = FederatedRetriever(service, k=10, per_collection_k=2)
+
+        documents = await retriever.ainvoke("turbine inspection checklist", ["alpha.pdf", "charlie", "unknown.pdf"])
+
+        assert {doc.metadata["collection"] for doc in documents} == {"alpha", "charlie"}
+        assert all(len([d for d in documents if d.metadata["collection"] == c]) <= 2 for c in ["alpha", "charlie"])
+
+    async def test_fusion_mode_applies_to_federated_results(self, service):
+        orders = {}
+        for mode in ("rrf", "minmax", "zscore"):
+            retriever = FederatedRetriever(service, k=6, per_collection_k=2, mode=mode)
+            orders[mode] = tuple(doc.page_content for doc in await retriever.ainvoke("alpha pump"))
+
+        # 모든 컬렉션의 후보를 같은 융합 방식으로 합치므로 방식에 따라 순위가 달라짐
+        assert len(set(orders.values())) == 3
+        assert all(sorted(order) == sorted(orders["rrf"]) for order in orders.values())
+
+    async def test_skips_collections_that_exceed_latency_budget(self, service, monkeypatch):
+        retriever = FederatedRetriever(service, k=10, per_collection_k=2, timeout=0.3)
+        search_collection = retriever._search_collection
+
+        def slow_for_bravo(name, *args):
+            if name == "bravo":
+                time.sleep(1.0)
+            return search_collection(name, *args)
+
+        monkeypatch.setattr(retriever, "_search_collection", slow_for_bravo)
+        documents = await retriever.ainvoke("turbine inspection checklist")
+
+        assert documents
+        assert "bravo" not in {doc.metadata["collection"] for doc in documents}
+        assert retriever.stats()["timed_out_collections"] == 1
+
+    async def test_timed_out_searches_keep_their_slot_until_the_thread_finishes(self, service, monkeypatch):
+        retriever = FederatedRetriever(service, k=10, per_collection_k=2, timeout=0.2, max_concurrency=2)
+        search_collection = retriever._search_collection
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def slow(*args):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.5)
+            with lock:
+                running[0] -= 1
+            return search_collection(*args)
+
+        monkeypatch.setattr(retriever, "_search_collection", slow)
+        await retriever.ainvoke("turbine inspection checklist")
+        await retriever.ainvoke("turbine inspection checklist")
+
+        # 첫 요청에서 시간 초과된 스레드가 끝나기 전에 다음 요청의 검색이 한도를 넘어 시작되면 안 됨
+        assert peak[0] <= 2
+        assert retriever.stats()["timed_out_collections"] == 6
+
+    async def test_budget_includes_query_embedding(self, service, monkeypatch):
+        retriever = FederatedRetriever(service, k=10, per_collection_k=2, timeout=0.2)
+
+        class SlowEmbeddings(DeterministicFakeEmbedding):
+            async def aembed_query(self, text):
+                await asyncio.sleep(1.0)
+                return self.embed_query(text)
+
+        monkeypatch.setattr(service, "embeddings", SlowEmbeddings(size=16))
+        start = time.perf_counter()
+        documents = await retriever.ainvoke("turbine inspection checklist")
+
+        assert documents == []
+        assert time.perf_counter() - start < 0.6
+        assert retriever.stats()["timed_out_collections"] == 3
+
+
+class TestSharedCollectionMode:
+    async def test_all_documents_share_one_collection_scoped_by_doc_id(self, tmp_path, make_pdf):
+        service = PDFService()
+        service.collection_mode = "shared"
+        service.embeddings = service.document_embeddings = DeterministicFakeEmbedding(size=16)
+        service.persist_directory = str(tmp_path / "chroma_db")
+        same_page = "shared boilerplate disclaimer page"
+        await service.process_pdf(make_pdf(tmp_path / "a.pdf", ["alpha pump manual", same_page]), "alpha.pdf", 100)
+        await service.process_pdf(make_pdf(tmp_path / "b.pdf", ["bravo turbine manual", same_page]), "bravo.pdf", 100)
+
+        client = service._get_client()
+        assert [c.name for c in client.list_collections()] == ["documents"]
+        stored = client.get_collection("documents").get(where={"doc_id": "bravo"})
+        assert len(stored["ids"]) == 2
+        assert all(doc_id.startswith("bravo:") for doc_id in stored["ids"])
+
+        documents = await service.get_hybrid_retriever("alpha.pdf").ainvoke("turbine manual disclaimer")
+        assert documents
+        assert {doc.metadata["doc_id"] for doc in documents} == {"alpha"}
+
+        restarted = PDFService()
+        restarted.collection_mode = "shared"
+        restarted.embeddings = service.embeddings
+        restarted.persist_directory = service.persist_directory
+        assert restarted.get_all_collections() == ["alpha", "bravo"]
@@ -0,0 +1,63 @@
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_chroma import Chroma
+
+from services.bm25_index import BM25Index
+from services.hybrid_fusion import HybridFusionRetriever, fuse
+
+
+VECTOR_HITS = [("a", 0.9), ("b", 0.8), ("c", 0.1)]
+KEYWORD_HITS = [("c", 12.0), ("d", 11.0), ("a", 1.0)]
+
+
+class TestFuse:
+    def test_rrf_uses_ranks_only(self):
+        fused = dict(fuse([VECTOR_HITS, KEYWORD_HITS], [0.5, 0.5], "rrf", rrf_k=60))
+
+        assert fused["a"] == pytest.approx(0.5 / 61 + 0.5 / 63)
+        assert fused["c"] == pytest.approx(0.5 / 63 + 0.5 / 61)
+        assert fused["d"] == pytest.approx(0.5 / 62)
+
+    def test_minmax_scales_each_list_and_floors_missing_documents(self):
+        fused = fuse([VECTOR_HITS, KEYWORD_HITS], [0.5, 0.5], "minmax")
+
+        # c: 벡터 0, 키워드 1 / d: 벡터 목록에 없어 0 / b: 키워드 목록에 없어 0
+        assert dict(fused) == pytest.approx({"a": 0.5, "b": 0.5 * 0.875, "c": 0.5, "d": 0.5 * 10 / 11})
+        # 점수가 같으면 먼저 나온 검색기의 순위를 따름
+        assert [doc_id for doc_id, _ in fused] == ["a", "c", "d", "b"]
+
+    def test_zscore_weights_outliers_by_spread(self):
+        fused = dict(fuse([VECTOR_HITS, KEYWORD_HITS], [0.7, 0.3], "zscore"))
+
+        assert max(fused, key=fused.get) == "a"
+        assert fused["b"] > fused["d"]
+
+    def test_rejects_unknown_mode(self):
+        with pytest.raises(ValueError):
+            fuse([VECTOR_HITS], [1.0], "max")
+
+
+class TestHybridFusionRetriever:
+    @pytest.mark.parametrize("mode", ["rrf", "minmax"])
+    async def test_returns_keyword_only_hits_beyond_search_k(self, tmp_path, mode):
+        texts = [f"filler passage number {i}" for i in range(30)] + ["rare turbine keyword"]
+        ids = [f"id{i}" for i in range(len(texts))]
+        vectorstore = Chroma(
+            collection_name="fusion-test",
+            embedding_function=DeterministicFakeEmbedding(size=8),
+            persist_directory=str(tmp_path / "chroma_db"),
+            collection_metadata={"hnsw:space": "cosine"}
+        )
+        vectorstore.add_texts(texts, ids=ids, metadatas=[{"page": i} for i in range(len(texts))])
+        retriever = HybridFusionRetriever(
+            vectorstore=vectorstore, index=BM25Index.build(ids, texts), mode=mode,
+            weights=[0.5, 0.5], vector_k=10, keyword_k=10, k=3
+        )
+
+        documents = await retriever.ainvoke("turbine")
+
+        assert len(documents) == 3
+        assert "rare turbine keyword" in [doc.page_content for doc in documents]
+        assert retriever.invoke("turbine") == documents
+        query_vector = vectorstore.embeddings.embed_query("turbine")
+        assert await retriever.asearch_by_vector("turbine", query_vector) == documents
@@ -0,0 +1,74 @@
+import pytest
+import asyncio
+from unittest.mock import patch, AsyncMock
+
+from services.ingestion_queue import IngestionQueue, QueueFullError
+from schemas.models import UploadResponse
+
+
+class TestIngestionQueue:
+    @patch('services.ingestion_queue.pdf_service')
+    async def test_job_completes_with_result(self, mock_pdf_service):
+        async def fake_process_pdf(file_path, filename, file_size, progress=None, file_hash=None):
+            progress(stage="parsing", total_pages=2, pages_parsed=2)
+            progress(stage="embedding", total_chunks=4, chunks_embedded=4)
+            return UploadResponse(message="ok", filename=filename, size=file_size, chunks=4)
+
+        mock_pdf_service.process_pdf = AsyncMock(side_effect=fake_process_pdf)
+        queue = IngestionQueue(workers=1, max_queue_size=2)
+        await queue.start()
+        try:
+            job = queue.submit("uploads/test.pdf", "test.pdf", 1234)
+            assert job.stage == "queued"
+
+            await asyncio.wait_for(queue._queue.join(), timeout=1)
+
+            job = queue.get_job(job.job_id)
+            assert job.stage == "completed"
+            assert job.pages_parsed == 2
+            assert job.chunks_embedded == 4
+            assert job.result.chunks == 4
+        finally:
+            await queue.stop()
+
+    @patch('services.ingestion_queue.pdf_service')
+    async def test_job_failure_is_recorded(self, mock_pdf_service):
+        mock_pdf_service.process_pdf = AsyncMock(side_effect=Exception("처리 실패"))
+        queue = IngestionQueue(workers=1, max_queue_size=2)
+        await queue.start()
+        try:
+            job = queue.submit("uploads/missing.pdf", "missing.pdf", 10)
+            await asyncio.wait_for(queue._queue.join(), timeout=1)
+
+            job = queue.get_job(job.job_id)
+            assert job.stage == "failed"
+            assert "처리 실패" in job.error
+        finally:
+            await queue.stop()
+
+    @patch('services.ingestion_queue.pdf_service')
+    async def test_submit_raises_when_queue_full(self, mock_pdf_service):
+        release = asyncio.Event()
+
+        async def blocking_process_pdf(*args, **kwargs):
+            await release.wait()
+
+        mock_pdf_service.process_pdf = AsyncMock(side_effect=blocking_process_pdf)
+        queue = IngestionQueue(workers=1, max_queue_size=1)
+        await queue.start()
+        try:
+            queue.submit("uploads/a.pdf", "a.pdf", 1)
+            await asyncio.sleep(0)  # 워커가 첫 작업을 가져가도록 양보
+            queue.submit("uploads/b.pdf", "b.pdf", 1)
+
+            with pytest.raises(QueueFullError):
+                queue.submit("uploads/c.pdf", "c.pdf", 1)
+            assert queue.queued_count() == 1
+        finally:
+            release.set()
+            await queue.stop()
+
+    def test_submit_requires_running_queue(self):
+        queue = IngestionQueue(workers=1, max_queue_size=1)
+        with pytest.raises(RuntimeError):
+            queue.submit("uploads/a.pdf", "a.pdf", 1)
@@ -0,0 +1,171 @@
+import pytest
+import numpy as np
+from langchain_core.embeddings import FakeEmbeddings
+
+from services.pdf_service import PDFService
+
+
+class CountingEmbeddings(FakeEmbeddings):
+    calls: int = 0
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    service = PDFService()
+    service.embeddings = service.document_embeddings = CountingEmbeddings(size=16)
+    service.persist_directory = str(tmp_path / "chroma_db")
+    return service
+
+
+class TestContentDeduplication:
+    async def test_same_bytes_under_new_name_skip_embedding(self, service, tmp_path, make_pdf):
+        pdf_path = make_pdf(tmp_path / "v1.pdf", [f"Page {i} alpha beta" for i in range(4)])
+
+        first = await service.process_pdf(pdf_path, "manual.pdf", 100)
+        assert first.chunks == 4
+        assert service.embeddings.calls == 4
+
+        second = await service.process_pdf(pdf_path, "renamed.pdf", 100)
+        assert second.chunks == 0
+        assert "already exists" in second.message
+        assert service.embeddings.calls == 4
+
+    async def test_revision_only_embeds_changed_chunks(self, service, tmp_path, make_pdf):
+        v1 = make_pdf(tmp_path / "v1.pdf", [f"Page {i} alpha beta" for i in range(4)])
+        v2 = make_pdf(tmp_path / "v2.pdf", [f"Page {i} alpha beta" for i in range(3)] + ["Rewritten page gamma"])
+
+        await service.process_pdf(v1, "manual.pdf", 100)
+        result = await service.process_pdf(v2, "manual.pdf", 100)
+
+        assert result.chunks == 1
+        assert service.embeddings.calls == 5
+        stored = service.get_vectorstore("manual.pdf").get()
+        assert len(stored["ids"]) == 4
+        assert "Rewritten page gamma" in " ".join(stored["documents"])
+        assert not any("Page 3" in text for text in stored["documents"])
+
+    async def test_reingest_changes_collection_version_but_duplicate_does_not(self, service, tmp_path, make_pdf):
+        v1 = make_pdf(tmp_path / "v1.pdf", ["Page 0 alpha beta"])
+        v2 = make_pdf(tmp_path / "v2.pdf", ["Page 0 alpha beta gamma"])
+
+        assert service.collection_versions(["manual"]) == {"manual": ""}
+        await service.process_pdf(v1, "manual.pdf", 100)
+        await service.process_pdf(v1, "copy.pdf", 100)
+        first = service.collection_versions(["manual", "copy"])
+        assert first["manual"] and first["copy"] == ""
+
+        await service.process_pdf(v2, "manual.pdf", 100)
+        assert service.collection_versions(["manual"])["manual"] not in ("", first["manual"])
+
+    async def test_version_is_shared_across_workers(self, service, tmp_path, make_pdf):
+        other = PDFService()
+        other.embeddings = service.embeddings
+        other.persist_directory = service.persist_directory
+        await service.process_pdf(make_pdf(tmp_path / "v1.pdf", ["Page 0 alpha beta"]), "manual.pdf", 100)
+        assert other.collection_versions(["manual"]) == service.collection_versions(["manual"])
+        assert other.get_hybrid_retriever("manual.pdf") is not None
+
+        # 다른 워커가 다시 처리하면 이 워커도 새 버전을 보고, 메모리에 열린 이전 인덱스를 닫음
+        await service.process_pdf(make_pdf(tmp_path / "v2.pdf", ["Page 0 gamma delta"]), "manual.pdf", 100)
+        assert other.collection_versions(["manual"]) == service.collection_versions(["manual"])
+        assert other.collections.peek("manual") is None
+        documents = await other.get_hybrid_retriever("manual.pdf").ainvoke("gamma")
+        assert [doc.page_content for doc in documents] == ["Page 0 gamma delta"]
+
+
+class TestEmbeddingClients:
+    def test_ingestion_client_leaves_rate_limit_retries_to_the_pipeline(self):
+        service = PDFService()
+        # SDK가 429를 내부에서 재시도하면 파이프라인의 동시성 제한기가 레이트 리밋을 보지 못함
+        assert service.document_embeddings.underlying.max_retries == 0
+        assert service.embeddings.underlying.underlying.max_retries > 0
+
+
+class TestLazyCollectionLoading:
+    async def test_restart_discovers_catalog_without_opening_collections(self, service, tmp_path, make_pdf):
+        for name in ["alpha", "bravo", "charlie"]:
+            pdf_path = make_pdf(tmp_path / f"{name}.pdf", [f"{name} keyword page {i}" for i in range(2)])
+            await service.process_pdf(pdf_path, f"{name}.pdf", 100)
+
+        restarted = PDFService()
+        restarted.embeddings = service.embeddings
+        restarted.persist_directory = service.persist_directory
+        restarted.collections.max_collections = 2
+
+        assert restarted.get_all_collections() == ["alpha", "bravo", "charlie"]
+        assert restarted.has_vectorstore("bravo.pdf")
+        assert restarted.collections.stats()["open_collections"] == 0
+
+        retriever = restarted.get_hybrid_retriever("bravo.pdf")
+        results = await retriever.ainvoke("bravo keyword")
+        assert any("bravo" in doc.page_content for doc in results)
+        # 저장된 BM25 인덱스를 문서 재토큰화 없이 메모리 맵으로 사용
+        assert isinstance(restarted.collections.peek("bravo").bm25_retriever.index.postings, np.memmap)
+
+        restarted.get_vectorstore("alpha.pdf")
+        restarted.get_vectorstore("charlie.pdf")
+        stats = restarted.collections.stats()
+        assert stats["open_collections"] == 2
+        assert stats["evictions"] == 1
+        assert restarted.collections.names() == ["alpha", "charlie"]
+
+    async def test_restart_still_deduplicates_by_file_hash(self, service, tmp_path, make_pdf):
+        pdf_path = make_pdf(tmp_path / "v1.pdf", [f"Page {i} alpha beta" for i in range(2)])
+        await service.process_pdf(pdf_path, "manual.pdf", 100)
+
+        restarted = PDFService()
+        restarted.embeddings = restarted.document_embeddings = service.embeddings
+        restarted.persist_directory = service.persist_directory
+        result = await restarted.process_pdf(pdf_path, "copy.pdf", 100)
+
+        assert result.chunks == 0
+        assert "collection 'manual'" in result.message
+
+
+class TestCollectionLocks:
+    async def test_locks_are_released_after_processing(self, service, tmp_path, make_pdf):
+        for i in range(3):
+            await service.process_pdf(make_pdf(tmp_path / f"doc{i}.pdf", [f"Doc {i} text"]), f"doc{i}.pdf", 100)
+
+        assert len(service._collection_locks) == 0
+
+    async def test_concurrent_callers_share_one_lock(self, service):
+        lock = service._get_collection_lock("manual")
+        async with lock:
+            assert service._get_collection_lock("manual") is lock
+
+
+class TestParallelBasicLoading:
+    def test_parallel_pages_match_pymupdf_loader(self, service, tmp_path, monkeypatch, make_pdf):
+        from config.settings import settings
+        pdf_path = make_pdf(tmp_path / "doc.pdf", [f"Page {i} alpha beta" for i in range(5)])
+        monkeypatch.setattr(settings, "PARALLEL_PAGE_EXTRACTION", False)
+        serial = service._load_documents_basic(pdf_path)
+
+        monkeypatch.setattr(settings, "PARALLEL_PAGE_EXTRACTION", True)
+        monkeypatch.setattr(settings, "PDF_EXTRACTION_WORKERS", 2)
+        monkeypatch.setattr(settings, "PARALLEL_EXTRACTION_MIN_PAGES", 1)
+        monkeypatch.setattr(settings, "PDF_EXTRACTION_PAGES_PER_TASK", 2)
+        reported = []
+        parallel = service._load_documents_basic(pdf_path, progress=lambda **fields: reported.append(fields))
+
+        assert [doc.page_content for doc in parallel] == [doc.page_content for doc in serial]
+        for key in ("source", "page", "total_pages"):
+            assert [doc.metadata[key] for doc in parallel] == [doc.metadata[key] for doc in serial]
+        assert reported[-1] == {"pages_parsed": 5}
+
+
+class TestCollectionMemoryBudget:
+    async def test_budget_counts_only_memory_the_cache_releases(self, service, tmp_path, make_pdf):
+        from config.settings import settings
+        await service.process_pdf(make_pdf(tmp_path / "doc.pdf", ["Page 0 alpha beta"]), "doc.pdf", 100)
+
+        client_settings = service._get_client().get_settings()
+        assert client_settings.chroma_segment_cache_policy == "LRU"
+        assert client_settings.chroma_memory_limit_bytes == settings.CHROMA_MEMORY_LIMIT_BYTES
+        entry = service.collections.peek(service._get_collection_name("doc.pdf"))
+        assert entry.size_bytes == entry.hybrid_retriever.index.nbytes
@@ -0,0 +1,47 @@
+from services.query_cache import QueryCache, normalize_query
+
+
+class TestQueryCache:
+    def test_normalized_queries_share_an_entry(self):
+        cache = QueryCache(max_entries=4, ttl=60)
+        cache.put(QueryCache.make_key("  반품 정책은?  ", {"manual": 1}), ["doc"], cost_seconds=0.5)
+
+        assert normalize_query("ＡＢＣ\n  def") == "abc def"
+        assert cache.get(QueryCache.make_key("반품   정책은?", {"manual": 1})) == ["doc"]
+        assert cache.stats()["saved_seconds"] == 0.5
+
+    def test_new_collection_version_misses(self):
+        cache = QueryCache(max_entries=4, ttl=60)
+        cache.put(QueryCache.make_key("q", {"manual": 1, "faq": 3}), "old")
+
+        assert cache.get(QueryCache.make_key("q", {"faq": 3, "manual": 1})) == "old"
+        assert cache.get(QueryCache.make_key("q", {"manual": 2, "faq": 3})) is None
+
+    def test_entries_expire_after_ttl(self, clock):
+        cache = QueryCache(max_entries=4, ttl=10, clock=clock)
+        cache.put("key", "value")
+
+        clock.now = 9.9
+        assert cache.get("key") == "value"
+        clock.now = 10.0
+        assert cache.get("key") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = QueryCache(max_entries=2, ttl=60)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = QueryCache(enabled=False)
+        cache.put("key", "value")
+
+        assert cache.get("key") is None
+        assert cache.stats()["misses"] == 0
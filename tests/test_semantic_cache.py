@@ -0,0 +1,46 @@
+from services.semantic_cache import SemanticCache
+
+
+class TestSemanticCache:
+    def test_returns_most_similar_entry_above_threshold(self):
+        cache = SemanticCache(threshold=0.9, max_entries=8, ttl=60)
+        cache.put([1.0, 0.0, 0.0], "manual", "refund answer", cost_seconds=2.0)
+        cache.put([0.0, 1.0, 0.0], "manual", "shipping answer")
+
+        assert cache.get([0.95, 0.1, 0.0], "manual") == "refund answer"
+        assert cache.get([0.7, 0.7, 0.0], "manual") is None  # 코사인 유사도 약 0.71
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["saved_seconds"]) == (1, 1, 2.0)
+
+    def test_entries_only_match_within_their_scope(self):
+        cache = SemanticCache(threshold=0.9, max_entries=8, ttl=60)
+        cache.put([1.0, 0.0], ("manual", 1), "v1 answer")
+
+        assert cache.get([1.0, 0.0], ("manual", 2)) is None
+        assert cache.get([1.0, 0.0], ("faq", 1)) is None
+        assert cache.get([1.0, 0.0], ("manual", 1)) == "v1 answer"
+
+    def test_expired_entries_are_ignored_and_reused(self, clock):
+        cache = SemanticCache(threshold=0.9, max_entries=1, ttl=10, clock=clock)
+        cache.put([1.0, 0.0], "manual", "old")
+
+        clock.now = 10.0
+        assert cache.get([1.0, 0.0], "manual") is None
+        cache.put([0.0, 1.0], "manual", "new")
+        assert cache.stats()["evictions"] == 0
+        assert cache.get([0.0, 1.0], "manual") == "new"
+
+    def test_full_cache_replaces_least_recently_used(self, clock):
+        cache = SemanticCache(threshold=0.9, max_entries=2, ttl=60, clock=clock)
+        cache.put([1.0, 0.0, 0.0], "manual", "a")
+        clock.now = 1.0
+        cache.put([0.0, 1.0, 0.0], "manual", "b")
+        clock.now = 2.0
+        cache.get([1.0, 0.0, 0.0], "manual")
+        clock.now = 3.0
+        cache.put([0.0, 0.0, 1.0], "manual", "c")
+
+        assert cache.get([0.0, 1.0, 0.0], "manual") is None
+        assert cache.get([1.0, 0.0, 0.0], "manual") == "a"
+        assert cache.get([0.0, 0.0, 1.0], "manual") == "c"
+        assert cache.stats()["evictions"] == 1
@@ -0,0 +1,204 @@
+import asyncio
+import threading
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+
+from schemas.models import ChatMessage, ChatSession
+from services.session_backend import SQLiteSessionBackend
+from services.session_store import SessionStore
+
+
+def message(content):
+    return ChatMessage(role="user", content=content, timestamp=datetime.now())
+
+
+class TestSessionStore:
+    def test_behaves_like_a_dict(self):
+        store = SessionStore(max_sessions=10, idle_ttl=60, max_messages=10)
+        assert store == {}
+
+        store["a"] = ChatSession(session_id="a")
+        assert "a" in store and "b" not in store
+        assert store["a"].session_id == "a"
+        assert list(store) == ["a"] and len(store) == 1
+        del store["a"]
+        assert store == {}
+
+    def test_evicts_least_recently_used_session(self):
+        store = SessionStore(max_sessions=2, idle_ttl=60, max_messages=10)
+        store["a"] = ChatSession(session_id="a")
+        store["b"] = ChatSession(session_id="b")
+        store["a"]  # a를 최근 사용으로
+        store["c"] = ChatSession(session_id="c")
+
+        assert set(store) == {"a", "c"}
+        assert store.stats()["evictions"] == 1
+
+    def test_idle_sessions_expire_on_access_and_sweep(self, clock):
+        store = SessionStore(max_sessions=10, idle_ttl=10, max_messages=10, clock=clock)
+        store["old"] = ChatSession(session_id="old")
+        store["lazy"] = ChatSession(session_id="lazy")
+        clock.now = 5
+        store["new"] = ChatSession(session_id="new")
+
+        clock.now = 12
+        assert "lazy" not in store
+        assert store.sweep() == 1  # old
+        assert list(store) == ["new"]
+        assert store.stats()["expirations"] == 2
+
+    def test_keeps_only_the_latest_messages_and_tracks_bytes(self):
+        store = SessionStore(max_sessions=10, idle_ttl=60, max_messages=3)
+        store["a"] = ChatSession(session_id="a")
+
+        dropped = []
+        for i in range(5):
+            dropped += store.append_message("a", message(f"메시지 {i}"))
+
+        assert [m.content for m in store["a"].messages] == ["메시지 2", "메시지 3", "메시지 4"]
+        assert [m.content for m in dropped] == ["메시지 0", "메시지 1"]
+        stats = store.stats()
+        assert stats["messages"] == 3 and stats["trimmed_messages"] == 2
+        retained = stats["bytes_retained"]
+        store.append_message("a", message("x" * 10000))  # 메시지 2가 밀려남
+        assert store.stats()["bytes_retained"] > retained + 9000
+        del store["a"]
+        assert store.stats()["bytes_retained"] == 0
+
+    async def test_background_sweeper_removes_idle_sessions(self, clock):
+        store = SessionStore(max_sessions=10, idle_ttl=10, max_messages=10, sweep_interval=0.01, clock=clock)
+        store["a"] = ChatSession(session_id="a")
+        store.start_sweeper()
+        clock.now = 11
+        await asyncio.sleep(0.05)
+        await store.stop_sweeper()
+
+        assert len(store) == 0
+
+
+@pytest.fixture
+def make_store(tmp_path, clock):
+    """같은 SQLite 파일을 쓰는 워커(SessionStore)를 만듭니다."""
+    def make(max_messages=10, batch_size=100, revision_ttl=0, **kwargs):
+        backend = SQLiteSessionBackend(path=str(tmp_path / "sessions.sqlite3"), batch_size=batch_size, clock=clock)
+        return SessionStore(max_sessions=10, idle_ttl=60, max_messages=max_messages, backend=backend,
+                            revision_ttl=revision_ttl, **kwargs)
+    return make
+
+
+class TestSQLiteSessionBackend:
+    def test_workers_share_sessions(self, make_store):
+        worker_a = make_store()
+        worker_b = make_store()
+
+        worker_a["s"] = ChatSession(session_id="s")
+        assert "s" in worker_b
+
+        worker_a.append_message("s", message("질문"))
+        worker_a.backend.flush()
+        assert [m.content for m in worker_b["s"].messages] == ["질문"]
+
+        worker_b.append_message("s", message("답변"))
+        worker_b.backend.flush()
+        assert [m.content for m in worker_a["s"].messages] == ["질문", "답변"]
+
+        del worker_b["s"]
+        assert "s" not in worker_a
+
+    def test_batches_appends_and_survives_restart(self, make_store):
+        store = make_store(max_messages=3, batch_size=4)
+        store["s"] = ChatSession(session_id="s")
+        commits = store.backend.commits
+        for i in range(8):
+            store.append_message("s", message(f"메시지 {i}"))
+        assert store.backend.commits - commits == 2
+        store.backend.close()
+
+        restarted = make_store(max_messages=3)
+        assert [m.content for m in restarted["s"].messages] == ["메시지 5", "메시지 6", "메시지 7"]
+        assert restarted.backend.stats()["messages"] == 8
+
+    def test_cached_reads_skip_reloading(self, make_store):
+        store = make_store()
+        store["s"] = ChatSession(session_id="s")
+        store.append_message("s", message("질문"))
+        for _ in range(5):
+            store["s"]
+        assert store.stats()["backend_loads"] == 0
+
+    def test_revision_check_is_reused_within_ttl(self, make_store, clock):
+        worker_a = make_store(clock=clock, revision_ttl=1)
+        worker_b = make_store()
+        worker_a["s"] = ChatSession(session_id="s")
+        worker_a.backend.revision = Mock(wraps=worker_a.backend.revision)
+        for _ in range(5):
+            worker_a["s"]
+        assert worker_a.backend.revision.call_count == 0
+
+        worker_b.append_message("s", message("다른 워커"))
+        worker_b.backend.flush()
+        clock.now += 1
+        assert [m.content for m in worker_a["s"].messages] == ["다른 워커"]
+        assert worker_a.backend.revision.call_count == 1
+
+    async def test_background_flush_runs_off_the_event_loop(self, make_store):
+        store = make_store()
+        store.commit_interval = 0
+        loop_thread = threading.get_ident()
+        flushed = threading.Event()
+        threads = []
+
+        def flush():
+            threads.append(threading.get_ident())
+            flushed.set()
+
+        store.backend.flush = flush
+        store.start_sweeper()
+        while not flushed.is_set():
+            await asyncio.sleep(0.01)
+        await store.stop_sweeper()
+        assert threads and loop_thread not in threads
+
+    def test_sweep_expires_sessions_idle_across_workers(self, make_store, clock):
+        store = make_store()
+        store["old"] = ChatSession(session_id="old")
+        clock.now = 50
+        store["new"] = ChatSession(session_id="new")
+
+        clock.now = 70
+        assert store.sweep() == 1
+        assert "old" not in store and "new" in store
+
+    def test_folded_messages_stay_out_after_reload(self, make_store):
+        worker_a = make_store()
+        worker_b = make_store()
+        worker_a["s"] = ChatSession(session_id="s")
+        for i in range(4):
+            worker_a.append_message("s", message(f"메시지 {i}"))
+        worker_b["s"]
+
+        folded = worker_a["s"].messages[:2]
+        assert worker_a.fold_messages("s", folded, "앞의 두 메시지 요약") == 2
+
+        session = worker_b["s"]
+        assert session.summary == "앞의 두 메시지 요약"
+        assert [m.content for m in session.messages] == ["메시지 2", "메시지 3"]
+
+    def test_fold_after_trimming_hides_only_the_folded_messages(self, make_store):
+        worker_a = make_store(max_messages=4)
+        worker_b = make_store(max_messages=4)
+        worker_a["s"] = ChatSession(session_id="s")
+        for i in range(6):
+            worker_a.append_message("s", message(f"m{i}"))  # m0, m1은 한도로 빠짐
+
+        folded = worker_a["s"].messages[:2]
+        assert [m.content for m in folded] == ["m2", "m3"]
+        assert worker_a.fold_messages("s", folded, "m0~m3 요약") == 2
+
+        for worker in (worker_a, worker_b):
+            assert [m.content for m in worker["s"].messages] == ["m4", "m5"]
+        worker_b.append_message("s", message("m6"))
+        worker_b.backend.flush()
+        assert [m.content for m in worker_a["s"].messages] == ["m4", "m5", "m6"]
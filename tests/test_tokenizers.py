@@ -0,0 +1,28 @@
+from services.tokenizers import tokenize_korean_josa, tokenize_korean_bigram, get_query_tokenizer, tokenizer_cache_info
+
+
+class TestKoreanTokenizers:
+    def test_josa_variants_share_one_term(self):
+        assert tokenize_korean_josa("문서는 문서를 문서의 문서에서") == ["문서"] * 4
+        assert tokenize_korean_josa("검색 결과는 결과와 결과") == ["검색", "결과", "결과", "결과"]
+
+    def test_keeps_nouns_that_end_like_josa(self):
+        assert tokenize_korean_josa("나이 고도 결과") == ["나이", "고도", "결과"]
+
+    def test_lowercases_latin_and_drops_punctuation(self):
+        assert tokenize_korean_josa("RAG 시스템입니다. GPT-4.1, OpenAI!") == ["rag", "시스템", "gpt-4.1", "openai"]
+
+    def test_bigram_mode_splits_hangul_words(self):
+        assert tokenize_korean_bigram("하이브리드 검색 API") == ["하이", "이브", "브리", "리드", "검색", "api"]
+
+    def test_only_queries_are_cached(self):
+        before = tokenizer_cache_info()["query"]
+        tokenize_korean_josa("캐시하지 않는 청크 문장입니다")
+        assert tokenizer_cache_info()["query"]["misses"] == before["misses"]
+
+        tokenize = get_query_tokenizer("korean_josa")
+        assert tokenize("캐시 확인용 고유한 질의입니다") == ("캐시", "확인용", "고유한", "질의")
+        tokenize("캐시 확인용 고유한 질의입니다")
+        after = tokenizer_cache_info()["query"]
+        assert (after["misses"], after["hits"]) == (before["misses"] + 1, before["hits"] + 1)
+        assert after["max_size"] <= 4096
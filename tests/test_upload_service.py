@@ -0,0 +1,134 @@
+import os
+import hashlib
+import httpx
+import pytest
+
+from schemas.models import JobStatus
+from services.upload_service import spool_multipart_upload, UploadTooLargeError, InvalidUploadError
+
+BOUNDARY = "testboundary"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def multipart_head(filename="test.pdf", content_type="application/pdf", name="file") -> bytes:
+    return (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"{name}\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: {content_type}\r\n\r\n").encode()
+
+
+def multipart_body(contents: bytes, **kwargs) -> bytes:
+    return multipart_head(**kwargs) + contents + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+class ChunkedBody:
+    """본문을 chunk_size씩 내보내고, 몇 바이트를 읽어 갔는지 기록합니다."""
+
+    def __init__(self, head: bytes, payload_size: int, chunk_size: int = 1024):
+        self.head = head
+        self.payload_size = payload_size
+        self.chunk_size = chunk_size
+        self.sent = 0
+
+    async def __aiter__(self):
+        self.sent += len(self.head)
+        yield self.head
+        while self.sent < self.payload_size:
+            self.sent += self.chunk_size
+            yield b"x" * self.chunk_size
+
+
+async def chunks(data: bytes, size: int = 1024):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+class TestSpoolMultipartUpload:
+    async def test_spools_file_and_computes_hash(self, tmp_path):
+        contents = b"%PDF-1.4 " + os.urandom(10_000)
+
+        result = await spool_multipart_upload(CONTENT_TYPE, chunks(multipart_body(contents)), dest_dir=str(tmp_path),
+                                              max_size=20_000, allowed_content_types=["application/pdf"])
+
+        assert result.size == len(contents)
+        assert result.sha256 == hashlib.sha256(contents).hexdigest()
+        assert (result.filename, result.content_type) == ("test.pdf", "application/pdf")
+        with open(result.path, "rb") as f:
+            assert f.read() == contents
+
+    async def test_aborts_as_soon_as_size_exceeded(self, tmp_path):
+        body = ChunkedBody(multipart_head(), payload_size=10 * 1024 * 1024)
+
+        with pytest.raises(UploadTooLargeError):
+            await spool_multipart_upload(CONTENT_TYPE, body, dest_dir=str(tmp_path), max_size=4096)
+
+        # 한도를 넘은 직후 중단하고 나머지 전송은 읽지 않음
+        assert body.sent < 8 * 1024
+        # 중단된 임시 파일은 남지 않아야 함
+        assert os.listdir(tmp_path) == []
+
+    async def test_caps_raw_body_outside_the_file_part(self, tmp_path):
+        body = multipart_body(b"x" * 10, name="comment") + multipart_body(b"%PDF")
+
+        with pytest.raises(UploadTooLargeError):
+            await spool_multipart_upload(CONTENT_TYPE, chunks(body), dest_dir=str(tmp_path),
+                                         max_size=4096, max_body_size=200)
+        assert os.listdir(tmp_path) == []
+
+    async def test_rejects_wrong_type_before_reading_the_file(self, tmp_path):
+        body = ChunkedBody(multipart_head(filename="a.png", content_type="image/png"), payload_size=1024 * 1024)
+
+        with pytest.raises(InvalidUploadError):
+            await spool_multipart_upload(CONTENT_TYPE, body, dest_dir=str(tmp_path),
+                                         allowed_content_types=["application/pdf"])
+        assert body.sent < 4 * 1024
+
+    async def test_rejects_missing_file_field_and_non_multipart(self, tmp_path):
+        with pytest.raises(InvalidUploadError):
+            await spool_multipart_upload(CONTENT_TYPE, chunks(multipart_body(b"%PDF", name="other")),
+                                         dest_dir=str(tmp_path))
+        with pytest.raises(InvalidUploadError):
+            await spool_multipart_upload("application/json", chunks(b"{}"), dest_dir=str(tmp_path))
+        assert os.listdir(tmp_path) == []
+
+
+class TestUploadEndpoint:
+    async def test_chunked_oversized_upload_gets_413_without_reading_the_rest(self, tmp_path, monkeypatch):
+        from main import app
+        from config.settings import settings
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        body = ChunkedBody(multipart_head(), payload_size=settings.MAX_FILE_SIZE * 2, chunk_size=64 * 1024)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post("/upload-pdf", content=body, headers={"content-type": CONTENT_TYPE})
+
+        assert response.status_code == 413
+        assert body.sent <= settings.MAX_FILE_SIZE + 128 * 1024
+        assert os.listdir(tmp_path) == []
+
+    async def test_same_name_uploads_get_their_own_files(self, tmp_path, monkeypatch):
+        from main import app, ingestion_queue
+        from services.ingestion_queue import QueueFullError
+        from config.settings import settings
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        submitted = []
+
+        def submit(file_path, filename, file_size, sha256=None):
+            if len(submitted) == 2:
+                raise QueueFullError("full")
+            submitted.append((file_path, filename))
+            return JobStatus(job_id=str(len(submitted)), filename=filename, size=file_size, sha256=sha256)
+
+        monkeypatch.setattr(ingestion_queue, "submit", submit)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            for contents in (b"%PDF first", b"%PDF second", b"%PDF third"):
+                response = await client.post("/upload-pdf", content=multipart_body(contents),
+                                             headers={"content-type": CONTENT_TYPE})
+
+        # 대기 중인 두 작업은 서로 다른 파일을 가리키고, 429로 거절된 업로드는 자기 파일만 지움
+        assert response.status_code == 429
+        assert [filename for _, filename in submitted] == ["test.pdf", "test.pdf"]
+        assert submitted[0][0] != submitted[1][0]
+        with open(submitted[0][0], "rb") as f:
+            assert f.read() == b"%PDF first"
+        with open(submitted[1][0], "rb") as f:
+            assert f.read() == b"%PDF second"
+        assert len(os.listdir(tmp_path)) == 2